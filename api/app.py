@@ -1,19 +1,38 @@
 # api/app.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Header, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
-import joblib
-import os
+from fastapi.responses import JSONResponse
+import numpy as np
 import sys
+import time
+import asyncio
+import secrets
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
 
 # Add parent directory to path
 current_dir = Path(__file__).parent
 parent_dir = current_dir.parent
 sys.path.append(str(parent_dir))
 
-from api.schemas import PredictionInput, PredictionOutput, AgentInput, AgentOutput
+from api.schemas import (
+    PredictionInput, PredictionOutput, AgentInput, AgentOutput,
+    BatchPredictionInput, BatchPredictionItem, BatchPredictionOutput,
+    AgentBatchInput, AgentBatchOutput, ReloadInput, ReloadOutput
+)
 from config import settings
+from src.credit_agent import get_risk_levels
+from src.serving_model import ServingModel
+from src.shadow_scoring import ShadowScorer
+from models.model_registry import ModelRegistry
+from src.prediction_cache import PredictionCache
+from src.micro_batcher import MicroBatcher
+from src.inference_executor import (
+    InferenceExecutor, InferenceQueueFullError,
+    init_worker, worker_predict_proba, worker_process_query, worker_process_batch, worker_warm_up,
+    worker_cascade_predict
+)
 
 app = FastAPI(title=settings.API_TITLE, version=settings.API_VERSION)
 
@@ -26,21 +45,299 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global variables for loaded model and agent
-model = None
-credit_agent = None
+class Deployment:
+    """A ``ServingModel`` plus the executor, micro-batcher and prediction cache that score with it.
+
+    A reload builds a new deployment and swaps the global reference in one assignment.
+    Requests hold the deployment they started on (``use()``), and the old one is shut
+    down only after they have all finished.
+    """
+
+    def __init__(self, serving: ServingModel):
+        self.serving = serving
+        self.version = serving.version
+        self.active = 0
+        self.batcher = None
+        self.prediction_cache = None
+
+        # Bounded pool so CPU-bound inference never blocks the event loop
+        if settings.INFERENCE_EXECUTOR == "process":
+            self.executor = InferenceExecutor(
+                "process", settings.INFERENCE_WORKERS, settings.INFERENCE_QUEUE_SIZE,
+                retry_after=settings.INFERENCE_RETRY_AFTER_S,
+                initializer=init_worker, initargs=(serving.model_path, settings.USE_COMPILED_MODEL, False,  # verified on load
+                          serving.cascade is not None)
+            )
+            # Picklable worker functions; each worker loads the model once
+            self.predict_fn, self.agent_fn, self.agent_batch_fn = worker_predict_proba, worker_process_query, worker_process_batch
+            if serving.cascade is not None:
+                # Workers report how many rows reached the full model; run() counts them here
+                self.predict_fn = worker_cascade_predict
+        else:
+            self.executor = InferenceExecutor(
+                "thread", settings.INFERENCE_WORKERS, settings.INFERENCE_QUEUE_SIZE,
+                retry_after=settings.INFERENCE_RETRY_AFTER_S
+            )
+            self.predict_fn, self.agent_fn, self.agent_batch_fn = serving.predict_proba, serving.process_query, serving.process_batch
+
+        if settings.PREDICTION_CACHE_ENABLED:
+            self.prediction_cache = PredictionCache(
+                max_entries=settings.PREDICTION_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.PREDICTION_CACHE_TTL_S,
+                quantization=settings.PREDICTION_CACHE_QUANTIZATION,
+                feature_schema=serving.feature_schema
+            )
+            self.prediction_cache.set_model_version(serving.version)
+
+    def start(self):
+        """Start the micro-batcher (must be called from the running event loop)"""
+        if settings.MICROBATCH_ENABLED:
+            self.batcher = MicroBatcher(
+                self.predict_fn,
+                max_batch_size=settings.MICROBATCH_MAX_SIZE,
+                max_wait_ms=settings.MICROBATCH_MAX_WAIT_MS,
+                executor=self,  # run() also records cascade stats from process workers
+                # Same backpressure as the executor: at most one queue's worth of full batches
+                max_queue_size=settings.INFERENCE_QUEUE_SIZE * settings.MICROBATCH_MAX_SIZE,
+                retry_after=settings.INFERENCE_RETRY_AFTER_S
+            )
+            self.batcher.start()
+
+    @contextmanager
+    def use(self):
+        """Pin this deployment for the duration of a request"""
+        self.active += 1
+        try:
+            yield self
+        finally:
+            self.active -= 1
+
+    async def run(self, fn, *args):
+        """Run inference on this deployment's bounded executor"""
+        result = await self.executor.run(fn, *args)
+        if fn is worker_cascade_predict:
+            probabilities, n_full_rows = result
+            self.serving.cascade.record(len(probabilities), n_full_rows)
+            return probabilities
+        return result
+
+    async def warm_up_workers(self, timeout: float = 60.0):
+        """Process mode: make every worker load the model before taking traffic.
+
+        Warm-up tasks are submitted one per worker until each worker pid has answered
+        (a fast worker can pick up a second task while another is still loading).
+        """
+        if self.executor.mode != "process":
+            return
+        X = self.serving.self_test_batch(8)
+        warmed = set()
+        deadline = time.monotonic() + timeout
+        while len(warmed) < self.executor.workers and time.monotonic() < deadline:
+            pids = await asyncio.gather(*(self.run(worker_warm_up, X) for _ in range(self.executor.workers)))
+            warmed.update(pids)
+        if len(warmed) < self.executor.workers:
+            print(f"⚠️ Only {len(warmed)}/{self.executor.workers} inference workers warmed up")
+
+    async def retire(self, drain_timeout: float = 0.0):
+        """Wait up to ``drain_timeout`` seconds for in-flight requests, then stop the workers"""
+        deadline = time.monotonic() + drain_timeout
+        while self.active and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        if self.active:
+            print(f"⚠️ Retiring model {self.version} with {self.active} request(s) still in flight")
+        if self.batcher is not None:
+            await self.batcher.stop()
+        self.executor.shutdown(wait=False)
+
+# Active deployment; replaced (never mutated) on reload
+deployment: Optional[Deployment] = None
+reload_lock = asyncio.Lock()
+registry = None
+registry_watcher = None
+retiring = set()
+shadow: Optional[ShadowScorer] = None
+fast_model: Optional[ServingModel] = None
+
+def _model_file() -> Path:
+    # Safe path construction
+    if isinstance(settings.MODEL_PATH, Path):
+        return settings.MODEL_PATH / "credit_scoring_model.pkl"
+    # Fallback: construct path manually
+    return Path(settings.MODEL_PATH) / "credit_scoring_model.pkl"
+
+def _resolve_model_path(path: str) -> Path:
+    """Registry paths may be relative to the directory training was run from"""
+    path = Path(path)
+    if not path.is_absolute() and not path.exists():
+        path = settings.BASE_DIR / path
+    return path
+
+def _registry_target(model_name: Optional[str] = None, version: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """(name, registry entry) to serve: ``model_name``, else ``SERVING_MODEL_NAME``, else the latest model"""
+    global registry
+    if registry is None:
+        registry = ModelRegistry(str(settings.MODEL_PATH))
+    name = model_name or settings.SERVING_MODEL_NAME or registry.get_latest_model()
+    info = registry.get_model(name, version) if name else None
+    if info is None:
+        raise LookupError(f"Model '{name}'{f' {version}' if version else ''} not found in registry")
+    return name, info
+
+def _load_serving_model(model_path, registry_name: Optional[str] = None,
+                        registry_version: Optional[str] = None) -> ServingModel:
+    """Load and self-test a model (blocking; reloads run it off the event loop)"""
+    serving = ServingModel.load(
+        model_path, prefer_compiled=settings.USE_COMPILED_MODEL,
+        verify_checksum=settings.ARTIFACT_VERIFY_CHECKSUM,
+        registry_name=registry_name, registry_version=registry_version,
+        cascade=settings.CASCADE_ENABLED
+    )
+    serving.warm_up()
+    return serving
+
+def _activate(new_deployment: Deployment) -> Optional[Deployment]:
+    """Start ``new_deployment`` and make it the active one; returns the previous deployment"""
+    global deployment
+    new_deployment.start()
+    previous, deployment = deployment, new_deployment
+    return previous
+
+def _retire_later(previous: Optional[Deployment]):
+    if previous is None:
+        return
+    task = asyncio.get_running_loop().create_task(previous.retire(settings.MODEL_RELOAD_DRAIN_TIMEOUT_S))
+    retiring.add(task)
+    task.add_done_callback(retiring.discard)
+
+async def reload_model(model_name: Optional[str] = None, version: Optional[str] = None) -> Dict[str, Any]:
+    """Load a registry model in the background, warm it up and atomically swap it in"""
+    async with reload_lock:
+        name, info = _registry_target(model_name, version)
+        model_path = _resolve_model_path(info['model_path'])
+        print(f"🔄 Loading '{name}' {info['version']} from {model_path}...")
+
+        loop = asyncio.get_running_loop()
+        serving = await loop.run_in_executor(None, _load_serving_model, model_path, name, info['version'])
+        new_deployment = Deployment(serving)
+        # Process workers load the model in their initializer; pay that before taking traffic
+        try:
+            await new_deployment.warm_up_workers()
+        except Exception:
+            new_deployment.executor.shutdown(wait=False)
+            raise
+
+        previous = _activate(new_deployment)
+        _retire_later(previous)
+    print(f"✅ Now serving '{name}' {info['version']} (model version {serving.version})")
+    return {
+        "status": "reloaded",
+        "previous_version": previous.version if previous is not None else None,
+        "model": serving.info()
+    }
+
+def _load_fast_model() -> Optional[ServingModel]:
+    """Distilled student for /predict/fast (None when not configured or not registered)"""
+    if not settings.FAST_MODEL_NAME:
+        return None
+    try:
+        name, info = _registry_target(settings.FAST_MODEL_NAME)
+        # The student is already the cheap path: served without a cascade
+        student = ServingModel.load(
+            _resolve_model_path(info['model_path']), prefer_compiled=settings.USE_COMPILED_MODEL,
+            verify_checksum=settings.ARTIFACT_VERIFY_CHECKSUM, registry_name=name, registry_version=info['version']
+        )
+        student.warm_up()
+    except Exception as e:
+        print(f"⚠️ Fast tier disabled: {e} (run distill_model.py)")
+        return None
+    teacher = f"'{info['metadata'].get('teacher')}' {info['metadata'].get('teacher_version')}"
+    print(f"✅ Fast tier: '{name}' {info['version']} ({type(student.model).__name__}, distilled from {teacher}, "
+          f"{student.self_test['single_row_ms']:.3f}ms/row)")
+    return student
+
+async def _refresh_fast_model(failed: Optional[str] = None) -> Optional[str]:
+    """Swap in a newer registered student (it scores inline, so one assignment is enough).
+
+    Returns the registry version that failed to load, which is not retried.
+    """
+    global fast_model
+    _, info = _registry_target(settings.FAST_MODEL_NAME)
+    if info['version'] == failed or (fast_model is not None and fast_model.registry_version == info['version']):
+        return failed
+    student = await asyncio.get_running_loop().run_in_executor(None, _load_fast_model)
+    if student is None:
+        return info['version']
+    fast_model = student
+    return None
+
+async def _watch_registry():
+    """Hot-reload whenever the served registry name (or the fast-tier student) gets a new version"""
+    failed = fast_failed = None
+    while True:
+        await asyncio.sleep(settings.MODEL_RELOAD_POLL_S)
+        if settings.FAST_MODEL_NAME:
+            try:
+                fast_failed = await _refresh_fast_model(fast_failed)
+            except LookupError:
+                pass
+            except Exception as e:
+                print(f"⚠️ Registry watcher (fast tier): {e}")
+        target = None
+        try:
+            name, info = _registry_target()
+            target = (name, info['version'])
+            current = deployment.serving if deployment is not None else None
+            if reload_lock.locked() or target == failed or \
+                    (current is not None and (current.registry_name, current.registry_version) == target):
+                continue
+            await reload_model(*target)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Do not retry a version that failed to load until the registry changes
+            failed = target
+            print(f"⚠️ Registry watcher: {e}")
+
+def _start_shadow_scoring() -> Optional[ShadowScorer]:
+    """Load the configured challengers and start scoring sampled traffic in the background"""
+    challengers = []
+    for spec in settings.SHADOW_CHALLENGERS:
+        name, _, version = spec.partition("@")
+        try:
+            name, info = _registry_target(name, version or None)
+            challenger = _load_serving_model(_resolve_model_path(info['model_path']), name, info['version'])
+        except Exception as e:
+            print(f"⚠️ Skipping challenger '{spec}': {e}")
+            continue
+        challengers.append(challenger)
+        print(f"✅ Challenger '{name}' {info['version']} ({challenger.version}, {type(challenger.model).__name__})")
+    if not challengers:
+        return None
+    scorer = ShadowScorer(
+        challengers,
+        sample_rate=settings.SHADOW_SAMPLE_RATE,
+        cpu_budget=settings.SHADOW_CPU_BUDGET,
+        queue_size=settings.SHADOW_QUEUE_SIZE,
+        log_path=settings.SHADOW_LOG_PATH
+    )
+    scorer.start()
+    print(f"✅ Shadow scoring {settings.SHADOW_SAMPLE_RATE:.0%} of traffic "
+          f"(CPU budget {settings.SHADOW_CPU_BUDGET:.0%}, log {settings.SHADOW_LOG_PATH})")
+    return scorer
 
 @app.on_event("startup")
 async def startup_event():
     """Load model and agent on startup with safe path handling"""
-    global model, credit_agent
+    global registry_watcher, shadow, fast_model
     try:
-        # Safe path construction
-        if isinstance(settings.MODEL_PATH, Path):
-            model_path = settings.MODEL_PATH / "credit_scoring_model.pkl"
-        else:
-            # Fallback: construct path manually
-            model_path = Path(settings.MODEL_PATH) / "credit_scoring_model.pkl"
+        # Serve the registered version of SERVING_MODEL_NAME; fall back to the unregistered model file
+        try:
+            registry_name, info = _registry_target()
+            registry_version = info['version']
+            model_path = _resolve_model_path(info['model_path'])
+        except LookupError:
+            registry_name = registry_version = None
+            model_path = _model_file()
         
         print(f"🔧 Loading model from: {model_path}")
         print(f"🔧 Absolute path: {model_path.absolute()}")
@@ -48,23 +345,37 @@ async def startup_event():
         
         if model_path.exists():
             print("📦 Loading model data...")
-            loaded_data = joblib.load(model_path)
-            model = loaded_data['model']
-            feature_importance = loaded_data.get('feature_importance')
-            
-            print(f"✅ Model type: {type(model).__name__}")
-            
-            # Test the model works
-            test_features = [[0.5, 35, 0, 0.3, 5000, 5, 0, 1, 0, 1]]
-            test_prob = model.predict_proba(test_features)[0, 1]
-            print(f"✅ Model test prediction: {test_prob:.3f}")
-            
-            # Initialize credit agent
-            print("🤖 Initializing credit agent...")
-            from src.credit_agent import CreditAgent
-            credit_agent = CreditAgent(model, feature_importance)
+            serving = _load_serving_model(model_path, registry_name, registry_version)
             
+            print(f"✅ Model type: {type(serving.model).__name__}")
+            print(f"✅ Model version: {serving.version}" + (f" ('{registry_name}' {registry_version})" if registry_name else ""))
+            feature_schema = serving.feature_schema
+            print(f"✅ Feature schema: {feature_schema.n_features} features ({feature_schema.fingerprint})")
+            preprocessor = feature_schema.preprocessor
+            if preprocessor.strategies:
+                fills = {f: preprocessor.fill_value_map[f] for f in preprocessor.strategies}
+                print(f"✅ Imputation fitted on training data: {fills} ({preprocessor.fingerprint})")
+            if serving.cascade is not None:
+                print(f"✅ Cascade: first stage answers p < {serving.cascade.low_cutoff:.4f} "
+                      f"or p >= {serving.cascade.high_cutoff:.4f}")
+            print(f"✅ Model self-test: p={serving.self_test['test_probability']:.3f}, "
+                  f"{serving.self_test['rows']} rows in {serving.self_test['batch_ms']:.1f}ms")
             print("✅ Agent initialized successfully")
+            
+            new_deployment = Deployment(serving)
+            await new_deployment.warm_up_workers()
+            _activate(new_deployment)
+            print(f"✅ Inference executor: {settings.INFERENCE_EXECUTOR} x{settings.INFERENCE_WORKERS} "
+                  f"(queue {settings.INFERENCE_QUEUE_SIZE})")
+            if settings.PREDICTION_CACHE_ENABLED:
+                print(f"✅ Prediction cache enabled ({settings.PREDICTION_CACHE_MAX_ENTRIES:,} entries, "
+                      f"TTL {settings.PREDICTION_CACHE_TTL_S}s)")
+            if settings.MICROBATCH_ENABLED:
+                print(f"✅ Micro-batching enabled (max {settings.MICROBATCH_MAX_SIZE} rows / "
+                      f"{settings.MICROBATCH_MAX_WAIT_MS}ms)")
+            if settings.SHADOW_CHALLENGERS:
+                shadow = _start_shadow_scoring()
+            fast_model = _load_fast_model()
             print("🚀 Agentic Credit Scoring API is ready!")
         else:
             print(f"❌ Model file not found at: {model_path}")
@@ -74,6 +385,74 @@ async def startup_event():
         print(f"❌ Error during startup: {e}")
         import traceback
         traceback.print_exc()
+    
+    if settings.MODEL_RELOAD_POLL_S > 0:
+        registry_watcher = asyncio.get_running_loop().create_task(_watch_registry())
+        print(f"👀 Watching the model registry every {settings.MODEL_RELOAD_POLL_S}s")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers"""
+    if registry_watcher is not None:
+        registry_watcher.cancel()
+    if retiring:
+        await asyncio.gather(*retiring, return_exceptions=True)
+    if deployment is not None:
+        await deployment.retire()
+    if shadow is not None:
+        shadow.stop()
+
+@app.exception_handler(InferenceQueueFullError)
+async def inference_queue_full_handler(request: Request, exc: InferenceQueueFullError):
+    """Shed load when the inference queue is full"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+def _acquire(detail: str = "Model not loaded"):
+    """Pin the active deployment for one request (503 if no model is loaded)"""
+    if deployment is None:
+        raise HTTPException(status_code=503, detail=detail)
+    return deployment.use()
+
+def _check_admin_token(token: Optional[str]):
+    if settings.ADMIN_TOKEN and not secrets.compare_digest(token or "", settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+async def _score_single(dep: Deployment, features) -> float:
+    """Score one applicant, coalescing with concurrent requests when micro-batching is on"""
+    row = dep.serving.feature_schema.transform(features)
+    cache = dep.prediction_cache
+    if cache is not None:
+        row = cache.quantize(row)
+        cached = cache.get(row[0])
+        if cached is not None:
+            return cached
+    
+    if dep.batcher is not None and dep.batcher.running:
+        probability = await dep.batcher.submit(row[0])
+    else:
+        probability = float((await dep.run(dep.predict_fn, row))[0])
+    
+    if cache is not None:
+        cache.put(row[0], probability, model_version=dep.version)
+    return probability
+
+async def _score_matrix(dep: Deployment, X: np.ndarray) -> np.ndarray:
+    """Score a feature matrix in one model call, skipping rows already in the cache"""
+    cache = dep.prediction_cache
+    if cache is None:
+        return np.asarray(await dep.run(dep.predict_fn, X), dtype=np.float64)
+    
+    X = cache.quantize(X)
+    probabilities, misses = cache.get_many(X)
+    if misses.any():
+        X_missed = X[misses]
+        probabilities[misses] = await dep.run(dep.predict_fn, X_missed)
+        cache.put_many(X_missed, probabilities[misses], model_version=dep.version)
+    return probabilities
 
 @app.get("/")
 async def root():
@@ -85,7 +464,14 @@ async def root():
             "documentation": "/docs",
             "health": "/health",
             "prediction": "/predict",
-            "agent": "/agent"
+            "batch_prediction": "/predict/batch",
+            "fast_prediction": "/predict/fast",
+            "agent": "/agent",
+            "agent_batch": "/agent/batch",
+            "metrics": "/metrics",
+            "admin_model": "/admin/model",
+            "admin_reload": "/admin/reload",
+            "admin_shadow": "/admin/shadow"
         }
     }
 
@@ -94,54 +480,164 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy", 
-        "model_loaded": model is not None,
-        "agent_loaded": credit_agent is not None
+        "model_loaded": deployment is not None,
+        "agent_loaded": deployment is not None,
+        "model_version": deployment.version if deployment is not None else None
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Serving metrics for latency/throughput tuning"""
+    dep = deployment
+    if dep is None:
+        return {"micro_batching": {"running": False}, "inference_executor": None, "prediction_cache": None}
+    return {
+        "model_version": dep.version,
+        "micro_batching": dep.batcher.stats() if dep.batcher is not None else {"running": False},
+        "inference_executor": dep.executor.stats(),
+        "prediction_cache": dep.prediction_cache.stats() if dep.prediction_cache is not None else None,
+        "cascade": dep.serving.cascade.stats() if dep.serving.cascade is not None else None,
+        "retiring_deployments": len(retiring),
+        "fast_model_version": fast_model.version if fast_model is not None else None
+    }
+
+@app.get("/admin/model")
+async def admin_model(x_admin_token: Optional[str] = Header(None)):
+    """Currently served model and its warm-up self-test"""
+    _check_admin_token(x_admin_token)
+    if deployment is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    return deployment.serving.info()
+
+@app.get("/admin/shadow")
+async def admin_shadow(x_admin_token: Optional[str] = Header(None)):
+    """Challenger agreement with the champion on shadow-scored traffic"""
+    _check_admin_token(x_admin_token)
+    if shadow is None:
+        return {"running": False, "challengers": {}}
+    return shadow.summary()
+
+@app.post("/admin/reload", response_model=ReloadOutput)
+async def admin_reload(input_data: Optional[ReloadInput] = None, x_admin_token: Optional[str] = Header(None)):
+    """Load a registry model in the background and swap it in without dropping requests"""
+    _check_admin_token(x_admin_token)
+    if reload_lock.locked():
+        raise HTTPException(status_code=409, detail="A model reload is already in progress")
+    input_data = input_data or ReloadInput()
+    try:
+        return ReloadOutput(**await reload_model(input_data.model_name, input_data.version))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        current = deployment.version if deployment is not None else None
+        raise HTTPException(status_code=500, detail=f"Reload failed ({e}); still serving {current}")
+
 @app.post("/predict", response_model=PredictionOutput)
-async def predict_credit_risk(input_data: PredictionInput):
+async def predict_credit_risk(input_data: PredictionInput, background_tasks: BackgroundTasks):
     """Predict credit risk probability"""
     try:
-        if model is None:
-            raise HTTPException(status_code=503, detail="Model not loaded")
-        
-        # Convert features to dataframe
-        features_df = pd.DataFrame([input_data.features])
-        
-        # Ensure correct feature order
-        expected_features = [
-            'RevolvingUtilizationOfUnsecuredLines', 'age', 'NumberOfTime30-59DaysPastDueNotWorse',
-            'DebtRatio', 'MonthlyIncome', 'NumberOfOpenCreditLinesAndLoans', 
-            'NumberOfTimes90DaysLate', 'NumberRealEstateLoansOrLines',
-            'NumberOfTime60-89DaysPastDueNotWorse', 'NumberOfDependents'
-        ]
-        
-        # Reorder features to match training
-        features_ordered = features_df.reindex(columns=expected_features, fill_value=0)
-        
-        # Make prediction
-        probability = float(model.predict_proba(features_ordered)[0, 1])
-        
-        return PredictionOutput(probability=probability)
+        with _acquire() as dep:
+            # Make prediction (features are reordered to match training)
+            probability = await _score_single(dep, input_data.features)
+            if shadow is not None:
+                # Runs after the response is sent
+                background_tasks.add_task(shadow.submit, input_data.features, probability, dep.version, "/predict")
+            
+            return PredictionOutput(probability=probability, model_version=dep.version)
     
+    except (HTTPException, InferenceQueueFullError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
 
-@app.post("/agent", response_model=AgentOutput)
-async def agent_interaction(input_data: AgentInput):
-    """Agentic interaction for credit risk analysis"""
+@app.post("/predict/fast", response_model=PredictionOutput)
+async def predict_credit_risk_fast(input_data: PredictionInput):
+    """Predict with the distilled student: scored inline, no queue or batching delay"""
+    student = fast_model
+    if student is None:
+        raise HTTPException(status_code=503, detail="Fast model not loaded")
     try:
-        if credit_agent is None:
-            raise HTTPException(status_code=503, detail="Credit agent not loaded")
+        row = student.feature_schema.transform(input_data.features)
+        probability = float(student.predict_proba(row)[0])
+        return PredictionOutput(probability=probability, model_version=student.version)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+
+@app.post("/predict/batch", response_model=BatchPredictionOutput)
+async def predict_credit_risk_batch(input_data: BatchPredictionInput):
+    """Predict credit risk for many applicants with a single vectorized model call"""
+    n_applicants = len(input_data.applicants)
+    with _acquire() as dep:
+        if n_applicants > settings.MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch of {n_applicants} applicants exceeds MAX_BATCH_SIZE={settings.MAX_BATCH_SIZE}"
+            )
         
-        # Process the query through the agent
-        response = credit_agent.process_query(input_data.features, input_data.query)
+        try:
+            X = dep.serving.feature_schema.transform(input_data.applicants)
+            
+            # Single model call for the whole batch; rows keep input order
+            probabilities = await _score_matrix(dep, X)
+            risk_levels = get_risk_levels(probabilities)
+            
+            predictions = [
+                BatchPredictionItem(probability=float(p), risk_level=str(level))
+                for p, level in zip(probabilities, risk_levels)
+            ]
+            return BatchPredictionOutput(count=n_applicants, predictions=predictions, model_version=dep.version)
         
-        return AgentOutput(**response)
+        except InferenceQueueFullError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Batch prediction error: {str(e)}")
+
+@app.post("/agent", response_model=AgentOutput)
+async def agent_interaction(input_data: AgentInput, background_tasks: BackgroundTasks):
+    """Agentic interaction for credit risk analysis"""
+    try:
+        with _acquire("Credit agent not loaded") as dep:
+            # Score through the shared (micro-batched) path, then reason over the result
+            probability = await _score_single(dep, input_data.features)
+            if shadow is not None:
+                background_tasks.add_task(shadow.submit, input_data.features, probability, dep.version, "/agent")
+            response = await dep.run(dep.agent_fn, input_data.features, input_data.query, probability)
+            
+            return AgentOutput(**response, model_version=dep.version)
     
+    except (HTTPException, InferenceQueueFullError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Agent processing error: {str(e)}")
 
+@app.post("/agent/batch", response_model=AgentBatchOutput)
+async def agent_interaction_batch(input_data: AgentBatchInput):
+    """Agentic analysis for many applicants with shared inference and bulk risk rules"""
+    n_requests = len(input_data.requests)
+    with _acquire("Credit agent not loaded") as dep:
+        if n_requests > settings.MAX_AGENT_BATCH_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch of {n_requests} requests exceeds MAX_AGENT_BATCH_SIZE={settings.MAX_AGENT_BATCH_SIZE}"
+            )
+        
+        try:
+            requests = [(item.features, item.query) for item in input_data.requests]
+            X = dep.serving.feature_schema.transform([features for features, _ in requests])
+            probabilities = await _score_matrix(dep, X)
+            responses = await dep.run(dep.agent_batch_fn, requests, probabilities)
+            
+            return AgentBatchOutput(
+                count=n_requests,
+                results=[AgentOutput(**r, model_version=dep.version) for r in responses],
+                model_version=dep.version
+            )
+        
+        except InferenceQueueFullError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Agent batch processing error: {str(e)}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host=settings.HOST, port=settings.PORT)
\ No newline at end of file
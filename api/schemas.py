@@ -18,6 +18,7 @@ class PredictionInput(BaseModel):
 
 class PredictionOutput(BaseModel):
     probability: float = Field(..., ge=0, le=1, example=0.15)
+    model_version: Optional[str] = Field(None, example="3fa2b1c9d0e4")
 
 class AgentInput(BaseModel):
     features: Dict[str, Any] = Field(..., example={
@@ -45,4 +46,46 @@ class AgentOutput(BaseModel):
     ])
     risk_factors: List[str] = Field(..., example=["High credit utilization (50.0%)"])
     recommendations: List[str] = Field(..., example=["Recommend paying down credit card balances"])
-    tools_used: List[str] = Field(..., example=["risk_analysis", "scenario_simulation"])
\ No newline at end of file
+    tools_used: List[str] = Field(..., example=["risk_analysis", "scenario_simulation"])
+    model_version: Optional[str] = Field(None, example="3fa2b1c9d0e4")
+
+class BatchPredictionInput(BaseModel):
+    applicants: List[Dict[str, Any]] = Field(..., min_items=1, example=[{
+        "RevolvingUtilizationOfUnsecuredLines": 0.5,
+        "age": 35,
+        "NumberOfTime30-59DaysPastDueNotWorse": 0,
+        "DebtRatio": 0.3,
+        "MonthlyIncome": 5000,
+        "NumberOfOpenCreditLinesAndLoans": 5,
+        "NumberOfTimes90DaysLate": 0,
+        "NumberRealEstateLoansOrLines": 1,
+        "NumberOfTime60-89DaysPastDueNotWorse": 0,
+        "NumberOfDependents": 1
+    }])
+
+class BatchPredictionItem(BaseModel):
+    probability: float = Field(..., ge=0, le=1, example=0.15)
+    risk_level: str = Field(..., example="Medium Risk")
+
+class BatchPredictionOutput(BaseModel):
+    count: int = Field(..., example=1)
+    predictions: List[BatchPredictionItem]
+    model_version: Optional[str] = Field(None, example="3fa2b1c9d0e4")
+
+
+class AgentBatchInput(BaseModel):
+    requests: List[AgentInput] = Field(..., min_items=1)
+
+class AgentBatchOutput(BaseModel):
+    count: int = Field(..., example=1)
+    results: List[AgentOutput]
+    model_version: Optional[str] = Field(None, example="3fa2b1c9d0e4")
+
+class ReloadInput(BaseModel):
+    model_name: Optional[str] = Field(None, example="credit_scoring_model")
+    version: Optional[str] = Field(None, example="v3.0")
+
+class ReloadOutput(BaseModel):
+    status: str = Field(..., example="reloaded")
+    previous_version: Optional[str] = Field(None, example="3fa2b1c9d0e4")
+    model: Dict[str, Any]
@@ -1,6 +1,7 @@
 # config.py 
 import os
 from pathlib import Path
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -14,6 +15,8 @@ class Settings(BaseSettings):
     BASE_DIR: Path = Path(__file__).parent.absolute()
     DATA_PATH: Path = BASE_DIR / "data" / "raw"
     MODEL_PATH: Path = BASE_DIR / "models" / "trained_models"
+    DATA_CACHE_PATH: Path = BASE_DIR / "data" / "cache"
+    DATA_CACHE_ENABLED: bool = True
     
     # Model Settings
     TARGET_COLUMN: str = "SeriousDlqin2yrs"
@@ -21,6 +24,47 @@ class Settings(BaseSettings):
     TEST_SIZE: float = 0.2
     RANDOM_STATE: int = 42
     PROBLEM_TYPE: str = "classification"
+    TRAINING_CANDIDATES: List[str] = ["logistic", "random_forest", "lightgbm", "xgboost"]
+    TRAINING_WORKERS: int = 0  # 0 = one process per candidate, capped by CPU count
+    TRAINING_AUC_TOLERANCE: float = 0.0  # > 0: a faster compiled model within this AUC margin may win
+    TRAINING_SAMPLE_SIZE: int = 50000  # 0 = train on every row
+    TRAINING_SEARCH_ENABLED: bool = False
+    TRAINING_SEARCH_CONFIGS: int = 27
+    TRAINING_SEARCH_MIN_SAMPLES: int = 2000
+    TRAINING_CV_FOLDS: int = 0  # >= 2 selects models on stratified k-fold AUC
+    TRAINING_CASCADE_FIRST_STAGE: str = ""  # "logistic" or "shallow_forest"; "" = logistic only if CASCADE_ENABLED
+    
+    # Serving Settings
+    USE_COMPILED_MODEL: bool = True
+    ARTIFACT_VERIFY_CHECKSUM: bool = True
+    MAX_BATCH_SIZE: int = 10000
+    MAX_AGENT_BATCH_SIZE: int = 1000
+    MICROBATCH_ENABLED: bool = True
+    MICROBATCH_MAX_SIZE: int = 64
+    MICROBATCH_MAX_WAIT_MS: float = 2.0
+    INFERENCE_EXECUTOR: str = "thread"  # "thread" or "process"
+    INFERENCE_WORKERS: int = 4
+    INFERENCE_QUEUE_SIZE: int = 64
+    INFERENCE_RETRY_AFTER_S: int = 1
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_MAX_ENTRIES: int = 100000
+    PREDICTION_CACHE_TTL_S: float = 300.0
+    PREDICTION_CACHE_QUANTIZATION: Dict[str, float] = {}  # e.g. {"MonthlyIncome": 50}
+    SERVING_MODEL_NAME: str = "credit_scoring_model"  # registry name to serve; "" = latest registered
+    MODEL_RELOAD_POLL_S: float = 0.0  # > 0 watches the registry and hot-reloads new versions
+    MODEL_RELOAD_DRAIN_TIMEOUT_S: float = 30.0
+    CASCADE_ENABLED: bool = False  # cheap first stage answers confident rows (needs tune_cascade.py)
+    ADMIN_TOKEN: str = ""  # when set, /admin endpoints require the X-Admin-Token header
+    FAST_MODEL_NAME: str = "credit_scoring_model_student"  # distilled student served on /predict/fast; "" = off
+    SHADOW_CHALLENGERS: List[str] = []  # registry names (optionally "name@v3.0") scored in the background
+    SHADOW_SAMPLE_RATE: float = 0.1
+    SHADOW_CPU_BUDGET: float = 0.1  # share of one core the shadow thread may use
+    SHADOW_QUEUE_SIZE: int = 1000
+    SHADOW_LOG_PATH: Path = BASE_DIR / "logs" / "shadow_scores.jsonl"
+    
+    # Batch Scoring Settings
+    BATCH_SCORING_CHUNK_SIZE: int = 100000
+    BATCH_SCORING_WORKERS: int = 1
     
     class Config:
         env_file = ".env"
@@ -37,6 +81,8 @@ settings = Settings()
 settings.BASE_DIR = ensure_path(settings.BASE_DIR)
 settings.DATA_PATH = ensure_path(settings.DATA_PATH)
 settings.MODEL_PATH = ensure_path(settings.MODEL_PATH)
+settings.DATA_CACHE_PATH = ensure_path(settings.DATA_CACHE_PATH)
+settings.SHADOW_LOG_PATH = ensure_path(settings.SHADOW_LOG_PATH)
 
 print(f"🔧 Config paths (verified):")
 print(f"   BASE_DIR: {settings.BASE_DIR} (type: {type(settings.BASE_DIR)})")
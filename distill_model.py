@@ -0,0 +1,113 @@
+# distill_model.py
+import argparse
+import os
+import numpy as np
+from sklearn.model_selection import train_test_split
+from src.credit_data_processor import CreditDataProcessor
+from src.credit_scoring_model import CreditScoringModel, load_serving_model
+from src.distillation import STUDENT_MODELS, fidelity_report, fit_student, measure_latency
+from models.model_registry import ModelRegistry
+from config import settings
+
+def main():
+    """Distill the production model into a compact student for the fast serving tier"""
+    parser = argparse.ArgumentParser(description="Train a low-latency student on the teacher's probabilities")
+    parser.add_argument("--teacher", default=settings.SERVING_MODEL_NAME or None,
+                        help="Registered teacher model (default: SERVING_MODEL_NAME, else latest)")
+    parser.add_argument("--teacher-version", help="Teacher registry version (default: latest)")
+    parser.add_argument("--name", default=settings.FAST_MODEL_NAME, help="Registry name for the student")
+    parser.add_argument("--student", choices=list(STUDENT_MODELS), default="forest")
+    parser.add_argument("--data", default=os.path.join(settings.DATA_PATH, "training.csv"),
+                        help="Applicants to distill on (labels are only used to report AUC)")
+    parser.add_argument("--sample", type=int, default=100000, help="Rows to distill on (0 = all)")
+    parser.add_argument("--registry", default=str(settings.MODEL_PATH), help="Registry directory")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    teacher = args.teacher or registry.get_latest_model()
+    teacher_info = registry.get_model(teacher, args.teacher_version) if teacher else None
+    if teacher_info is None:
+        raise SystemExit(f"Teacher model '{teacher}' not found in registry; run main.py first")
+    teacher_path = os.path.abspath(teacher_info['model_path'])
+    teacher_model, _, feature_schema = load_serving_model(teacher_path, prefer_compiled=settings.USE_COMPILED_MODEL)
+    print(f"=== DISTILLING '{teacher}' ({teacher_info['version']}, {type(teacher_model).__name__}) "
+          f"INTO A {args.student.upper()} STUDENT ===")
+
+    processor = CreditDataProcessor(
+        target_column=settings.TARGET_COLUMN,
+        id_column=settings.ID_COLUMN,
+        cache_dir=settings.DATA_CACHE_PATH if settings.DATA_CACHE_ENABLED else None
+    )
+    df = processor.read_csv(args.data)
+    if args.sample and args.sample < len(df):
+        df = df.sample(args.sample, random_state=settings.RANDOM_STATE)
+    X = np.ascontiguousarray(feature_schema.transform_frame(df))
+    y = df[settings.TARGET_COLUMN].to_numpy() if settings.TARGET_COLUMN in df.columns else None
+    if y is not None and np.isnan(y.astype(np.float64)).any():
+        y = None
+
+    # Soft labels from the teacher; the holdout is only used for the report
+    soft_labels = teacher_model.predict_proba(X)[:, 1]
+    split = train_test_split(np.arange(len(X)), test_size=settings.TEST_SIZE, random_state=settings.RANDOM_STATE)
+    fit_idx, holdout_idx = split
+    student = fit_student(args.student, X[fit_idx], soft_labels[fit_idx], random_state=settings.RANDOM_STATE)
+    print(f"Student {type(student).__name__} fitted on {len(fit_idx):,} rows")
+
+    # Saved with the teacher's frozen schema so requests are imputed identically
+    student_path = registry.new_model_path(args.name)
+    trainer = CreditScoringModel(model_path=os.path.dirname(student_path))
+    trainer.model = student
+    trainer.feature_schema = feature_schema
+    trainer.feature_names = list(feature_schema.features)
+    trainer.parity_sample = X[holdout_idx][:1000]
+    trainer._update_feature_importance()
+    trainer.save_model(filename=student_path)
+
+    # Fidelity and latency of what is actually served (compiled scorers when available)
+    student_scorer, _, _ = load_serving_model(student_path, prefer_compiled=settings.USE_COMPILED_MODEL)
+    X_holdout = X[holdout_idx]
+    student_p = student_scorer.predict_proba(X_holdout)[:, 1]
+    report = fidelity_report(soft_labels[holdout_idx], student_p, y[holdout_idx] if y is not None else None)
+    teacher_latency = measure_latency(teacher_model, X_holdout)
+    student_latency = measure_latency(student_scorer, X_holdout)
+
+    print(f"\n📏 Fidelity on {len(holdout_idx):,} held-out rows:")
+    print(f"  Mean |probability diff|: {report['mean_abs_diff']:.4f} "
+          f"(p99 {report['p99_abs_diff']:.4f}, max {report['max_abs_diff']:.4f})")
+    print(f"  Rank correlation: {report['rank_correlation']:.4f}")
+    print(f"  Risk-level agreement: {report['risk_level_agreement']:.2%}")
+    if report['teacher_auc'] is not None:
+        print(f"  AUC: teacher {report['teacher_auc']:.4f}, student {report['student_auc']:.4f}")
+    print(f"\n⏱️ Latency        {'rows/s':>12} {'single (ms)':>12}")
+    for label, latency in (("teacher", teacher_latency), ("student", student_latency)):
+        print(f"  {label:<14} {latency['rows_per_s']:>12,.0f} {latency['single_row_ms']:>12.3f}")
+    speedup = teacher_latency['single_row_ms'] / student_latency['single_row_ms']
+    print(f"  Single-row speedup: {speedup:.1f}x")
+
+    performance = {
+        'fidelity_mean_abs_diff': report['mean_abs_diff'],
+        'fidelity_rank_correlation': report['rank_correlation'],
+        'fidelity_risk_level_agreement': report['risk_level_agreement'],
+        'single_row_ms': student_latency['single_row_ms'],
+    }
+    if report['student_auc'] is not None:
+        performance['auc_roc'] = report['student_auc']
+        performance['auc_roc_teacher'] = report['teacher_auc']
+    metadata = {
+        'model_type': type(student).__name__,
+        'role': 'distilled_student',
+        'student': args.student,
+        'teacher': teacher,
+        'teacher_version': teacher_info['version'],
+        'distilled_on': os.path.abspath(args.data),
+        'distillation_rows': int(len(fit_idx)),
+        'teacher_single_row_ms': teacher_latency['single_row_ms'],
+    }
+    info = registry.register_model(args.name, student_path, performance, trainer.feature_names, metadata,
+                                   parent=teacher, tags=['student'], parent_version=teacher_info['version'])
+
+    print(f"\n✅ Registered '{args.name}' ({info['version']}), distilled from '{teacher}' ({teacher_info['version']})")
+    print(f"Serve it on /predict/fast with FAST_MODEL_NAME={args.name}")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
 # main.py
 import os
-import pandas as pd
-import numpy as np
 from src.credit_data_processor import CreditDataProcessor
 from src.credit_scoring_model import CreditScoringModel
+from src.batch_scoring import score_csv
+from models.model_registry import ModelRegistry
 from config import settings
 
 def main():
@@ -15,7 +15,8 @@ def main():
     # Initialize credit data processor
     processor = CreditDataProcessor(
         target_column=settings.TARGET_COLUMN,
-        id_column=settings.ID_COLUMN
+        id_column=settings.ID_COLUMN,
+        cache_dir=settings.DATA_CACHE_PATH if settings.DATA_CACHE_ENABLED else None
     )
     
     # Load data
@@ -23,61 +24,76 @@ def main():
     test_path = os.path.join(settings.DATA_PATH, "testing.csv")
     
     print("Loading data...")
-    train_df, test_df = processor.load_data(train_path, test_path)
-    train_processed, test_processed = processor.preprocess_credit_data(train_df, test_df)
+    # Test data is not loaded here: it is scored in chunks after training
+    train_df, _ = processor.load_data(train_path)
+    train_processed, _ = processor.preprocess_credit_data(train_df)
     
     # Prepare features and target
     X_train = train_processed[processor.feature_columns]
     y_train = train_processed[settings.TARGET_COLUMN]
-    X_test = test_processed[processor.feature_columns]
     
     print(f"\n Dataset Summary:")
     print(f"Training data: {X_train.shape}")
-    print(f"Test data: {X_test.shape}")
     print(f"Default rate: {y_train.mean()*100:.2f}%")
     
     # Train model with sampling for stability
     print("\n=== TRAINING MODEL ===")
     model_trainer = CreditScoringModel()
     
-    # Use 50,000 samples for training (balanced between speed and performance)
-    results = model_trainer.train_model(X_train, y_train, sample_size=50000)
+    # Use 50,000 samples by default (balanced between speed and performance)
+    results = model_trainer.train_model(X_train, y_train, sample_size=settings.TRAINING_SAMPLE_SIZE or None,
+                                        preprocessor=processor.preprocessor,
+                                        candidates=settings.TRAINING_CANDIDATES,
+                                        max_workers=settings.TRAINING_WORKERS or None,
+                                        auc_tolerance=settings.TRAINING_AUC_TOLERANCE,
+                                        search=settings.TRAINING_SEARCH_ENABLED,
+                                        search_configs=settings.TRAINING_SEARCH_CONFIGS,
+                                        search_min_samples=settings.TRAINING_SEARCH_MIN_SAMPLES,
+                                        cv_folds=settings.TRAINING_CV_FOLDS,
+                                        first_stage=settings.TRAINING_CASCADE_FIRST_STAGE
+                                        or ("logistic" if settings.CASCADE_ENABLED else None))
     
-    # Save model
+    # Save model (each registered version gets its own file, so earlier versions stay loadable)
     print("\n=== SAVING MODEL ===")
-    model_trainer.save_model()
-    
-    # Generate predictions
-    print("\n=== GENERATING PREDICTIONS ===")
-    probabilities = model_trainer.predict_proba(X_test)
+    registry = ModelRegistry(model_trainer.model_path)
+    model_file = registry.new_model_path("credit_scoring_model")
+    model_trainer.save_model(filename=model_file)
     
-    # Create submission file
-    test_ids = test_processed[settings.ID_COLUMN]
-    submission_df = pd.DataFrame({
-        'ID': test_ids,
-        'Probability': probabilities
-    })
+    # Register it as the root of future incremental updates (see update_model.py)
+    metadata = {
+        'model_type': type(model_trainer.model).__name__,
+        'training_rows': int(len(X_train))
+    }
+    if settings.ID_COLUMN in train_processed.columns:
+        metadata['last_outcome_id'] = int(train_processed[settings.ID_COLUMN].max())
+    registry.register_model(
+        "credit_scoring_model",
+        model_file,
+        performance={'auc_roc': model_trainer.validation_auc},
+        features=model_trainer.feature_names,
+        metadata=metadata
+    )
     
+    # Generate predictions (streamed: imputation uses the frozen training statistics)
+    print("\n=== GENERATING PREDICTIONS ===")
     submission_path = os.path.join(settings.DATA_PATH, "submission.csv")
-    submission_df.to_csv(submission_path, index=False)
+    summary = score_csv(
+        test_path, submission_path,
+        model_path=model_file,
+        chunk_size=settings.BATCH_SCORING_CHUNK_SIZE,
+        workers=settings.BATCH_SCORING_WORKERS,
+        id_column=settings.ID_COLUMN
+    )
     print(f"Submission file saved to {submission_path}")
     
     # Detailed statistics
     print(f"\n PREDICTION ANALYSIS:")
-    print(f"Total predictions: {len(probabilities):,}")
-    print(f"Average probability: {probabilities.mean():.4f}")
+    print(f"Total predictions: {summary['rows']:,}")
+    print(f"Average probability: {summary['mean_probability']:.4f}")
     print(f"Risk distribution:")
     
-    risk_categories = [
-        (0.0, 0.1, "Low Risk"),
-        (0.1, 0.3, "Medium Risk"), 
-        (0.3, 0.7, "High Risk"),
-        (0.7, 1.0, "Very High Risk")
-    ]
-    
-    for low, high, category in risk_categories:
-        count = ((probabilities >= low) & (probabilities < high)).sum()
-        percentage = (count / len(probabilities)) * 100
+    for category, count in summary['risk_distribution'].items():
+        percentage = (count / summary['rows']) * 100 if summary['rows'] else 0.0
         print(f"  {category}: {count:>6,} applicants ({percentage:5.1f}%)")
     
     print(f"\n MODEL TRAINING SUCCESSFUL!")
@@ -1,90 +1,334 @@
 import joblib
-import pandas as pd
-import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import os
+import re
 from datetime import datetime
 import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Registry versions look like "v12.0" (the "v" and ".0" are optional on lookup)
+VERSION_PATTERN = re.compile(r'v?(\d+)(?:\.\d+)?')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    model_path TEXT NOT NULL,
+    features TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    parent_id INTEGER REFERENCES models (id),
+    registered_at TEXT NOT NULL,
+    last_updated TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_models_name ON models (name, id);
+CREATE TABLE IF NOT EXISTS metrics (
+    model_id INTEGER NOT NULL REFERENCES models (id),
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (model_id, metric)
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_metric ON metrics (metric, value);
+CREATE TABLE IF NOT EXISTS tags (
+    model_id INTEGER NOT NULL REFERENCES models (id),
+    tag TEXT NOT NULL,
+    PRIMARY KEY (model_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags (tag, model_id);
+"""
+
+# Latest registered version of each name
+LATEST_VERSIONS = "SELECT MAX(id) FROM models GROUP BY name"
 
 class ModelRegistry:
-    def __init__(self, registry_path: str = "./models/trained_models"):
+    """Model registry backed by SQLite.
+
+    Every ``register_model`` call inserts a new version inside a write transaction,
+    so concurrent training jobs get distinct, monotonically increasing versions
+    (``v<N>.0``). A name resolves to its latest version. Lookups by name, metric and
+    tag use indexes, and loaded artifacts are cached per version.
+
+    Registered versions are immutable: each must point at its own model file (see
+    ``new_model_path``), so pinned versions, challengers and lineage keep resolving
+    to the model that was registered.
+    """
+
+    def __init__(self, registry_path: str = "./models/trained_models", artifact_cache_size: int = 4):
         self.registry_path = registry_path
-        self.registry_file = os.path.join(registry_path, "model_registry.json")
-        self.registry = self._load_registry()
-    
-    def _load_registry(self) -> Dict[str, Any]:
-        """Load model registry from file"""
-        if os.path.exists(self.registry_file):
-            with open(self.registry_file, 'r') as f:
-                return json.load(f)
-        return {}
-    
-    def _save_registry(self):
-        """Save model registry to file"""
-        os.makedirs(os.path.dirname(self.registry_file), exist_ok=True)
-        with open(self.registry_file, 'w') as f:
-            json.dump(self.registry, f, indent=2)
-    
-    def register_model(self, 
-                      model_name: str, 
-                      model_path: str, 
-                      performance: Dict[str, float],
-                      features: list,
-                      metadata: Dict[str, Any] = None):
-        """Register a new model in the registry"""
-        model_info = {
-            'model_path': model_path,
+        self.registry_file = os.path.join(registry_path, "model_registry.json")  # legacy format
+        self.db_file = os.path.join(registry_path, "model_registry.db")
+        self.artifact_cache_size = artifact_cache_size
+        self._artifact_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        os.makedirs(registry_path, exist_ok=True)
+        with self._transaction() as conn:
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+        self._import_legacy_registry()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction holding SQLite's reserved lock, so writers are serialized across processes"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _read(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _import_legacy_registry(self):
+        """One-time import of a ``model_registry.json`` written by the old JSON registry"""
+        if not os.path.exists(self.registry_file):
+            return
+        with open(self.registry_file, 'r') as f:
+            legacy = json.load(f)
+        with self._transaction() as conn:
+            if conn.execute("SELECT COUNT(*) FROM models").fetchone()[0]:
+                return
+            for name, info in sorted(legacy.items(), key=lambda item: item[1].get('registered_at', '')):
+                # The JSON registry kept one entry per name, so a parent is its only version
+                parent_id = self._latest_id(conn, info['parent']) if info.get('parent') else None
+                self._insert(conn, name, info['model_path'], info.get('performance', {}),
+                             info.get('features', []), info.get('metadata', {}), parent_id,
+                             info.get('tags', []), info.get('registered_at'))
+        os.replace(self.registry_file, self.registry_file + ".imported")
+        print(f"Imported {len(legacy)} model(s) from {self.registry_file}")
+
+    def _insert(self, conn: sqlite3.Connection, model_name: str, model_path: str, performance: Dict[str, float],
+                features: list, metadata: Dict[str, Any], parent_id: Optional[int], tags: List[str],
+                registered_at: Optional[str] = None) -> int:
+        cursor = conn.execute(
+            "INSERT INTO models (name, model_path, features, metadata, parent_id, registered_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (model_name, model_path, json.dumps(list(features)), json.dumps(metadata or {}), parent_id,
+             registered_at or datetime.now().isoformat())
+        )
+        model_id = cursor.lastrowid
+        conn.executemany("INSERT INTO metrics (model_id, metric, value) VALUES (?, ?, ?)",
+                         [(model_id, k, float(v)) for k, v in (performance or {}).items() if v is not None])
+        conn.executemany("INSERT OR IGNORE INTO tags (model_id, tag) VALUES (?, ?)",
+                         [(model_id, tag) for tag in (tags or [])])
+        return model_id
+
+    def _latest_id(self, conn: sqlite3.Connection, model_name: str) -> Optional[int]:
+        row = conn.execute("SELECT MAX(id) FROM models WHERE name = ?", (model_name,)).fetchone()
+        return row[0]
+
+    def _version_id(self, conn: sqlite3.Connection, model_name: str, version: Optional[str]) -> Optional[int]:
+        """Row id of ``version`` of ``model_name`` (latest if None); None if unknown or malformed"""
+        if version is None:
+            return self._latest_id(conn, model_name)
+        match = VERSION_PATTERN.fullmatch(str(version).strip())
+        if match is None:
+            return None
+        row = conn.execute("SELECT id FROM models WHERE name = ? AND id = ?",
+                           (model_name, int(match.group(1)))).fetchone()
+        return row[0] if row else None
+
+    def _model_info(self, conn: sqlite3.Connection, model_id: int) -> Dict[str, Any]:
+        row = conn.execute("SELECT m.*, p.name AS parent FROM models m LEFT JOIN models p ON p.id = m.parent_id "
+                           "WHERE m.id = ?", (model_id,)).fetchone()
+        performance = {r['metric']: r['value'] for r in
+                       conn.execute("SELECT metric, value FROM metrics WHERE model_id = ?", (model_id,))}
+        tags = [r['tag'] for r in conn.execute("SELECT tag FROM tags WHERE model_id = ? ORDER BY tag", (model_id,))]
+        info = {
+            'model_path': row['model_path'],
             'performance': performance,
-            'features': features,
-            'metadata': metadata or {},
-            'registered_at': datetime.now().isoformat(),
-            'version': f"v{len(self.registry) + 1}.0"
+            'features': json.loads(row['features']),
+            'metadata': json.loads(row['metadata']),
+            'registered_at': row['registered_at'],
+            'version': f"v{row['id']}.0",
+            'parent': row['parent'],
+            'parent_version': f"v{row['parent_id']}.0" if row['parent_id'] is not None else None,
+            'tags': tags
         }
-        
-        self.registry[model_name] = model_info
-        self._save_registry()
-        print(f"Model '{model_name}' registered successfully")
-    
-    def get_model(self, model_name: str) -> Optional[Dict[str, Any]]:
-        """Get model information from registry"""
-        return self.registry.get(model_name)
-    
-    def load_model(self, model_name: str):
-        """Load a model from the registry"""
-        if model_name not in self.registry:
+        if row['last_updated']:
+            info['last_updated'] = row['last_updated']
+        return info
+
+    def register_model(self,
+                      model_name: str,
+                      model_path: str,
+                      performance: Dict[str, float],
+                      features: list,
+                      metadata: Dict[str, Any] = None,
+                      parent: Optional[str] = None,
+                      tags: List[str] = None,
+                      parent_version: Optional[str] = None) -> Dict[str, Any]:
+        """Register a new version of a model.
+
+        ``parent`` / ``parent_version`` name the version it was derived from (latest
+        ``parent`` version if no version is given); lineage links to that exact version.
+        """
+        with self._transaction() as conn:
+            parent_id = None
+            if parent is not None:
+                parent_id = self._version_id(conn, parent, parent_version)
+                if parent_id is None:
+                    raise ValueError(f"Parent model '{parent}' {parent_version or ''} not found in registry")
+            existing = conn.execute("SELECT name, id FROM models WHERE model_path IN (?, ?) LIMIT 1",
+                                    (model_path, os.path.abspath(model_path))).fetchone()
+            if existing is not None:
+                raise ValueError(f"{model_path} is already registered as '{existing['name']}' v{existing['id']}.0; "
+                                 f"save each version to its own file (see ModelRegistry.new_model_path)")
+            model_id = self._insert(conn, model_name, model_path, performance, features, metadata, parent_id, tags)
+            model_info = self._model_info(conn, model_id)
+        print(f"Model '{model_name}' registered successfully ({model_info['version']})")
+        return model_info
+
+    def new_model_path(self, model_name: str, filename: Optional[str] = None) -> str:
+        """Fresh location for a version about to be registered: ``versions/<name>/<timestamp>/<name>.pkl``.
+
+        Each version gets its own directory, so its compiled artifact, cascade first stage
+        and cutoffs (saved next to the pickle) are never overwritten by a later run.
+        """
+        base = os.path.join(os.path.abspath(self.registry_path), "versions", model_name)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        for attempt in range(100):
+            version_dir = os.path.join(base, stamp if attempt == 0 else f"{stamp}_{attempt}")
+            try:
+                os.makedirs(version_dir)
+            except FileExistsError:
+                continue
+            return os.path.join(version_dir, filename or f"{model_name}.pkl")
+        raise RuntimeError(f"Could not create a version directory under {base}")
+
+    def model_file(self, model_name: Optional[str] = None, version: Optional[str] = None) -> Optional[str]:
+        """Model file of a registered version (latest of ``model_name``, else the latest model), or None"""
+        model_name = model_name or self.get_latest_model()
+        info = self.get_model(model_name, version) if model_name else None
+        return info['model_path'] if info is not None else None
+
+    def get_model(self, model_name: str, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get model information from registry (latest version unless ``version`` is given).
+
+        Returns None for unknown names and for versions that do not parse (e.g. "vx").
+        """
+        with self._read() as conn:
+            model_id = self._version_id(conn, model_name, version)
+            return self._model_info(conn, model_id) if model_id is not None else None
+
+    def load_model(self, model_name: str, version: Optional[str] = None):
+        """Load a model from the registry (cached per version and file modification time)"""
+        info = self.get_model(model_name, version)
+        if info is None:
             raise ValueError(f"Model '{model_name}' not found in registry")
-        
-        model_path = self.registry[model_name]['model_path']
+
+        model_path = info['model_path']
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found: {model_path}")
-        
-        return joblib.load(model_path)
-    
+
+        key = (info['version'], os.path.abspath(model_path), os.stat(model_path).st_mtime_ns)
+        with self._cache_lock:
+            if key in self._artifact_cache:
+                self._artifact_cache.move_to_end(key)
+                return self._artifact_cache[key]
+
+        loaded = joblib.load(model_path)
+        with self._cache_lock:
+            self._artifact_cache[key] = loaded
+            while len(self._artifact_cache) > self.artifact_cache_size:
+                self._artifact_cache.popitem(last=False)
+        return loaded
+
+    def get_lineage(self, model_name: str, version: Optional[str] = None) -> List[Tuple[str, str]]:
+        """(name, version) pairs from a version (latest if None) back to its original full training run"""
+        lineage = []
+        with self._read() as conn:
+            model_id = self._version_id(conn, model_name, version)
+            if model_id is None:
+                raise ValueError(f"Model '{model_name}' {version or ''} not found in registry")
+            # Parents are registered first, so ids strictly decrease along the chain
+            while model_id is not None:
+                row = conn.execute("SELECT name, parent_id FROM models WHERE id = ?", (model_id,)).fetchone()
+                lineage.append((row['name'], f"v{model_id}.0"))
+                model_id = row['parent_id']
+        return lineage
+
+    def get_latest_model(self) -> Optional[str]:
+        """Most recently registered model"""
+        with self._read() as conn:
+            row = conn.execute("SELECT name FROM models ORDER BY id DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
     def list_models(self) -> Dict[str, Any]:
-        """List all registered models"""
-        return self.registry
-    
+        """List all registered models (latest version of each name)"""
+        with self._read() as conn:
+            ids = [r[0] for r in conn.execute(f"SELECT id FROM models WHERE id IN ({LATEST_VERSIONS}) ORDER BY id")]
+            infos = [(conn.execute("SELECT name FROM models WHERE id = ?", (i,)).fetchone()[0], self._model_info(conn, i))
+                     for i in ids]
+        return dict(infos)
+
+    def list_versions(self, model_name: str) -> List[Dict[str, Any]]:
+        """Every registered version of a model, oldest first"""
+        with self._read() as conn:
+            ids = [r[0] for r in conn.execute("SELECT id FROM models WHERE name = ? ORDER BY id", (model_name,))]
+            return [self._model_info(conn, i) for i in ids]
+
+    def find_models(self, tag: Optional[str] = None, metric: Optional[str] = None,
+                    min_value: Optional[float] = None) -> List[str]:
+        """Names whose latest version has ``tag`` and/or ``metric`` >= ``min_value`` (best metric first)"""
+        query = f"SELECT m.name FROM models m"
+        conditions, params = [f"m.id IN ({LATEST_VERSIONS})"], []
+        if tag is not None:
+            query += " JOIN tags t ON t.model_id = m.id"
+            conditions.append("t.tag = ?")
+            params.append(tag)
+        if metric is not None:
+            query += " JOIN metrics p ON p.model_id = m.id"
+            conditions.append("p.metric = ?")
+            params.append(metric)
+            if min_value is not None:
+                conditions.append("p.value >= ?")
+                params.append(min_value)
+        query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY p.value DESC" if metric is not None else " ORDER BY m.id"
+        with self._read() as conn:
+            return [r[0] for r in conn.execute(query, params)]
+
     def get_best_model(self, metric: str = 'auc_roc') -> str:
         """Get the best performing model based on a metric"""
-        if not self.registry:
-            return None
-        
-        best_model = None
-        best_score = -1
-        
-        for model_name, info in self.registry.items():
-            score = info['performance'].get(metric, -1)
-            if score > best_score:
-                best_score = score
-                best_model = model_name
-        
-        return best_model
-    
+        names = self.find_models(metric=metric)
+        return names[0] if names else None
+
+    def add_tags(self, model_name: str, tags: List[str]):
+        """Tag the latest version of a model"""
+        with self._transaction() as conn:
+            model_id = self._latest_id(conn, model_name)
+            if model_id is None:
+                raise ValueError(f"Model '{model_name}' not found in registry")
+            conn.executemany("INSERT OR IGNORE INTO tags (model_id, tag) VALUES (?, ?)",
+                             [(model_id, tag) for tag in tags])
+
     def update_model_performance(self, model_name: str, performance: Dict[str, float]):
         """Update model performance metrics"""
-        if model_name in self.registry:
-            self.registry[model_name]['performance'].update(performance)
-            self.registry[model_name]['last_updated'] = datetime.now().isoformat()
-            self._save_registry()
-        else:
-            raise ValueError(f"Model '{model_name}' not found in registry")
\ No newline at end of file
+        with self._transaction() as conn:
+            model_id = self._latest_id(conn, model_name)
+            if model_id is None:
+                raise ValueError(f"Model '{model_name}' not found in registry")
+            conn.executemany("INSERT OR REPLACE INTO metrics (model_id, metric, value) VALUES (?, ?, ?)",
+                             [(model_id, k, float(v)) for k, v in performance.items()])
+            conn.execute("UPDATE models SET last_updated = ? WHERE id = ?", (datetime.now().isoformat(), model_id))
@@ -0,0 +1,39 @@
+# score_batch.py
+import argparse
+import os
+from src.batch_scoring import score_csv
+from models.model_registry import ModelRegistry
+from config import settings
+
+def main():
+    """Stream-score a large applicant CSV with the trained model"""
+    parser = argparse.ArgumentParser(description="Score a CSV of applicants in bounded-memory chunks")
+    parser.add_argument("input", help="CSV with the model's feature columns (and optionally the id column)")
+    parser.add_argument("output", help="Output CSV (ID, Probability)")
+    parser.add_argument("--model", help="Path to the pickled model (its .artifact directory is used when present; "
+                                         "default: the registered SERVING_MODEL_NAME version)")
+    parser.add_argument("--chunk-size", type=int, default=settings.BATCH_SCORING_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=settings.BATCH_SCORING_WORKERS)
+    parser.add_argument("--no-compiled", action="store_true", help="Score with the sklearn model")
+    args = parser.parse_args()
+    args.model = args.model or ModelRegistry(str(settings.MODEL_PATH)).model_file(settings.SERVING_MODEL_NAME or None) \
+        or os.path.join(settings.MODEL_PATH, "credit_scoring_model.pkl")
+
+    print(f"📂 Scoring {args.input} in chunks of {args.chunk_size:,} rows ({args.workers} worker(s))")
+    summary = score_csv(
+        args.input, args.output, args.model,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        prefer_compiled=not args.no_compiled and settings.USE_COMPILED_MODEL,
+        id_column=settings.ID_COLUMN
+    )
+
+    print(f"✅ Scored {summary['rows']:,} rows in {summary['chunks']} chunk(s), "
+          f"{summary['elapsed_s']:.1f}s ({summary['rows_per_s'] or 0:,.0f} rows/s)")
+    print(f"Average probability: {summary['mean_probability'] or 0:.4f}")
+    for category, count in summary['risk_distribution'].items():
+        print(f"  {category}: {count:>8,}")
+    print(f"Results saved to {summary['output_path']}")
+
+if __name__ == "__main__":
+    main()
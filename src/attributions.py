@@ -0,0 +1,52 @@
+# src/attributions.py
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .compiled_forest import CompiledForest
+from .feature_schema import FeatureSchema
+from .linear_scorer import LinearScorer
+
+
+class FeatureAttributor:
+    """Per-applicant additive feature contributions for forest and logistic models.
+
+    Forests use path-based contributions in probability space (each split's change in
+    node value is credited to its feature); logistic models use exact ``coef * value``
+    contributions in log-odds space. sklearn models are converted once at construction.
+    """
+
+    def __init__(self, explainer, feature_schema: Optional[FeatureSchema] = None):
+        self.explainer = explainer
+        self.feature_schema = feature_schema or FeatureSchema.default()
+        self.space = 'log_odds' if isinstance(explainer, LinearScorer) else 'probability'
+
+    @classmethod
+    def for_model(cls, model, feature_schema: Optional[FeatureSchema] = None) -> Optional["FeatureAttributor"]:
+        """Attributor for ``model``, or None if the model type is not supported"""
+        if isinstance(model, (CompiledForest, LinearScorer)):
+            return cls(model, feature_schema)
+        try:
+            if CompiledForest.supports(model):
+                return cls(CompiledForest.from_sklearn(model), feature_schema)
+            if LinearScorer.supports(model):
+                return cls(LinearScorer.from_sklearn(model), feature_schema)
+        except ImportError:
+            pass
+        return None
+
+    def attribute(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(bias, contributions)`` for a schema-ordered feature matrix"""
+        return self.explainer.contributions(X)
+
+    def top_contributions(self, X: np.ndarray, k: int = 3) -> List[List[Tuple[str, float]]]:
+        """The ``k`` features with the largest absolute contribution for each row"""
+        _, contributions = self.attribute(X)
+        k = min(k, contributions.shape[1])
+        top = np.argsort(-np.abs(contributions), axis=1, kind='stable')[:, :k]
+        features = self.feature_schema.features
+        return [[(features[j], float(contributions[i, j])) for j in row] for i, row in enumerate(top)]
+
+    def format_contribution(self, contribution: float) -> str:
+        if self.space == 'probability':
+            return f"{contribution * 100:+.1f} pts"
+        return f"{contribution:+.2f} log-odds"
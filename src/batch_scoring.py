@@ -0,0 +1,134 @@
+# src/batch_scoring.py
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .credit_agent import RISK_LEVELS, RISK_LEVEL_CUTOFFS
+from .credit_scoring_model import load_serving_model
+from .feature_schema import FeatureSchema
+
+# Per-process model state for pool workers (set by _init_worker)
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(model_path: str, prefer_compiled: bool = True):
+    model, _, feature_schema = load_serving_model(model_path, prefer_compiled=prefer_compiled)
+    _WORKER_STATE['model'] = model
+    _WORKER_STATE['feature_schema'] = feature_schema
+
+
+def _score_frame(model, feature_schema: FeatureSchema, df: pd.DataFrame) -> np.ndarray:
+    X = feature_schema.transform_frame(df)
+    return np.asarray(model.predict_proba(X)[:, 1], dtype=np.float64)
+
+
+def _worker_score_frame(df: pd.DataFrame) -> np.ndarray:
+    return _score_frame(_WORKER_STATE['model'], _WORKER_STATE['feature_schema'], df)
+
+
+class StreamingScorer:
+    """Score a CSV of any size in fixed-size chunks with bounded memory.
+
+    Each chunk is read with only the id and feature columns, imputed with the
+    schema defaults (the statistics frozen at training time), scored and appended
+    to the output file, so peak memory depends on ``chunk_size`` and not on the
+    file. With ``workers > 1`` chunks are scored on a process pool that loads the
+    artifact once per worker; at most ``2 * workers`` chunks are in flight and
+    results are written in input order.
+    """
+
+    def __init__(self, model_path: str, prefer_compiled: bool = True, chunk_size: int = 100_000,
+                 workers: int = 1, id_column: str = "Unnamed: 0", output_id_column: str = "ID"):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.model_path = str(model_path)
+        self.prefer_compiled = prefer_compiled
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.id_column = id_column
+        self.output_id_column = output_id_column
+        self.model, _, self.feature_schema = load_serving_model(self.model_path, prefer_compiled=prefer_compiled)
+
+    def _read_chunks(self, input_path: str) -> Iterator[pd.DataFrame]:
+        header = pd.read_csv(input_path, nrows=0).columns
+        usecols = [c for c in header if c == self.id_column or c in self.feature_schema.index]
+        dtype = {f: np.float32 for f in self.feature_schema.features if f in usecols}
+        return pd.read_csv(input_path, usecols=usecols, dtype=dtype, chunksize=self.chunk_size)
+
+    def _scored_chunks(self, chunks: Iterator[pd.DataFrame]) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+        if self.workers == 1:
+            for chunk in chunks:
+                yield chunk, _score_frame(self.model, self.feature_schema, chunk)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.model_path, self.prefer_compiled)) as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                # Only the id column stays in this process; features go to the worker
+                ids = chunk[[self.id_column]] if self.id_column in chunk.columns else chunk.iloc[:, :0]
+                in_flight.append((ids, pool.submit(_worker_score_frame, chunk)))
+                if len(in_flight) >= 2 * self.workers:
+                    ids, future = in_flight.popleft()
+                    yield ids, future.result()
+            while in_flight:
+                ids, future = in_flight.popleft()
+                yield ids, future.result()
+
+    def score_csv(self, input_path: str, output_path: str) -> Dict[str, Any]:
+        """Score ``input_path`` into ``output_path`` (ID, Probability) and return run statistics"""
+        start = time.perf_counter()
+        tmp_path = f"{output_path}.partial"
+        rows = 0
+        chunks = 0
+        probability_sum = 0.0
+        risk_counts = np.zeros(len(RISK_LEVELS), dtype=np.int64)
+
+        try:
+            with open(tmp_path, "w", newline="") as out:
+                for chunk, probabilities in self._scored_chunks(self._read_chunks(input_path)):
+                    if self.id_column in chunk.columns:
+                        ids = chunk[self.id_column].to_numpy()
+                    else:
+                        ids = np.arange(rows, rows + len(probabilities))
+                    pd.DataFrame({self.output_id_column: ids, 'Probability': probabilities}).to_csv(
+                        out, header=chunks == 0, index=False)
+
+                    rows += len(probabilities)
+                    chunks += 1
+                    probability_sum += float(probabilities.sum())
+                    risk_counts += np.bincount(np.searchsorted(RISK_LEVEL_CUTOFFS, probabilities, side='right'),
+                                               minlength=len(RISK_LEVELS))
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        elapsed = time.perf_counter() - start
+        return {
+            "rows": rows,
+            "chunks": chunks,
+            "chunk_size": self.chunk_size,
+            "workers": self.workers,
+            "mean_probability": probability_sum / rows if rows else None,
+            "risk_distribution": dict(zip(RISK_LEVELS.tolist(), risk_counts.tolist())),
+            "elapsed_s": elapsed,
+            "rows_per_s": rows / elapsed if elapsed > 0 else None,
+            "output_path": str(output_path),
+        }
+
+
+def score_csv(input_path: str, output_path: str, model_path: str, chunk_size: int = 100_000,
+              workers: int = 1, prefer_compiled: bool = True, id_column: str = "Unnamed: 0") -> Dict[str, Any]:
+    """Stream-score a CSV file with the model saved at ``model_path``"""
+    scorer = StreamingScorer(model_path, prefer_compiled=prefer_compiled, chunk_size=chunk_size,
+                             workers=workers, id_column=id_column)
+    return scorer.score_csv(input_path, output_path)
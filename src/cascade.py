@@ -0,0 +1,194 @@
+# src/cascade.py
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from .compiled_forest import CompiledForest
+from .credit_agent import RISK_LEVEL_CUTOFFS
+from .linear_scorer import LinearScorer
+from .model_artifact import ARTIFACT_SUFFIX, artifact_kind, load_artifact
+
+# Outer risk band edges: below LOW_EDGE is Low Risk, at or above HIGH_EDGE is Very High Risk
+LOW_EDGE = float(RISK_LEVEL_CUTOFFS[0])
+HIGH_EDGE = float(RISK_LEVEL_CUTOFFS[-1])
+
+
+def first_stage_artifact_path(model_path: str) -> str:
+    """Artifact directory of the cheap first-stage scorer saved next to a pickled model"""
+    root, _ = os.path.splitext(str(model_path))
+    return root + ".first_stage" + ARTIFACT_SUFFIX
+
+
+def cascade_config_path(model_path: str) -> str:
+    """Tuned cascade cutoffs written by ``tune_cascade.py``"""
+    root, _ = os.path.splitext(str(model_path))
+    return root + ".cascade.json"
+
+
+class CascadeScorer:
+    """Two-stage scorer: a cheap first stage answers confident rows, the full model the rest.
+
+    Rows whose first-stage probability is below ``low_cutoff`` (<= the Low Risk edge) or
+    at/above ``high_cutoff`` (>= the Very High Risk edge) keep the first-stage score;
+    only the uncertain middle band is sent to ``full_model``. ``score`` returns how many
+    rows went to the full model so a caller in another process can ``record`` them.
+    """
+
+    def __init__(self, first_stage, full_model, low_cutoff: float, high_cutoff: float):
+        if low_cutoff > LOW_EDGE or high_cutoff < HIGH_EDGE:
+            raise ValueError(f"Cascade cutoffs must lie outside the risk bands ({LOW_EDGE}, {HIGH_EDGE})")
+        self.first_stage = first_stage
+        self.full_model = full_model
+        self.low_cutoff = float(low_cutoff)
+        self.high_cutoff = float(high_cutoff)
+        self.tag = hashlib.sha1(f"{self.low_cutoff!r}:{self.high_cutoff!r}".encode()).hexdigest()[:6]
+        self._rows = 0
+        self._full_rows = 0
+        self._lock = threading.Lock()
+
+    @property
+    def feature_names(self):
+        return getattr(self.full_model, 'feature_names', None)
+
+    def score(self, X) -> Tuple[np.ndarray, int]:
+        """(positive-class probabilities, number of rows scored by the full model); not counted in ``stats``"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        probabilities = np.asarray(self.first_stage.predict_proba(X)[:, 1], dtype=np.float64)
+        uncertain = (probabilities >= self.low_cutoff) & (probabilities < self.high_cutoff)
+        n_uncertain = int(uncertain.sum())
+        if n_uncertain:
+            probabilities[uncertain] = self.full_model.predict_proba(X[uncertain])[:, 1]
+        return probabilities, n_uncertain
+
+    def record(self, n_rows: int, n_full_rows: int):
+        """Count rows scored (possibly in a worker process) towards ``stats``"""
+        with self._lock:
+            self._rows += n_rows
+            self._full_rows += n_full_rows
+
+    def predict_positive(self, X) -> np.ndarray:
+        probabilities, n_uncertain = self.score(X)
+        self.record(len(probabilities), n_uncertain)
+        return probabilities
+
+    def predict_proba(self, X) -> np.ndarray:
+        positive = self.predict_positive(X)
+        return np.column_stack([1.0 - positive, positive])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows, full_rows = self._rows, self._full_rows
+        return {
+            "low_cutoff": self.low_cutoff,
+            "high_cutoff": self.high_cutoff,
+            "rows": rows,
+            "full_model_rows": full_rows,
+            "first_stage_share": 1 - full_rows / rows if rows else None,
+        }
+
+
+def tune_cutoffs(first_stage_probabilities: np.ndarray, full_probabilities: np.ndarray,
+                 target_agreement: float = 0.99, grid_size: int = 200) -> Dict[str, Any]:
+    """Cutoffs that let the first stage answer the most rows while the cascade's risk level
+    matches the full model's on at least ``target_agreement`` of the rows.
+
+    A row answered by the first stage below ``low_cutoff`` is called Low Risk, so it
+    disagrees only if the full model scores it at or above the Low Risk edge (and likewise
+    for the Very High Risk side); both sides are searched over a quantile grid.
+    """
+    p1 = np.asarray(first_stage_probabilities, dtype=np.float64)
+    p2 = np.asarray(full_probabilities, dtype=np.float64)
+    n = len(p1)
+    if n == 0:
+        raise ValueError("No rows to tune the cascade on")
+
+    low_grid = np.unique(np.concatenate([
+        [0.0, LOW_EDGE], np.quantile(p1[p1 < LOW_EDGE], np.linspace(0, 1, grid_size)) if (p1 < LOW_EDGE).any() else []
+    ]))
+    high_grid = np.unique(np.concatenate([
+        [HIGH_EDGE, np.inf], np.quantile(p1[p1 >= HIGH_EDGE], np.linspace(0, 1, grid_size)) if (p1 >= HIGH_EDGE).any() else []
+    ]))
+
+    # Rows covered and disagreements for each cutoff, from sorted first-stage scores
+    order = np.argsort(p1, kind="stable")
+    p1_sorted = p1[order]
+    low_disagree_cum = np.concatenate([[0], np.cumsum(p2[order] >= LOW_EDGE)])
+    high_disagree_cum = np.concatenate([[0], np.cumsum((p2[order] < HIGH_EDGE)[::-1])])
+    low_cover = np.searchsorted(p1_sorted, low_grid, side="left")
+    high_cover = n - np.searchsorted(p1_sorted, high_grid, side="left")
+    low_disagree = low_disagree_cum[low_cover]
+    high_disagree = high_disagree_cum[high_cover]
+
+    cover = low_cover[:, None] + high_cover[None, :]
+    disagree = low_disagree[:, None] + high_disagree[None, :]
+    allowed = disagree <= (1 - target_agreement) * n
+    # Most coverage, then fewest disagreements; (0, inf) always qualifies
+    score = np.where(allowed, cover * (n + 1) - disagree, -1)
+    i, j = np.unravel_index(np.argmax(score), score.shape)
+
+    answered = (p1 < low_grid[i]) | (p1 >= high_grid[j])
+    return {
+        "low_cutoff": float(low_grid[i]),
+        "high_cutoff": float(high_grid[j]),
+        "target_agreement": target_agreement,
+        "agreement": 1 - int(disagree[i, j]) / n,
+        "first_stage_share": int(cover[i, j]) / n,
+        "low_share": int(low_cover[i]) / n,
+        "high_share": int(high_cover[j]) / n,
+        "mean_abs_diff_answered": float(np.abs(p1 - p2)[answered].mean()) if answered.any() else None,
+        "rows": n,
+    }
+
+
+def expected_saving(first_stage_share: float, first_stage_cost: float, full_cost: float) -> float:
+    """Expected fraction of full-model compute saved: 1 - (c1 + (1 - share) * c2) / c2"""
+    if full_cost <= 0:
+        return 0.0
+    return 1 - (first_stage_cost + (1 - first_stage_share) * full_cost) / full_cost
+
+
+def load_first_stage(model_path: str, prefer_compiled: bool = True, verify_checksum: bool = True):
+    """First-stage scorer saved with a model (memory-mapped artifact, else the pickle), or None"""
+    fast_path = first_stage_artifact_path(model_path)
+    if prefer_compiled and os.path.isdir(fast_path):
+        arrays, _ = load_artifact(fast_path, mmap=True, verify_checksum=verify_checksum)
+        kind = artifact_kind(arrays)
+        return LinearScorer.from_arrays(arrays) if kind == 'linear' else CompiledForest.from_arrays(arrays)
+    return joblib.load(model_path).get('first_stage_model')
+
+
+def save_cascade_config(model_path: str, config: Dict[str, Any]) -> str:
+    path = cascade_config_path(model_path)
+    config = {**config, "tuned_at": datetime.now().isoformat()}
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_cascade(model_path: str, full_model, model_version: str, prefer_compiled: bool = True,
+                 verify_checksum: bool = True) -> Optional[CascadeScorer]:
+    """Cascade for a loaded model, or None if it has no first stage or tuned cutoffs for ``model_version``"""
+    config_path = cascade_config_path(model_path)
+    if not os.path.exists(config_path):
+        print(f"⚠️ No tuned cascade cutoffs at {config_path} (run tune_cascade.py); serving the full model only")
+        return None
+    with open(config_path) as f:
+        config = json.load(f)
+    if config.get("model_version") != model_version:
+        print(f"⚠️ Cascade cutoffs were tuned for model {config.get('model_version')}, not {model_version}; ignoring them")
+        return None
+    first_stage = load_first_stage(model_path, prefer_compiled, verify_checksum)
+    if first_stage is None:
+        print("⚠️ Model has no first-stage scorer; serving the full model only")
+        return None
+    return CascadeScorer(first_stage, full_model, config["low_cutoff"], config["high_cutoff"])
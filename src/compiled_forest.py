@@ -0,0 +1,214 @@
+# src/compiled_forest.py
+import numpy as np
+import sklearn
+from typing import Dict, Any, List, Optional
+
+# sklearn >= 1.4 stores class fractions in tree_.value and predict_proba returns them as is;
+# older versions store weighted counts and normalize them in predict_proba
+TREE_VALUES_ARE_FRACTIONS = tuple(int(p) for p in sklearn.__version__.split('.')[:2]) >= (1, 4)
+
+
+class CompiledForest:
+    """Flat-array form of a fitted sklearn random forest for low-overhead scoring.
+
+    All trees are concatenated into one node table (feature, threshold, left/right
+    child, positive-class leaf probability). Leaves point to themselves, so scoring
+    is a fixed number of vectorized steps that advance every (row, tree) pair one
+    level at a time. Per-tree probabilities are accumulated in tree order and divided
+    by the number of trees, exactly as ``RandomForestClassifier.predict_proba`` does.
+    """
+
+    ARRAY_FIELDS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, value: np.ndarray, roots: np.ndarray, max_depth: int,
+                 n_features: int, missing_go_to_left: Optional[np.ndarray] = None,
+                 feature_names: Optional[List[str]] = None, chunk_size: int = 8192):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.missing_go_to_left = missing_go_to_left
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.chunk_size = chunk_size
+        self.classes_ = np.array([0, 1])
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @staticmethod
+    def supports(model) -> bool:
+        """Whether ``model`` is a fitted binary sklearn forest classifier we can compile"""
+        from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+        return (isinstance(model, (RandomForestClassifier, ExtraTreesClassifier))
+                and hasattr(model, 'estimators_')
+                and getattr(model, 'n_outputs_', 1) == 1
+                and len(model.classes_) == 2)
+
+    @classmethod
+    def from_sklearn(cls, forest, feature_names: Optional[List[str]] = None) -> "CompiledForest":
+        """Compile a fitted ``RandomForestClassifier`` / ``ExtraTreesClassifier``"""
+        if not cls.supports(forest):
+            raise ValueError(f"Cannot compile {type(forest).__name__}: expected a fitted binary forest classifier")
+
+        features, thresholds, lefts, rights, values, missing, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            # Leaves loop back to themselves so extra traversal steps are no-ops
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+            feature = np.where(is_leaf, 0, tree.feature)
+            threshold = np.where(is_leaf, 0.0, tree.threshold)
+
+            # Same arithmetic as DecisionTreeClassifier.predict_proba (bit-for-bit)
+            class_values = tree.value[:, 0, :]
+            if TREE_VALUES_ARE_FRACTIONS:
+                positive = class_values[:, 1].copy()
+            else:
+                normalizer = class_values.sum(axis=1)
+                normalizer[normalizer == 0.0] = 1.0
+                positive = class_values[:, 1] / normalizer
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(positive)
+            if hasattr(tree, 'missing_go_to_left'):
+                missing.append(np.asarray(tree.missing_go_to_left, dtype=bool))
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        if feature_names is None and hasattr(forest, 'feature_names_in_'):
+            feature_names = list(forest.feature_names_in_)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            n_features=forest.n_features_in_,
+            missing_go_to_left=np.concatenate(missing) if len(missing) == len(roots) else None,
+            feature_names=feature_names
+        )
+
+    def _as_matrix(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the compiled forest expects {self.n_features}")
+        return X
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node index (into the flat node table) for every (row, tree) pair"""
+        X = self._as_matrix(X)
+        leaves = np.empty((X.shape[0], self.n_trees), dtype=np.int32)
+        for start in range(0, X.shape[0], self.chunk_size):
+            leaves[start:start + self.chunk_size] = self._traverse(X[start:start + self.chunk_size])
+        return leaves
+
+    def _traverse(self, X: np.ndarray) -> np.ndarray:
+        X_flat = np.ascontiguousarray(X).ravel()
+        row_offsets = (np.arange(X.shape[0], dtype=np.int64) * self.n_features)[:, None]
+        nodes = np.tile(self.roots, (X.shape[0], 1))
+        for _ in range(self.max_depth):
+            x = np.take(X_flat, row_offsets + np.take(self.feature, nodes))
+            go_left = x <= np.take(self.threshold, nodes)
+            if self.missing_go_to_left is not None:
+                go_left |= np.isnan(x) & np.take(self.missing_go_to_left, nodes)
+            nodes = np.where(go_left, np.take(self.left, nodes), np.take(self.right, nodes))
+        return nodes
+
+    def predict_positive(self, X) -> np.ndarray:
+        """Probability of the positive class, shape (n_rows,)"""
+        leaf_values = self.value[self.apply(X)]
+        proba = np.zeros(leaf_values.shape[0], dtype=np.float64)
+        # Accumulate tree by tree to reproduce sklearn's summation order
+        for t in range(self.n_trees):
+            proba += leaf_values[:, t]
+        proba /= self.n_trees
+        return proba
+
+    def contributions(self, X):
+        """Path-based per-feature contributions to the positive-class probability.
+
+        Every split a row passes through moves the node value from parent to child;
+        that change is credited to the split feature. Averaged over trees this gives
+        ``bias + contributions.sum(axis=1) == predict_positive(X)`` (up to rounding),
+        where ``bias`` is the mean root value. Returns ``(bias, contributions)`` with
+        shapes (n_rows,) and (n_rows, n_features).
+        """
+        X = self._as_matrix(X)
+        n_rows = X.shape[0]
+        contributions = np.empty((n_rows, self.n_features), dtype=np.float64)
+        for start in range(0, n_rows, self.chunk_size):
+            chunk = X[start:start + self.chunk_size]
+            contributions[start:start + len(chunk)] = self._chunk_contributions(chunk)
+        bias = np.full(n_rows, self.value[self.roots].mean())
+        return bias, contributions
+
+    def _chunk_contributions(self, X: np.ndarray) -> np.ndarray:
+        n_rows = X.shape[0]
+        X_flat = np.ascontiguousarray(X).ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int64) * self.n_features)[:, None]
+        totals = np.zeros(n_rows * self.n_features, dtype=np.float64)
+        nodes = np.tile(self.roots, (n_rows, 1))
+        for _ in range(self.max_depth):
+            split_feature = np.take(self.feature, nodes)
+            x = np.take(X_flat, row_offsets + split_feature)
+            go_left = x <= np.take(self.threshold, nodes)
+            if self.missing_go_to_left is not None:
+                go_left |= np.isnan(x) & np.take(self.missing_go_to_left, nodes)
+            children = np.where(go_left, np.take(self.left, nodes), np.take(self.right, nodes))
+            # Leaves loop to themselves, so their delta is exactly zero
+            delta = np.take(self.value, children) - np.take(self.value, nodes)
+            totals += np.bincount((row_offsets + split_feature).ravel(), weights=delta.ravel(),
+                                  minlength=totals.size)
+            nodes = children
+        return totals.reshape(n_rows, self.n_features) / self.n_trees
+
+    def predict_proba(self, X) -> np.ndarray:
+        """sklearn-compatible (n_rows, 2) class probabilities"""
+        positive = self.predict_positive(X)
+        return np.column_stack([1.0 - positive, positive])
+
+    def to_arrays(self) -> Dict[str, Any]:
+        arrays = {name: getattr(self, name) for name in self.ARRAY_FIELDS}
+        arrays['kind'] = np.array('forest')
+        arrays['meta'] = np.array([self.max_depth, self.n_features], dtype=np.int64)
+        if self.missing_go_to_left is not None:
+            arrays['missing_go_to_left'] = self.missing_go_to_left
+        if self.feature_names is not None:
+            arrays['feature_names'] = np.array(self.feature_names)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "CompiledForest":
+        max_depth, n_features = (int(v) for v in arrays['meta'])
+        return cls(
+            **{name: np.asarray(arrays[name]) for name in cls.ARRAY_FIELDS},
+            max_depth=max_depth,
+            n_features=n_features,
+            missing_go_to_left=np.asarray(arrays['missing_go_to_left']) if 'missing_go_to_left' in arrays else None,
+            feature_names=[str(f) for f in arrays['feature_names']] if 'feature_names' in arrays else None
+        )
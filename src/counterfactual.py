@@ -0,0 +1,152 @@
+# src/counterfactual.py
+import itertools
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+
+from .feature_schema import FeatureSchema
+
+# Actionable features: (feature, direction, max relative change, cost per unit of relative change).
+# Income is costed higher than paying down balances because it is harder to move.
+ACTIONABLE_FEATURES = [
+    ('RevolvingUtilizationOfUnsecuredLines', -1, 1.0, 1.0),
+    ('DebtRatio', -1, 1.0, 1.0),
+    ('MonthlyIncome', +1, 1.0, 1.5),
+]
+
+
+class CounterfactualSearch:
+    """Find the cheapest change to actionable features that brings an applicant below a target risk.
+
+    Candidate moves form a grid of relative changes (e.g. utilization -0%..-100%,
+    income +0%..+100%) whose cost is the weighted sum of the changes. Candidates are
+    scored in cost order, in vectorized batches, until one reaches the target; the
+    winner is then refined on a finer grid. ``max_evaluations`` caps the number of
+    rows sent to the model so latency stays bounded.
+    """
+
+    def __init__(self, model, feature_schema: Optional[FeatureSchema] = None,
+                 actionable_features: List[tuple] = None, grid_step: float = 0.1,
+                 batch_size: int = 256, max_evaluations: int = 2048):
+        self.model = model
+        self.feature_schema = feature_schema or FeatureSchema.default()
+        self.actionable = [a for a in (actionable_features or ACTIONABLE_FEATURES)
+                           if a[0] in self.feature_schema.index]
+        self.grid_step = grid_step
+        self.batch_size = batch_size
+        self.max_evaluations = max_evaluations
+
+        self._columns = np.array([self.feature_schema.index[a[0]] for a in self.actionable], dtype=np.intp)
+        self._directions = np.array([a[1] for a in self.actionable], dtype=np.float64)
+        self._weights = np.array([a[3] for a in self.actionable], dtype=np.float64)
+
+        # Coarse grid of relative changes, sorted by cost so the first feasible batch holds the optimum
+        levels = [np.round(np.arange(0.0, a[2] + grid_step / 2, grid_step), 10) for a in self.actionable]
+        grid = np.array(list(itertools.product(*levels)), dtype=np.float64)[1:]  # drop the no-change point
+        costs = grid @ self._weights
+        order = np.lexsort((np.count_nonzero(grid, axis=1), costs))
+        self._grid, self._grid_costs = grid[order], costs[order]
+
+    def _apply(self, base_row: np.ndarray, changes: np.ndarray) -> np.ndarray:
+        X = np.repeat(base_row.reshape(1, -1), len(changes), axis=0)
+        base_values = base_row[self._columns].astype(np.float64)
+        X[:, self._columns] = np.maximum(0.0, base_values * (1.0 + self._directions * changes))
+        return X
+
+    def _score(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict_proba(X)[:, 1], dtype=np.float64)
+
+    def search(self, features: Dict[str, Any], target_probability: float = 0.1) -> Dict[str, Any]:
+        base_row = self.feature_schema.transform(features)[0]
+        base_probability = float(self._score(base_row.reshape(1, -1))[0])
+        evaluations = 1
+
+        result = {
+            "target_probability": target_probability,
+            "base_probability": base_probability,
+            "achievable": base_probability < target_probability,
+            "probability": base_probability,
+            "cost": 0.0,
+            "changes": {},
+            "evaluations": evaluations,
+        }
+        if result["achievable"]:
+            return result
+
+        best: Optional[Tuple[np.ndarray, float, float]] = None      # cheapest feasible (changes, cost, prob)
+        fallback: Optional[Tuple[np.ndarray, float, float]] = None  # lowest probability seen
+        for start in range(0, len(self._grid), self.batch_size):
+            budget = self.max_evaluations - evaluations
+            if budget <= 0:
+                break
+            changes = self._grid[start:start + min(self.batch_size, budget)]
+            costs = self._grid_costs[start:start + len(changes)]
+            probabilities = self._score(self._apply(base_row, changes))
+            evaluations += len(changes)
+
+            lowest = int(np.argmin(probabilities))
+            if fallback is None or probabilities[lowest] < fallback[2]:
+                fallback = (changes[lowest], costs[lowest], probabilities[lowest])
+
+            feasible = np.flatnonzero(probabilities < target_probability)
+            if len(feasible):
+                i = feasible[0]  # batch is cost-sorted
+                best = (changes[i], costs[i], probabilities[i])
+                break
+
+        if best is not None:
+            best, evaluations = self._refine(base_row, best, target_probability, evaluations)
+            chosen = best
+        else:
+            chosen = fallback
+
+        if chosen is not None:
+            changes, cost, probability = chosen
+            result.update({
+                "achievable": best is not None,
+                "probability": float(probability),
+                "cost": float(cost),
+                "changes": self._describe(base_row, changes),
+            })
+        result["evaluations"] = evaluations
+        return result
+
+    def _refine(self, base_row: np.ndarray, best: Tuple[np.ndarray, float, float],
+                target_probability: float, evaluations: int):
+        """Shrink each non-zero change on a finer grid, keeping the cheapest feasible point"""
+        changes, _, _ = best
+        fine_step = self.grid_step / 5
+        candidates = []
+        for j in np.flatnonzero(changes):
+            for value in np.arange(max(0.0, changes[j] - self.grid_step) + fine_step, changes[j], fine_step):
+                candidate = changes.copy()
+                candidate[j] = round(float(value), 10)
+                candidates.append(candidate)
+
+        budget = self.max_evaluations - evaluations
+        if not candidates or budget <= 0:
+            return best, evaluations
+        candidates = np.array(candidates[:budget])
+        probabilities = self._score(self._apply(base_row, candidates))
+        evaluations += len(candidates)
+
+        costs = candidates @ self._weights
+        feasible = np.flatnonzero(probabilities < target_probability)
+        if len(feasible):
+            i = feasible[np.argmin(costs[feasible])]
+            if costs[i] < best[1]:
+                best = (candidates[i], costs[i], probabilities[i])
+        return best, evaluations
+
+    def _describe(self, base_row: np.ndarray, changes: np.ndarray) -> Dict[str, Dict[str, float]]:
+        described = {}
+        new_row = self._apply(base_row, changes.reshape(1, -1))[0]
+        for k, column in enumerate(self._columns):
+            if changes[k] == 0:
+                continue
+            feature = self.actionable[k][0]
+            described[feature] = {
+                "from": float(base_row[column]),
+                "to": float(new_row[column]),
+                "relative_change": float(self._directions[k] * changes[k]),
+            }
+        return described
@@ -1,96 +1,173 @@
 import pandas as pd  
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from .credit_agent_tools import CreditAgentTools
+from .feature_schema import FeatureSchema
+
+# Upper probability bound of each risk level (the last level is open-ended)
+RISK_LEVEL_CUTOFFS = np.array([0.1, 0.3, 0.7])
+RISK_LEVELS = np.array(["Low Risk", "Medium Risk", "High Risk", "Very High Risk"])
+
+def get_risk_levels(probabilities: np.ndarray) -> np.ndarray:
+    """Vectorized probability -> risk level mapping (same bands as CreditAgent._get_risk_level)"""
+    return RISK_LEVELS[np.searchsorted(RISK_LEVEL_CUTOFFS, probabilities, side='right')]
 
 class CreditAgent:
-    def __init__(self, model, feature_importance: pd.DataFrame = None):
+    def __init__(self, model, feature_importance: pd.DataFrame = None, feature_schema: FeatureSchema = None):
         self.model = model
-        self.tools = CreditAgentTools(feature_importance)
+        self.feature_schema = feature_schema or FeatureSchema.default()
+        self.tools = CreditAgentTools(feature_importance, self.feature_schema, model)
     
-    def process_query(self, features: Dict[str, Any], query: str) -> Dict[str, Any]:
-        """Process agentic queries with reasoning for credit decisions"""
+    def process_query(self, features: Dict[str, Any], query: str, probability: float = None) -> Dict[str, Any]:
+        """Process agentic queries with reasoning for credit decisions.
+        
+        ``probability`` may be supplied when the caller has already scored the
+        applicant (e.g. through the API micro-batcher) to skip the model call.
+        """
         try:
-            # Convert features to DataFrame for prediction
-            features_df = self._features_to_dataframe(features)
-            
-            # Get base probability
-            probability = float(self.model.predict_proba(features_df)[0, 1])
-            
-            # Initialize response
-            response = {
-                "probability": probability,
-                "risk_level": self._get_risk_level(probability),
-                "reasoning": [],
-                "risk_factors": [],
-                "recommendations": [],
-                "tools_used": []
-            }
+            if probability is None:
+                # Convert features to a float32 row for prediction
+                features_row = self._features_to_array(features)
+                
+                # Get base probability
+                probability = float(self.model.predict_proba(features_row)[0, 1])
             
             # Analyze risk factors
-            risk_factors = self.tools.analyze_risk_factors(features, probability)
-            response["risk_factors"] = risk_factors
-            response["tools_used"].append("risk_analysis")
-            
-            # Generate reasoning steps
-            response["reasoning"].append(f"Initial assessment: {probability:.1%} probability of serious delinquency")
-            response["reasoning"].append(f"Risk classification: {response['risk_level']}")
+            risk_codes, risk_factors = self.tools.assess_risk(features)
             
-            if risk_factors:
-                response["reasoning"].append("Key risk factors identified:")
-                for risk in risk_factors:
-                    response["reasoning"].append(f"  • {risk}")
-            
-            # Feature explanations
-            feature_explanations = self.tools.get_feature_explanations(features)
-            if feature_explanations:
-                response["reasoning"].append("Most influential factors:")
-                for explanation in feature_explanations:
-                    response["reasoning"].append(f"  • {explanation}")
+            recommendations = None
+            if self._wants_recommendations(query):
+                recommendations = self.tools.generate_recommendations(risk_codes, probability)
             
-            # Handle specific queries
-            query_lower = query.lower()
-            
-            if "what if" in query_lower:
-                scenario_result = self.tools.simulate_scenario(features, query)
-                if scenario_result["modified_feature"]:
-                    response["reasoning"].append(f"Scenario analysis: {scenario_result['scenario']}")
-                    response["tools_used"].append("scenario_simulation")
-            
-            if "recommend" in query_lower or "improve" in query_lower or "suggest" in query_lower:
-                recommendations = self.tools.generate_recommendations(risk_factors, probability)
-                response["recommendations"] = recommendations
-                response["reasoning"].append("Personalized recommendations generated")
-            
-            if "explain" in query_lower:
-                response["reasoning"].append("Detailed explanation provided based on feature importance and risk factors")
-            
-            return response
+            return self._build_response(features, query, probability, self._get_risk_level(probability),
+                                        risk_factors, recommendations)
             
         except Exception as e:
-            # Return error information for debugging
-            return {
-                "probability": 0.0,
-                "risk_level": "Error",
-                "reasoning": [f"Error processing query: {str(e)}"],
-                "risk_factors": [],
-                "recommendations": [],
-                "tools_used": ["error_handling"]
-            }
+            return self._error_response(e)
     
-    def _features_to_dataframe(self, features: Dict[str, Any]):
-        """Convert features dict to DataFrame with correct column order"""
-        # Expected features 
-        expected_features = [
-            'RevolvingUtilizationOfUnsecuredLines', 'age', 'NumberOfTime30-59DaysPastDueNotWorse',
-            'DebtRatio', 'MonthlyIncome', 'NumberOfOpenCreditLinesAndLoans', 
-            'NumberOfTimes90DaysLate', 'NumberRealEstateLoansOrLines',
-            'NumberOfTime60-89DaysPastDueNotWorse', 'NumberOfDependents'
-        ]
+    def process_batch(self, requests: List[Tuple[Dict[str, Any], str]],
+                      probabilities: np.ndarray = None) -> List[Dict[str, Any]]:
+        """Process many (features, query) pairs with one model call and bulk rule evaluation"""
+        try:
+            records = [features for features, _ in requests]
+            X = self.feature_schema.transform(records)
+            if probabilities is None:
+                probabilities = self.model.predict_proba(X)[:, 1]
+            probabilities = np.asarray(probabilities, dtype=np.float64)
+            risk_levels = get_risk_levels(probabilities)
+            masks, _, risk_factors = self.tools.assess_risk_batch(X, self.feature_schema.missing_mask(records))
+            recommendations = self.tools.generate_recommendations_batch(masks, probabilities)
+            explanations = self.tools.get_feature_explanations_batch(X, records)
+        except Exception as e:
+            return [self._error_response(e) for _ in requests]
         
-        # Create DataFrame with correct column order
-        features_ordered = {feature: features.get(feature, 0) for feature in expected_features}
-        return pd.DataFrame([features_ordered])
+        responses = []
+        for i, (features, query) in enumerate(requests):
+            try:
+                responses.append(self._build_response(
+                    features, query, float(probabilities[i]), str(risk_levels[i]), risk_factors[i],
+                    recommendations[i] if self._wants_recommendations(query) else None,
+                    explanations[i]
+                ))
+            except Exception as e:
+                responses.append(self._error_response(e))
+        return responses
+    
+    def _build_response(self, features: Dict[str, Any], query: str, probability: float, risk_level: str,
+                        risk_factors: List[str], recommendations: List[str] = None,
+                        feature_explanations: List[str] = None) -> Dict[str, Any]:
+        """Assemble reasoning steps and tool outputs for one applicant"""
+        # Initialize response
+        response = {
+            "probability": probability,
+            "risk_level": risk_level,
+            "reasoning": [],
+            "risk_factors": risk_factors,
+            "recommendations": [],
+            "tools_used": ["risk_analysis"]
+        }
+        
+        # Generate reasoning steps
+        response["reasoning"].append(f"Initial assessment: {probability:.1%} probability of serious delinquency")
+        response["reasoning"].append(f"Risk classification: {risk_level}")
+        
+        if risk_factors:
+            response["reasoning"].append("Key risk factors identified:")
+            for risk in risk_factors:
+                response["reasoning"].append(f"  • {risk}")
+        
+        # Feature explanations (per-applicant contributions when available)
+        if feature_explanations is None:
+            feature_explanations = self.tools.get_feature_explanations(features)
+        if feature_explanations:
+            response["reasoning"].append("Most influential factors:")
+            for explanation in feature_explanations:
+                response["reasoning"].append(f"  • {explanation}")
+        
+        # Handle specific queries
+        query_lower = query.lower()
+        
+        if "what if" in query_lower:
+            scenario_result = self.tools.simulate_scenario(features, query)
+            if scenario_result["modified_feature"]:
+                response["reasoning"].append(f"Scenario analysis: {scenario_result['scenario']}")
+                for result in scenario_result["results"]:
+                    if "probability" not in result:
+                        continue
+                    level_change = (f"{scenario_result['base_risk_level']} → {result['risk_level']}"
+                                    if result["risk_level_changed"] else f"{result['risk_level']} (unchanged)")
+                    response["reasoning"].append(
+                        f"  • {result['scenario']}: {result['probability']:.1%} "
+                        f"({result['delta'] * 100:+.1f} pts), {level_change}"
+                    )
+                response["tools_used"].append("scenario_simulation")
+        
+        if recommendations is not None:
+            response["recommendations"] = list(recommendations)
+            response["reasoning"].append("Personalized recommendations generated")
+        
+        if self._wants_counterfactual(query) and self.tools.counterfactual is not None:
+            counterfactual = self.tools.find_counterfactual(features)
+            summary = self.tools.describe_counterfactual(counterfactual)
+            response["reasoning"].append(f"Counterfactual analysis: {summary}")
+            if counterfactual["changes"] and counterfactual["achievable"]:
+                response["recommendations"].append(summary)
+            response["tools_used"].append("counterfactual_search")
+        
+        if "explain" in query_lower:
+            basis = "per-applicant feature contributions" if self.tools.attributor is not None else "feature importance"
+            response["reasoning"].append(f"Detailed explanation provided based on {basis} and risk factors")
+        
+        return response
+    
+    @staticmethod
+    def _wants_recommendations(query: str) -> bool:
+        query_lower = query.lower()
+        return "recommend" in query_lower or "improve" in query_lower or "suggest" in query_lower
+    
+    @staticmethod
+    def _wants_counterfactual(query: str) -> bool:
+        query_lower = query.lower()
+        return any(phrase in query_lower for phrase in (
+            "smallest change", "what would it take", "how can i reach", "how do i reach",
+            "reach low risk", "get to low risk", "counterfactual", "minimum change"
+        ))
+    
+    @staticmethod
+    def _error_response(error: Exception) -> Dict[str, Any]:
+        # Return error information for debugging
+        return {
+            "probability": 0.0,
+            "risk_level": "Error",
+            "reasoning": [f"Error processing query: {str(error)}"],
+            "risk_factors": [],
+            "recommendations": [],
+            "tools_used": ["error_handling"]
+        }
+    
+    def _features_to_array(self, features: Dict[str, Any]) -> np.ndarray:
+        """Convert features dict to a (1, n_features) float32 array with correct column order"""
+        return self.feature_schema.transform(features)
     
     def _get_risk_level(self, probability: float) -> str:
         """Convert probability to risk level"""
@@ -1,17 +1,27 @@
 # src/credit_agent_tools.py
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
-import joblib
+from typing import Dict, List, Any, Optional, Tuple
+from .feature_schema import FeatureSchema
+from .risk_rules import RiskRuleEngine
+from .what_if import WhatIfEngine, FEATURE_LABELS, RATIO_FEATURES
+from .counterfactual import CounterfactualSearch
+from .attributions import FeatureAttributor
 
 class CreditAgentTools:
-    def __init__(self, feature_importance: pd.DataFrame = None):
+    def __init__(self, feature_importance: pd.DataFrame = None, feature_schema: FeatureSchema = None, model=None):
         self.feature_importance = feature_importance
+        self.feature_schema = feature_schema or FeatureSchema.default()
+        self.model = model
         self.risk_thresholds = {
             'low': 0.1,
             'medium': 0.3, 
             'high': 0.7
         }
+        self.rule_engine = RiskRuleEngine(self.feature_schema, high_probability=self.risk_thresholds['high'])
+        self.what_if = WhatIfEngine(model, self.feature_schema)
+        self.counterfactual = CounterfactualSearch(model, self.feature_schema) if model is not None else None
+        self.attributor = FeatureAttributor.for_model(model, self.feature_schema) if model is not None else None
         
         self.feature_descriptions = {
             'RevolvingUtilizationOfUnsecuredLines': 'Credit card utilization rate (ideal: <0.3)',
@@ -25,109 +35,124 @@ class CreditAgentTools:
             'NumberOfTime60-89DaysPastDueNotWorse': '60-89 days late payments (ideal: 0)',
             'NumberOfDependents': 'Number of dependents'
         }
+        
+        # Top features are the same for every applicant, so resolve them once
+        self.top_features = []
+        if self.feature_importance is not None:
+            for _, row in self.feature_importance.head(3).iterrows():
+                feature = row['feature']
+                self.top_features.append(
+                    (feature, row['importance'], self.feature_descriptions.get(feature, feature))
+                )
     
     def analyze_risk_factors(self, features: Dict[str, Any], probability: float) -> List[str]:
         """Analyze specific risk factors for a borrower"""
-        risk_factors = []
-        
-        # Credit utilization analysis
-        utilization = features.get('RevolvingUtilizationOfUnsecuredLines', 0)
-        if utilization > 0.8:
-            risk_factors.append(f"Very high credit utilization ({utilization:.1%})")
-        elif utilization > 0.5:
-            risk_factors.append(f"High credit utilization ({utilization:.1%})")
-        
-        # Late payments analysis
-        late_90_days = features.get('NumberOfTimes90DaysLate', 0)
-        if late_90_days > 0:
-            risk_factors.append(f"Has {late_90_days} serious late payment(s) (90+ days)")
-        
-        late_60_days = features.get('NumberOfTime60-89DaysPastDueNotWorse', 0)
-        if late_60_days > 0:
-            risk_factors.append(f"Has {late_60_days} late payment(s) (60-89 days)")
-        
-        late_30_days = features.get('NumberOfTime30-59DaysPastDueNotWorse', 0)
-        if late_30_days > 0:
-            risk_factors.append(f"Has {late_30_days} late payment(s) (30-59 days)")
-        
-        # Debt ratio analysis
-        debt_ratio = features.get('DebtRatio', 0)
-        if debt_ratio > 0.5:
-            risk_factors.append(f"High debt ratio ({debt_ratio:.1%})")
-        
-        # Age analysis
-        age = features.get('age', 0)
-        if age < 25:
-            risk_factors.append("Young applicant with limited credit history")
-        elif age > 70:
-            risk_factors.append("Older applicant near retirement")
-        
-        # Income analysis
-        income = features.get('MonthlyIncome', 0)
-        if income < 2000:
-            risk_factors.append("Low monthly income")
-        
+        _, risk_factors = self.assess_risk(features)
         return risk_factors
     
-    def generate_recommendations(self, risk_factors: List[str], probability: float) -> List[str]:
-        """Generate personalized recommendations"""
-        recommendations = []
-        
-        if probability > 0.7:
-            recommendations.append("Consider requiring a co-signer")
-            recommendations.append("Suggest smaller loan amount")
-        
-        if "credit utilization" in str(risk_factors).lower():
-            recommendations.append("Recommend paying down credit card balances")
-            recommendations.append("Suggest credit utilization below 30%")
-        
-        if "late payment" in str(risk_factors).lower():
-            recommendations.append("Focus on improving payment history")
-            recommendations.append("Consider automatic payment setup")
-        
-        if "debt ratio" in str(risk_factors).lower():
-            recommendations.append("Recommend debt consolidation")
-            recommendations.append("Suggest increasing income or reducing expenses")
-        
-        if not recommendations:
-            recommendations.append("Application meets standard criteria")
-        
-        return recommendations
+    def assess_risk(self, features: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        """Structured risk codes and human-readable risk factors for one borrower"""
+        _, codes, risk_factors = self.rule_engine.assess(self.feature_schema.transform(features),
+                                                         self.feature_schema.missing_mask(features))
+        return codes[0], risk_factors[0]
+    
+    def assess_risk_batch(self, X: np.ndarray, missing: Optional[np.ndarray] = None
+                          ) -> Tuple[np.ndarray, List[List[str]], List[List[str]]]:
+        """Rule masks, risk codes and risk factors for a schema-ordered feature matrix
+        (``missing``: unreported fields, see ``FeatureSchema.missing_mask``)"""
+        return self.rule_engine.assess(X, missing)
+    
+    def generate_recommendations(self, risk_codes: List[str], probability: float) -> List[str]:
+        """Generate personalized recommendations from risk codes"""
+        masks = np.isin(self.rule_engine.codes, risk_codes).reshape(1, -1)
+        return self.rule_engine.recommendations(masks, [probability])[0]
+    
+    def generate_recommendations_batch(self, masks: np.ndarray, probabilities: np.ndarray) -> List[List[str]]:
+        """Recommendations for a batch of borrowers from their rule masks"""
+        return self.rule_engine.recommendations(masks, probabilities)
     
     def simulate_scenario(self, features: Dict[str, Any], scenario: str) -> Dict[str, Any]:
-        """Simulate what-if scenarios"""
-        modified_features = features.copy()
+        """Simulate what-if scenarios, re-scoring every variant in one model call.
+        
+        Supports single changes ("income +20%", "reduce debt ratio to 0.2") and
+        sweeps ("income from -30% to +50% in 5% steps").
+        """
+        scenarios = self.what_if.parse(scenario)
+        if not scenarios:
+            return {"scenario": "Unknown scenario", "modified_feature": None, "modified_value": None,
+                    "base_probability": None, "results": []}
+        
+        evaluation = self.what_if.evaluate(features, scenarios)
+        first = evaluation["results"][0]
+        modified_feature, modified_value = next(iter(first["changes"].items()))
+        return {
+            "scenario": first["scenario"] if len(scenarios) == 1 else f"{len(scenarios)} scenarios",
+            "modified_feature": modified_feature,
+            "modified_value": modified_value,
+            "base_probability": evaluation["base_probability"],
+            "base_risk_level": evaluation["base_risk_level"],
+            "results": evaluation["results"]
+        }
+    
+    def find_counterfactual(self, features: Dict[str, Any], target_probability: float = None) -> Dict[str, Any]:
+        """Smallest change to utilization, debt ratio and income that gets below ``target_probability``
+        (defaults to the Low Risk cutoff)"""
+        if self.counterfactual is None:
+            raise ValueError("Counterfactual search needs a model")
+        if target_probability is None:
+            target_probability = self.risk_thresholds['low']
+        return self.counterfactual.search(features, target_probability)
+    
+    def describe_counterfactual(self, result: Dict[str, Any]) -> str:
+        """One-line, quantified summary of a counterfactual search result"""
+        if not result["changes"]:
+            if result["achievable"]:
+                return f"Already below the {result['target_probability']:.0%} target"
+            return "No actionable change found"
+        
+        moves = []
+        for feature, change in result["changes"].items():
+            verb = "increase" if change["relative_change"] > 0 else "reduce"
+            if feature in RATIO_FEATURES:
+                old, new = f"{change['from']:.1%}", f"{change['to']:.1%}"
+            else:
+                old, new = f"${change['from']:,.0f}", f"${change['to']:,.0f}"
+            moves.append(f"{verb} {FEATURE_LABELS.get(feature, feature)} from {old} to {new}")
+        
+        if result["achievable"]:
+            return (f"To get below {result['target_probability']:.0%} risk: " + ", ".join(moves)
+                    + f" (estimated {result['probability']:.1%})")
+        return (f"Target of {result['target_probability']:.0%} not reachable with actionable features; "
+                f"best found: " + ", ".join(moves) + f" (estimated {result['probability']:.1%})")
+    
+    def get_feature_explanations(self, features: Dict[str, Any]) -> List[str]:
+        """Generate feature-based explanations.
         
-        if "income" in scenario.lower():
-            if "20%" in scenario:
-                current_income = features.get('MonthlyIncome', 0)
-                modified_features['MonthlyIncome'] = current_income * 1.2
-                return {"scenario": "20% income increase", "modified_feature": "MonthlyIncome", "modified_value": current_income * 1.2}
+        Uses this applicant's own feature contributions when the model supports them,
+        otherwise the global feature importance.
+        """
+        if self.attributor is not None:
+            return self.get_feature_explanations_batch(self.feature_schema.transform(features), [features])[0]
         
-        elif "debt" in scenario.lower():
-            if "reduce" in scenario.lower():
-                current_debt_ratio = features.get('DebtRatio', 0)
-                modified_features['DebtRatio'] = max(0, current_debt_ratio * 0.7)
-                return {"scenario": "30% debt reduction", "modified_feature": "DebtRatio", "modified_value": current_debt_ratio * 0.7}
+        explanations = []
         
-        elif "utilization" in scenario.lower():
-            current_utilization = features.get('RevolvingUtilizationOfUnsecuredLines', 0)
-            modified_features['RevolvingUtilizationOfUnsecuredLines'] = max(0, current_utilization * 0.5)
-            return {"scenario": "50% credit utilization reduction", "modified_feature": "RevolvingUtilizationOfUnsecuredLines", "modified_value": current_utilization * 0.5}
+        for feature, importance, description in self.top_features:
+            value = features.get(feature, 'N/A')
+            explanations.append(f"**{feature}** (importance: {importance:.3f}): {value} - {description}")
         
-        return {"scenario": "Unknown scenario", "modified_feature": None, "modified_value": None}
+        return explanations
     
-    def get_feature_explanations(self, features: Dict[str, Any]) -> List[str]:
-        """Generate feature-based explanations"""
-        explanations = []
-        
-        if self.feature_importance is not None:
-            top_features = self.feature_importance.head(3)
-            for _, row in top_features.iterrows():
-                feature = row['feature']
-                importance = row['importance']
-                value = features.get(feature, 'N/A')
-                description = self.feature_descriptions.get(feature, feature)
-                explanations.append(f"**{feature}** (importance: {importance:.3f}): {value} - {description}")
+    def get_feature_explanations_batch(self, X: np.ndarray, features_list: List[Dict[str, Any]],
+                                       top_k: int = 3) -> List[List[str]]:
+        """Per-applicant top contributions for a whole batch in one vectorized pass"""
+        if self.attributor is None:
+            return [self.get_feature_explanations(features) for features in features_list]
         
+        explanations = []
+        for features, top in zip(features_list, self.attributor.top_contributions(X, top_k)):
+            explanations.append([
+                f"**{feature}** (contribution: {self.attributor.format_contribution(contribution)}): "
+                f"{features.get(feature, 'N/A')} - {self.feature_descriptions.get(feature, feature)}"
+                for feature, contribution in top
+            ])
         return explanations
\ No newline at end of file
@@ -1,15 +1,21 @@
 # src/credit_data_processor.py
 import pandas as pd
 import numpy as np
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 import warnings
+from .dataset_cache import ColumnarDatasetCache
+from .preprocessing import CreditPreprocessor
 warnings.filterwarnings('ignore')
 
 class CreditDataProcessor:
-    def __init__(self, target_column: str = "SeriousDlqin2yrs", id_column: str = "Unnamed: 0"):
+    def __init__(self, target_column: str = "SeriousDlqin2yrs", id_column: str = "Unnamed: 0",
+                 cache_dir: Optional[str] = None):
         self.target_column = target_column
         self.id_column = id_column
+        # With a cache directory, CSVs are parsed once into memory-mapped, downcast columns
+        self.cache = ColumnarDatasetCache(cache_dir) if cache_dir else None
         self.feature_columns = None
+        self.preprocessor: Optional[CreditPreprocessor] = None
         self.feature_descriptions = {
             'RevolvingUtilizationOfUnsecuredLines': 'Credit card utilization rate (0-1)',
             'age': 'Age of borrower',
@@ -23,56 +29,83 @@ class CreditDataProcessor:
             'NumberOfDependents': 'Number of dependents'
         }
     
-    def load_data(self, train_path: str, test_path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Load and prepare credit scoring data"""
+    def load_data(self, train_path: str, test_path: Optional[str] = None) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+        """Load and prepare credit scoring data (test data is optional, e.g. when it is scored in a stream)"""
         print("Loading credit scoring data...")
         
         # Load training data
-        train_df = pd.read_csv(train_path)
+        train_df = self.read_csv(train_path)
         print(f"Training data: {train_df.shape}")
         
+        if test_path is None:
+            return train_df, None
+        
         # Load test data - remove target column if it exists
-        test_df = pd.read_csv(test_path)
+        test_df = self.read_csv(test_path)
         if self.target_column in test_df.columns:
             test_df = test_df.drop(columns=[self.target_column])
         print(f"Test data: {test_df.shape}")
         
         return train_df, test_df
     
-    def preprocess_credit_data(self, train_df: pd.DataFrame, test_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    def read_csv(self, path: str) -> pd.DataFrame:
+        """Read a CSV, through the columnar cache when one is configured"""
+        if self.cache is not None:
+            return self.cache.load(path)
+        return pd.read_csv(path)
+    
+    def preprocess_credit_data(self, train_df: pd.DataFrame,
+                               test_df: Optional[pd.DataFrame] = None) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
         """Preprocess credit scoring data"""
         print("Preprocessing credit data...")
         
-        # Handle missing values
-        train_processed = self.handle_missing_values(train_df)
-        test_processed = self.handle_missing_values(test_df)
-        
         # Define feature columns 
-        all_columns = train_processed.columns.tolist()
+        all_columns = train_df.columns.tolist()
         self.feature_columns = [col for col in all_columns 
                                if col not in [self.target_column, self.id_column]]
         
+        # Imputation statistics come from training data only and are reused for test/scoring data
+        self.fit_imputation(train_df)
+        
+        # Handle missing values
+        train_processed = self.handle_missing_values(train_df)
+        test_processed = self.handle_missing_values(test_df) if test_df is not None else None
+        
         print(f"Using {len(self.feature_columns)} features: {self.feature_columns}")
         
         return train_processed, test_processed
     
+    def fit_imputation(self, df: pd.DataFrame) -> CreditPreprocessor:
+        """Fit the preprocessor (median income, modal number of dependents) on training data"""
+        features = self.feature_columns or [col for col in df.columns
+                                            if col not in [self.target_column, self.id_column]]
+        self.preprocessor = CreditPreprocessor.fit(df, features)
+        return self.preprocessor
+    
+    @property
+    def imputation_values(self) -> Dict[str, float]:
+        if self.preprocessor is None:
+            return {}
+        return {f: self.preprocessor.fill_value_map[f] for f in self.preprocessor.strategies}
+    
     def handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Handle missing values in credit data"""
-        df_clean = df.copy()
+        """Handle missing values in credit data using the frozen training statistics.
         
-        # MonthlyIncome 
-        if 'MonthlyIncome' in df_clean.columns and df_clean['MonthlyIncome'].isnull().any():
-            median_income = df_clean['MonthlyIncome'].median()
-            df_clean['MonthlyIncome'] = df_clean['MonthlyIncome'].fillna(median_income)
-            print(f"Filled {df_clean['MonthlyIncome'].isnull().sum()} missing MonthlyIncome with median: {median_income:.2f}")
+        Only columns that actually contain missing values are replaced; the rest of the
+        frame is shared with the input rather than copied.
+        """
+        if self.preprocessor is None:
+            self.fit_imputation(df)
         
-        # NumberOfDependents 
-        if 'NumberOfDependents' in df_clean.columns and df_clean['NumberOfDependents'].isnull().any():
-            mode_dependents = df_clean['NumberOfDependents'].mode()[0] if not df_clean['NumberOfDependents'].mode().empty else 0
-            df_clean['NumberOfDependents'] = df_clean['NumberOfDependents'].fillna(mode_dependents)
-            print(f"Filled {df_clean['NumberOfDependents'].isnull().sum()} missing NumberOfDependents with mode: {mode_dependents}")
+        filled = {}
+        for column, value in self.preprocessor.fill_value_map.items():
+            if column in df.columns:
+                n_missing = int(df[column].isnull().sum())
+                if n_missing:
+                    filled[column] = df[column].fillna(value)
+                    print(f"Filled {n_missing} missing {column} with {value:.2f}")
         
-        return df_clean
+        return df.assign(**filled) if filled else df
     
     def get_feature_description(self, feature_name: str) -> str:
         """Get human-readable description of a feature"""
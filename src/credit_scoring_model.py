@@ -1,22 +1,78 @@
 # src/credit_scoring_model.py
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import roc_auc_score
 import joblib
 import os
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Tuple, Optional
+from .compiled_forest import CompiledForest
+from .linear_scorer import LinearScorer
+from .feature_schema import FeatureSchema
+from .preprocessing import CreditPreprocessor
+from .model_artifact import artifact_path, artifact_kind, save_artifact, load_artifact, read_manifest
+from .cascade import first_stage_artifact_path, cascade_config_path
+from .cross_validation import cross_validate, format_cv_report
+from .hyperparameter_search import successive_halving, format_search_report
+from .model_training import (
+    available_candidates, build_first_stage, extend_model, final_model, train_candidates, select_candidate,
+    format_timing_report
+)
+
+# Max allowed |fast scorer - sklearn| probability difference before an export is rejected.
+# Compiled forests must match exactly; float32 logistic models can differ from scipy's
+# expit by one ulp (~6e-8), so the linear scorer gets a small tolerance
+FAST_PATH_TOLERANCE = 1e-6
+
+def fast_path_tolerance(scorer) -> float:
+    return 0.0 if isinstance(scorer, CompiledForest) else FAST_PATH_TOLERANCE
 
 class CreditScoringModel:
     def __init__(self, model_path: str = "./models/trained_models"):
         self.model_path = model_path
         self.model = None
         self.feature_importance = None
+        self.feature_names = None
+        self.feature_schema = None
+        self.parity_sample = None
+        self.training_report = None
+        self.search_report = None
+        self.oof_predictions = None
+        self.oof_labels = None
+        self.validation_auc = None
+        self.first_stage_model = None
+        
+    def train_model(self, X_train: pd.DataFrame, y_train: pd.Series, sample_size: int = None,
+                    preprocessor: CreditPreprocessor = None, candidates: List[str] = None,
+                    max_workers: int = None, cpu_budget: int = None,
+                    auc_tolerance: float = 0.0, search: bool = False, search_configs: int = 27,
+                    search_min_samples: int = 2000, cv_folds: int = 0,
+                    first_stage: Optional[str] = None) -> Dict[str, Any]:
+        """Train credit scoring model with sampling option.
+        
+        Candidates (logistic, random forest and, when installed, histogram LightGBM/XGBoost
+        with early stopping) are fitted concurrently on up to ``max_workers`` processes,
+        sharing ``cpu_budget`` cores. The best-AUC model wins; with ``auc_tolerance`` a
+        faster compiled scorer (forest or logistic regression) within that AUC margin wins
+        instead (see ``select_candidate``).
+        
+        With ``search`` the fixed hyperparameters are replaced by a successive-halving
+        search over ``search_configs`` sampled configurations, starting on stratified
+        samples of ``search_min_samples`` rows; the winner is picked from the Pareto
+        front of AUC vs single-row latency.
         
-    def train_model(self, X_train: pd.DataFrame, y_train: pd.Series, sample_size: int = None) -> Dict[str, Any]:
-        """Train credit scoring model with sampling option"""
+        With ``cv_folds`` >= 2 candidates are compared on stratified k-fold mean AUC (folds
+        run in parallel on a memory-mapped copy of the data) instead of one 80/20 split;
+        with ``search`` the k-fold run evaluates the search winner. The winner's
+        out-of-fold predictions are kept in ``oof_predictions`` for calibration.
+        
+        The fitted ``preprocessor`` is saved in the artifact's schema, so serving and
+        batch scoring fill missing fields exactly as training did.
+        
+        With ``first_stage`` (``logistic`` or ``shallow_forest``) a cheap model is also fitted
+        and saved for cascade serving (see ``tune_cascade.py``).
+        """
         print("Training credit scoring model...")
         
         # Use sampling if specified (for large datasets)
@@ -26,6 +82,11 @@ class CreditScoringModel:
             X_train = X_train.iloc[indices]
             y_train = y_train.iloc[indices]
         
+        self.feature_names = list(X_train.columns)
+        if preprocessor is not None and preprocessor.features != self.feature_names:
+            raise ValueError("Preprocessor was fitted on different features than the training data")
+        self.feature_schema = FeatureSchema(self.feature_names, preprocessor=preprocessor)
+        
         # Convert to numpy arrays for stability
         X_array = X_train.values.astype(np.float32)
         y_array = y_train.values.astype(np.int32)
@@ -38,61 +99,150 @@ class CreditScoringModel:
             X_array, y_array, test_size=0.2, random_state=42, stratify=y_array
         )
         
-        # Try models in order of complexity
-        models_to_try = [
-            ('logistic', LogisticRegression(random_state=42, max_iter=1000, n_jobs=-1)),
-            ('random_forest', RandomForestClassifier(n_estimators=100, max_depth=15, random_state=42, n_jobs=-1))
-        ]
+        # Try models in order of complexity, concurrently
+        cpu_budget = cpu_budget or os.cpu_count() or 1
+        names = available_candidates(candidates)
+        if search:
+            print(f"  Successive-halving search over {search_configs} configurations...")
+            self.search_report = successive_halving(
+                names, X_tr, y_tr, X_val, y_val, n_configs=search_configs,
+                min_samples=search_min_samples, max_workers=max_workers, cpu_budget=cpu_budget
+            )
+            candidate_results = self.search_report['evaluations']
+            print("\n⏱️ Pareto front (AUC vs single-row latency):")
+            print(format_search_report(self.search_report))
+            selectable = self.search_report['pareto_front']
+        elif cv_folds >= 2:
+            candidate_results = cross_validate([(name, {}) for name in names], X_array, y_array, cv_folds,
+                                               max_workers=max_workers, cpu_budget=cpu_budget)
+            print(f"\n⏱️ {cv_folds}-fold cross-validation report:")
+            print(format_cv_report(candidate_results))
+            selectable = candidate_results
+        else:
+            candidate_results = train_candidates(names, X_tr, y_tr, X_val, y_val,
+                                                 max_workers=max_workers, cpu_budget=cpu_budget)
+            print("\n⏱️ Candidate timing report:")
+            print(format_timing_report(candidate_results))
+            selectable = candidate_results
+        self.training_report = [{k: v for k, v in r.items() if k not in ('model', 'oof_predictions')}
+                                for r in candidate_results]
+        results = {r['name']: r for r in candidate_results if r.get('auc_score') is not None}
         
-        best_model = None
-        best_score = 0
-        results = {}
-        
-        for name, model in models_to_try:
-            print(f"  Training {name}...")
-            
-            try:
-                model.fit(X_tr, y_tr)
-                y_pred_proba = model.predict_proba(X_val)[:, 1]
-                auc_score = roc_auc_score(y_val, y_pred_proba)
-                
-                results[name] = {
-                    'model': model,
-                    'auc_score': auc_score
-                }
-                
-                print(f"    {name} - AUC: {auc_score:.4f}")
-                
-                if auc_score > best_score:
-                    best_score = auc_score
-                    best_model = model
-                    
-            except Exception as e:
-                print(f"    {name} failed: {e}")
-                continue
-        
-        if best_model is None:
+        best = select_candidate(selectable, auc_tolerance)
+        if best is None:
             raise ValueError("All models failed to train")
+        best_score = best['auc_score']
+        if best.get('fast_path') is False:
+            print(f"⚠️ WARNING: the selected model ({best['name']}) has no compiled fast-path export. "
+                  f"It will be served from the pickle through its library: no memory-mapped .artifact, "
+                  f"no path-based contributions (global importances only). "
+                  f"Raise TRAINING_AUC_TOLERANCE or drop it from TRAINING_CANDIDATES to serve a compiled model.")
         
-        # Train final model on all data
-        print(f"Training final model on all data...")
-        self.model = best_model
+        if search and cv_folds >= 2:
+            cv_result = cross_validate([(best['name'], best['params'])], X_array, y_array, cv_folds,
+                                       max_workers=max_workers, cpu_budget=cpu_budget)
+            print(f"\n⏱️ {cv_folds}-fold cross-validation of the search winner:")
+            print(format_cv_report(cv_result))
+            if cv_result[0].get('auc_score') is not None:
+                self.oof_predictions = cv_result[0]['oof_predictions']
+        elif cv_folds >= 2:
+            self.oof_predictions = best['oof_predictions']
+        self.oof_labels = y_array if self.oof_predictions is not None else None
+        
+        # Train final model on all data (boosted models keep their early-stopped round count)
+        params = f" {best['params']}" if best.get('params') else ""
+        print(f"Training final model ({best['name']}{params}) on all data...")
+        self.model = final_model(best, n_jobs=cpu_budget)
         self.model.fit(X_array, y_array)
         
+        # Held-out rows used to verify exported fast scorers against sklearn
+        self.parity_sample = X_val[:1000]
+        
+        self.validation_auc = best_score
         print(f"🏆 Final model AUC: {best_score:.4f}")
         
-        # Feature importance
+        self.first_stage_model = None
+        if first_stage and first_stage == best['name']:
+            print(f"Final model is already {first_stage}; no cascade first stage needed")
+        elif first_stage:
+            start = time.perf_counter()
+            self.first_stage_model = build_first_stage(first_stage, n_jobs=cpu_budget)
+            self.first_stage_model.fit(X_tr, y_tr)
+            first_stage_auc = roc_auc_score(y_val, self.first_stage_model.predict_proba(X_val)[:, 1])
+            self.first_stage_model.fit(X_array, y_array)
+            print(f"Cascade first stage ({first_stage}) AUC: {first_stage_auc:.4f} "
+                  f"({time.perf_counter() - start:.1f}s)")
+        
+        self._update_feature_importance()
+        
+        return results
+    
+    def _update_feature_importance(self):
+        """Feature importance (normalized: boosted models report split counts)"""
         if hasattr(self.model, 'feature_importances_'):
+            importances = np.asarray(self.model.feature_importances_, dtype=np.float64)
+            if importances.sum() > 0:
+                importances = importances / importances.sum()
             self.feature_importance = pd.DataFrame({
-                'feature': X_train.columns,
-                'importance': self.model.feature_importances_
+                'feature': self.feature_names,
+                'importance': importances
             }).sort_values('importance', ascending=False)
             
             print("\n📊 Top 5 Most Important Features:")
             for i, row in self.feature_importance.head(5).iterrows():
                 print(f"  {i+1}. {row['feature']}: {row['importance']:.4f}")
+    
+    def update_model(self, X_new, y_new, extra_rounds: int = 100, extra_trees: int = 20,
+                     linear_max_iter: int = 20, eval_fraction: float = 0.2,
+                     random_state: int = 42) -> Dict[str, Any]:
+        """Incrementally update the current model with newly labeled outcomes only.
         
-        return results
+        ``X_new`` must already be preprocessed (e.g. with ``feature_schema.transform_frame``).
+        A stratified ``eval_fraction`` of the new rows is held out to compare the parent
+        and the updated model before the update is applied to the rest.
+        """
+        if self.model is None:
+            raise ValueError("No model has been trained")
+        X_new = np.asarray(X_new.values if hasattr(X_new, 'values') else X_new, dtype=np.float32)
+        y_new = np.asarray(y_new.values if hasattr(y_new, 'values') else y_new).astype(np.int32)
+        if len(X_new) == 0:
+            raise ValueError("No new labeled outcomes to train on")
+        
+        X_fit, y_fit, X_eval, y_eval = X_new, y_new, None, None
+        if eval_fraction and len(np.unique(y_new)) > 1:
+            X_fit, X_eval, y_fit, y_eval = train_test_split(
+                X_new, y_new, test_size=eval_fraction, random_state=random_state, stratify=y_new
+            )
+        
+        auc_parent = None
+        if X_eval is not None:
+            auc_parent = float(roc_auc_score(y_eval, self.model.predict_proba(X_eval)[:, 1]))
+        
+        print(f"Updating model with {len(X_fit):,} new outcomes...")
+        start = time.perf_counter()
+        self.model, method = extend_model(self.model, X_fit, y_fit, extra_rounds, extra_trees, linear_max_iter)
+        fit_time = time.perf_counter() - start
+        
+        auc_updated = None
+        if X_eval is not None:
+            auc_updated = float(roc_auc_score(y_eval, self.model.predict_proba(X_eval)[:, 1]))
+            self.parity_sample = X_eval[:1000]
+        else:
+            self.parity_sample = X_fit[:1000]
+        
+        print(f"🔁 {method} in {fit_time:.1f}s")
+        if auc_updated is not None:
+            print(f"   AUC on held-out new outcomes: parent {auc_parent:.4f} -> updated {auc_updated:.4f}")
+        self._update_feature_importance()
+        
+        return {
+            'method': method,
+            'n_new': int(len(X_new)),
+            'n_fit': int(len(X_fit)),
+            'fit_time_s': fit_time,
+            'auc_parent': auc_parent,
+            'auc_updated': auc_updated,
+        }
     
     def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
         """Predict probability of default"""
@@ -102,15 +252,161 @@ class CreditScoringModel:
         X_array = X.values.astype(np.float32)
         return self.model.predict_proba(X_array)[:, 1]
     
-    def save_model(self, filename: str = "credit_scoring_model.pkl"):
-        """Save the trained model"""
+    def export_fast_scorer(self):
+        """Export the fitted model as a dependency-light NumPy scorer (None if unsupported)"""
+        if CompiledForest.supports(self.model):
+            return CompiledForest.from_sklearn(self.model, feature_names=self.feature_names)
+        if LinearScorer.supports(self.model):
+            return LinearScorer.from_sklearn(self.model, feature_names=self.feature_names)
+        return None
+    
+    def check_fast_scorer_parity(self, scorer, X: np.ndarray = None) -> float:
+        """Max absolute probability difference between ``scorer`` and the sklearn model"""
+        X = self.parity_sample if X is None else X
+        if X is None or len(X) == 0:
+            return 0.0
+        expected = self.model.predict_proba(X)[:, 1]
+        return float(np.max(np.abs(scorer.predict_positive(X) - expected)))
+    
+    def load_model(self, filename: str = "credit_scoring_model.pkl"):
+        """Load a pickled model saved by ``save_model`` (e.g. as the parent of an incremental update)"""
+        model_path = filename if os.path.isabs(filename) else os.path.join(self.model_path, filename)
+        loaded_data = joblib.load(model_path)
+        self.model = loaded_data['model']
+        self.feature_importance = loaded_data.get('feature_importance')
+        if 'feature_schema' in loaded_data:
+            self.feature_schema = FeatureSchema.from_dict(loaded_data['feature_schema'])
+        else:
+            self.feature_schema = FeatureSchema.default()
+        self.feature_names = list(self.feature_schema.features)
+        self.first_stage_model = loaded_data.get('first_stage_model')
+        self.parity_sample = None
+        return self
+    
+    def save_model(self, filename: str = "credit_scoring_model.pkl", compile_model: bool = True):
+        """Save the trained model.
+        
+        With ``compile_model`` a random forest (flat node arrays) or logistic regression
+        (coefficients/intercept) is also exported as a ``.artifact`` directory next to the
+        pickle: uncompressed ``.npy`` arrays plus a manifest (schema, version, checksum)
+        that serving memory-maps without sklearn. The export is checked against sklearn
+        on held-out rows and skipped if it does not match.
+        
+        Saved models are never overwritten (a running server may be reading them):
+        save each version to a fresh file, e.g. ``ModelRegistry.new_model_path``.
+        """
         if not os.path.exists(self.model_path):
             os.makedirs(self.model_path)
         
         model_path = os.path.join(self.model_path, filename)
-        joblib.dump({
+        existing = [p for p in (model_path, artifact_path(model_path), first_stage_artifact_path(model_path),
+                                cascade_config_path(model_path)) if os.path.exists(p)]
+        if existing:
+            raise FileExistsError(f"{existing[0]} already exists; save each version to a new file "
+                                  f"(see ModelRegistry.new_model_path)")
+        model_data = {
             'model': self.model,
             'feature_importance': self.feature_importance
-        }, model_path)
+        }
+        if self.feature_schema is not None:
+            model_data['feature_schema'] = self.feature_schema.to_dict()
+        if LinearScorer.supports(self.model):
+            model_data['coefficients'] = self.model.coef_[0]
+            model_data['intercept'] = float(self.model.intercept_[0])
+        if self.first_stage_model is not None:
+            model_data['first_stage_model'] = self.first_stage_model
+        joblib.dump(model_data, model_path)
+        
+        print(f"Credit scoring model saved to {model_path}")
+        
+        self._save_first_stage_artifact(model_path, compile_model)
+        fast_path = artifact_path(model_path)
         
-        print(f"Credit scoring model saved to {model_path}")
\ No newline at end of file
+        fast_scorer = self.export_fast_scorer() if compile_model else None
+        if compile_model and fast_scorer is None:
+            print(f"⚠️ {type(self.model).__name__} has no compiled export; it will be served from the pickle")
+        max_diff = self.check_fast_scorer_parity(fast_scorer) if fast_scorer is not None else None
+        if fast_scorer is None or max_diff > fast_path_tolerance(fast_scorer):
+            if fast_scorer is not None:
+                print(f"⚠️ Fast scorer differs from sklearn by {max_diff:.2e}; not exporting it")
+            return
+        
+        extra_arrays = {}
+        if self.feature_importance is not None:
+            extra_arrays['importance_feature'] = np.array(self.feature_importance['feature'].astype(str).tolist())
+            extra_arrays['importance_value'] = self.feature_importance['importance'].to_numpy(dtype=np.float64)
+        if self.feature_schema is not None:
+            extra_arrays.update(self.feature_schema.to_arrays())
+        manifest = save_artifact(fast_path, {**fast_scorer.to_arrays(), **extra_arrays}, metadata={
+            'kind': artifact_kind(fast_scorer.to_arrays()),
+            'model_type': type(self.model).__name__,
+            'schema': self.feature_schema.to_dict() if self.feature_schema is not None else None,
+            'schema_fingerprint': self.feature_schema.fingerprint if self.feature_schema is not None else None,
+            'parity_max_diff': max_diff,
+        })
+        print(f"Fast {type(fast_scorer).__name__} (max parity diff {max_diff:.1e}, version {manifest['version']}) "
+              f"saved to {fast_path}")
+
+    def _save_first_stage_artifact(self, model_path: str, compile_model: bool = True):
+        """Memory-mappable copy of the cascade first stage (skipped when there is none)"""
+        fast_path = first_stage_artifact_path(model_path)
+        scorer = None
+        if compile_model and self.first_stage_model is not None:
+            if CompiledForest.supports(self.first_stage_model):
+                scorer = CompiledForest.from_sklearn(self.first_stage_model, feature_names=self.feature_names)
+            elif LinearScorer.supports(self.first_stage_model):
+                scorer = LinearScorer.from_sklearn(self.first_stage_model, feature_names=self.feature_names)
+        if scorer is None:
+            return
+        arrays = scorer.to_arrays()
+        save_artifact(fast_path, arrays, metadata={
+            'kind': artifact_kind(arrays),
+            'model_type': type(self.first_stage_model).__name__,
+            'role': 'cascade_first_stage',
+        })
+        print(f"Cascade first stage ({type(self.first_stage_model).__name__}) saved to {fast_path}")
+
+def model_artifact_version(model_path: str, prefer_compiled: bool = True) -> str:
+    """Short identifier of the artifact on disk (changes whenever the model is rewritten)"""
+    import hashlib
+    fast_path = artifact_path(model_path)
+    if prefer_compiled and os.path.isdir(fast_path):
+        return read_manifest(fast_path)['version']
+    stat = os.stat(model_path)
+    digest = hashlib.sha1(f"{os.path.abspath(model_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:12]
+
+def _serving_model_from_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[Any, Optional[pd.DataFrame], FeatureSchema]:
+    kind = artifact_kind(arrays)
+    model = LinearScorer.from_arrays(arrays) if kind == 'linear' else CompiledForest.from_arrays(arrays)
+    feature_importance = None
+    if 'importance_feature' in arrays:
+        feature_importance = pd.DataFrame({
+            'feature': np.asarray(arrays['importance_feature']).astype(str),
+            'importance': np.asarray(arrays['importance_value'])
+        })
+    if 'schema_features' in arrays:
+        feature_schema = FeatureSchema.from_arrays(arrays)
+    else:
+        feature_schema = FeatureSchema.default()
+    return model, feature_importance, feature_schema
+
+def load_serving_model(model_path: str, prefer_compiled: bool = True,
+                       verify_checksum: bool = True) -> Tuple[Any, Optional[pd.DataFrame], FeatureSchema]:
+    """Load (model, feature_importance, feature_schema) for serving, preferring the compiled NumPy scorer.
+    
+    A ``.artifact`` directory is memory-mapped (checked against its manifest checksum
+    when ``verify_checksum``); models without one are loaded from the pickle.
+    Models saved without a fitted schema get the canonical default schema.
+    """
+    fast_path = artifact_path(model_path)
+    if prefer_compiled and os.path.isdir(fast_path):
+        arrays, _ = load_artifact(fast_path, mmap=True, verify_checksum=verify_checksum)
+        return _serving_model_from_arrays(arrays)
+    
+    loaded_data = joblib.load(model_path)
+    if 'feature_schema' in loaded_data:
+        feature_schema = FeatureSchema.from_dict(loaded_data['feature_schema'])
+    else:
+        feature_schema = FeatureSchema.default()
+    return loaded_data['model'], loaded_data.get('feature_importance'), feature_schema
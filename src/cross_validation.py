@@ -0,0 +1,156 @@
+# src/cross_validation.py
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+from .model_training import BOOSTED_MODELS, build_candidate, cpu_split, single_row_latency, _fit_with_early_stopping
+
+# Share of each training fold held back for early stopping of boosted models
+EARLY_STOPPING_FRACTION = 0.1
+
+
+class SharedDataset:
+    """Training matrix and labels written once to ``.npy`` files that workers memory-map.
+
+    Fold workers receive file paths instead of pickled arrays, so every process reads
+    the same page-cached data rather than holding its own copy.
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, directory: Optional[str] = None):
+        self._tmp_dir = tempfile.mkdtemp(prefix="credit-cv-", dir=directory)
+        self.X_path = os.path.join(self._tmp_dir, "X.npy")
+        self.y_path = os.path.join(self._tmp_dir, "y.npy")
+        np.save(self.X_path, np.ascontiguousarray(X))
+        np.save(self.y_path, np.ascontiguousarray(y))
+
+    def __enter__(self) -> "SharedDataset":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+def _load_shared(X, y) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(X, str):
+        X = np.load(X, mmap_mode='r')
+    if isinstance(y, str):
+        y = np.load(y, mmap_mode='r')
+    return X, y
+
+
+def fit_fold(name: str, params: Dict[str, Any], X, y, train_idx: np.ndarray, val_idx: np.ndarray,
+             n_jobs: int = 1, random_state: int = 42, measure_latency: bool = False) -> Dict[str, Any]:
+    """Fit one fold. ``X``/``y`` are arrays or paths of shared ``.npy`` files (memory-mapped here)"""
+    start = time.perf_counter()
+    X, y = _load_shared(X, y)
+    X_tr, y_tr = np.asarray(X[train_idx]), np.asarray(y[train_idx])
+    X_val, y_val = np.asarray(X[val_idx]), np.asarray(y[val_idx])
+
+    model = build_candidate(name, n_jobs=n_jobs, random_state=random_state, **params)
+    best_iteration = None
+    if name in BOOSTED_MODELS and 'n_estimators' not in params:
+        # Early stopping on a slice of the training fold keeps the validation fold unseen
+        X_fit, X_stop, y_fit, y_stop = train_test_split(
+            X_tr, y_tr, test_size=EARLY_STOPPING_FRACTION, random_state=random_state, stratify=y_tr
+        )
+        best_iteration = _fit_with_early_stopping(name, model, X_fit, y_fit, X_stop, y_stop)
+    else:
+        model.fit(X_tr, y_tr)
+
+    predictions = model.predict_proba(X_val)[:, 1]
+    result = {
+        'val_idx': val_idx,
+        'predictions': predictions,
+        'auc_score': float(roc_auc_score(y_val, predictions)),
+        'best_iteration': best_iteration,
+    }
+    if measure_latency:
+        result['single_row_latency_ms'], result['fast_path'] = single_row_latency(model, X_val)
+    result['wall_time_s'] = time.perf_counter() - start
+    return result
+
+
+def cross_validate(specs: List[Tuple[str, Dict[str, Any]]], X: np.ndarray, y: np.ndarray, n_splits: int = 5,
+                   max_workers: Optional[int] = None, cpu_budget: Optional[int] = None,
+                   random_state: int = 42) -> List[Dict[str, Any]]:
+    """Stratified k-fold evaluation of ``(name, params)`` specs, with every (spec, fold) fit in parallel.
+
+    Returns per spec the fold AUCs, their mean and standard deviation, per-fold wall
+    time, the boosted round counts and the out-of-fold predictions (for calibration).
+    """
+    folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(X, y))
+    tasks = [(s, f) for s in range(len(specs)) for f in range(n_splits)]
+    max_workers, n_jobs = cpu_split(len(tasks), max_workers, cpu_budget)
+
+    fold_results: Dict[Tuple[int, int], Any] = {}
+    if max_workers == 1:
+        for s, f in tasks:
+            name, params = specs[s]
+            try:
+                fold_results[s, f] = fit_fold(name, params, X, y, *folds[f], n_jobs, random_state, f == 0)
+            except Exception as e:
+                fold_results[s, f] = e
+    else:
+        print(f"  Cross-validating {len(specs)} candidate(s) x {n_splits} folds on "
+              f"{max_workers} processes x {n_jobs} thread(s)...")
+        with SharedDataset(X, y) as shared, ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                (s, f): pool.submit(fit_fold, specs[s][0], specs[s][1], shared.X_path, shared.y_path,
+                                    *folds[f], n_jobs, random_state, f == 0)
+                for s, f in tasks
+            }
+            for key, future in futures.items():
+                try:
+                    fold_results[key] = future.result()
+                except Exception as e:
+                    fold_results[key] = e
+
+    results = []
+    for s, (name, params) in enumerate(specs):
+        outcomes = [fold_results[s, f] for f in range(n_splits)]
+        errors = [o for o in outcomes if isinstance(o, Exception)]
+        if errors:
+            results.append({'name': name, 'params': dict(params), 'auc_score': None,
+                            'error': f"{type(errors[0]).__name__}: {errors[0]}"})
+            continue
+        oof = np.empty(len(y), dtype=np.float64)
+        for o in outcomes:
+            oof[o['val_idx']] = o['predictions']
+        fold_auc = np.array([o['auc_score'] for o in outcomes])
+        best_iterations = [o['best_iteration'] for o in outcomes if o['best_iteration'] is not None]
+        results.append({
+            'name': name,
+            'params': dict(params),
+            'auc_score': float(fold_auc.mean()),
+            'auc_std': float(fold_auc.std(ddof=1)) if n_splits > 1 else 0.0,
+            'fold_auc': fold_auc.tolist(),
+            'fold_time_s': [o['wall_time_s'] for o in outcomes],
+            'best_iteration': int(np.median(best_iterations)) if best_iterations else None,
+            'single_row_latency_ms': outcomes[0].get('single_row_latency_ms'),
+            'fast_path': outcomes[0].get('fast_path'),
+            'oof_auc': float(roc_auc_score(y, oof)),
+            'oof_predictions': oof,
+        })
+    return results
+
+
+def format_cv_report(results: List[Dict[str, Any]]) -> str:
+    """Plain-text table of mean/stdev AUC and per-fold wall time per candidate"""
+    lines = [f"  {'model':<14} {'AUC mean':>9} {'stdev':>7} {'OOF AUC':>8}  fold wall time (s)"]
+    for r in results:
+        if r.get('auc_score') is None:
+            lines.append(f"  {r['name']:<14} failed: {r.get('error')}")
+            continue
+        times = " ".join(f"{t:.2f}" for t in r['fold_time_s'])
+        lines.append(f"  {r['name']:<14} {r['auc_score']:>9.4f} {r['auc_std']:>7.4f} {r['oof_auc']:>8.4f}  {times}")
+    return "\n".join(lines)
@@ -0,0 +1,147 @@
+# src/dataset_cache.py
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE = "manifest.json"
+CACHE_FORMAT_VERSION = 1
+_HASH_BLOCK_SIZE = 1 << 20
+
+# Columns that must stay floating point even when every value is a whole number
+FLOAT_COLUMNS = {'RevolvingUtilizationOfUnsecuredLines', 'DebtRatio', 'MonthlyIncome'}
+
+
+def file_sha1(path: str) -> str:
+    """SHA-1 of a file's contents, read in 1 MiB blocks"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def downcast_column(name: str, values: pd.Series) -> np.ndarray:
+    """Smallest dtype that holds the column exactly (int8 for counts, float32 for ratios)"""
+    if not pd.api.types.is_numeric_dtype(values):
+        raise ValueError(f"Column '{name}' is not numeric and cannot be cached")
+    array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if name not in FLOAT_COLUMNS and len(array) and not np.isnan(array).any() \
+            and np.array_equal(array, np.round(array)):
+        low, high = array.min(), array.max()
+        for dtype in (np.int8, np.int16, np.int32, np.int64):
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return array.astype(dtype)
+    return array.astype(np.float32)
+
+
+class ColumnarDatasetCache:
+    """Cache parsed CSVs as one downcast ``.npy`` file per column, loaded by memory-mapping.
+
+    Each source file gets a directory named after its stem and content hash, so
+    editing the CSV invalidates the cache. The manifest records size and mtime as
+    well, letting an unchanged file skip re-hashing on later loads.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = str(cache_dir)
+
+    def _entry_dir(self, source_path: str, source_hash: str) -> str:
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{source_hash[:16]}")
+
+    def _read_manifest(self, entry_dir: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(entry_dir, MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("format_version") == CACHE_FORMAT_VERSION else None
+
+    def _source_hash(self, source_path: str) -> str:
+        """Content hash, reusing the one in a manifest whose size and mtime still match"""
+        stat = os.stat(source_path)
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if not name.startswith(f"{stem}-"):
+                    continue
+                manifest = self._read_manifest(os.path.join(self.cache_dir, name))
+                if manifest and manifest["source_path"] == os.path.abspath(source_path) \
+                        and manifest["source_size"] == stat.st_size \
+                        and manifest["source_mtime_ns"] == stat.st_mtime_ns:
+                    return manifest["source_sha1"]
+        return file_sha1(source_path)
+
+    def load(self, source_path: str, mmap: bool = True) -> pd.DataFrame:
+        """DataFrame for ``source_path``, building the cache first if it is missing or stale"""
+        source_hash = self._source_hash(source_path)
+        entry_dir = self._entry_dir(source_path, source_hash)
+        manifest = self._read_manifest(entry_dir)
+        if manifest is None:
+            manifest = self.build(source_path, source_hash)
+        else:
+            print(f"📦 Loading cached columns for {os.path.basename(source_path)}")
+
+        mmap_mode = "r" if mmap else None
+        columns = {
+            column["name"]: np.load(os.path.join(entry_dir, column["file"]), mmap_mode=mmap_mode)
+            for column in manifest["columns"]
+        }
+        return pd.DataFrame(columns, copy=False)
+
+    def build(self, source_path: str, source_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Parse ``source_path`` once and write its columns and manifest"""
+        source_hash = source_hash or file_sha1(source_path)
+        entry_dir = self._entry_dir(source_path, source_hash)
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+        stat = os.stat(source_path)
+
+        print(f"📦 Building columnar cache for {os.path.basename(source_path)}...")
+        df = pd.read_csv(source_path)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        columns = []
+        for i, name in enumerate(df.columns):
+            array = downcast_column(name, df[name])
+            file_name = f"{i:03d}.npy"
+            np.save(os.path.join(tmp_dir, file_name), array)
+            columns.append({"name": name, "file": file_name, "dtype": str(array.dtype)})
+
+        manifest = {
+            "format_version": CACHE_FORMAT_VERSION,
+            "source_path": os.path.abspath(source_path),
+            "source_sha1": source_hash,
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "rows": len(df),
+            "columns": columns,
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        # Publish atomically; a concurrent build of the same file may have won the race
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if self._read_manifest(entry_dir) is None:
+                raise
+        self._remove_stale(source_path, entry_dir)
+        return manifest
+
+    def _remove_stale(self, source_path: str, keep_dir: str):
+        """Drop cache entries built from earlier versions of the same source file"""
+        source_path = os.path.abspath(source_path)
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            if entry_dir == keep_dir or not os.path.isdir(entry_dir):
+                continue
+            manifest = self._read_manifest(entry_dir)
+            if manifest and manifest["source_path"] == source_path:
+                shutil.rmtree(entry_dir, ignore_errors=True)
@@ -0,0 +1,81 @@
+# src/distillation.py
+import time
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+from scipy.stats import spearmanr
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+
+from .credit_agent import get_risk_levels
+from .model_training import build_candidate
+
+# Compact students; both export to the NumPy scorers (LinearScorer / CompiledForest)
+STUDENT_MODELS = {
+    'linear': ('logistic', {}),
+    'forest': ('random_forest', {'n_estimators': 16, 'max_depth': 8, 'min_samples_leaf': 20,
+                                 'bootstrap': False, 'max_features': 0.5}),
+}
+LATENCY_PROBES = 200
+
+
+def soft_label_dataset(X: np.ndarray, soft_labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Each row twice, as class 1 with weight p and class 0 with weight 1 - p.
+
+    A classifier fitted on this minimizes cross-entropy (logistic) or Gini, i.e. squared
+    error (trees), against the teacher's probabilities, so the student stays a plain
+    sklearn classifier that the existing fast scorers can export.
+    """
+    p = np.clip(np.asarray(soft_labels, dtype=np.float64), 0.0, 1.0)
+    X_soft = np.concatenate([X, X])
+    y_soft = np.concatenate([np.ones(len(X), dtype=np.int32), np.zeros(len(X), dtype=np.int32)])
+    weights = np.concatenate([p, 1.0 - p])
+    return X_soft, y_soft, weights
+
+
+def fit_student(kind: str, X: np.ndarray, soft_labels: np.ndarray, n_jobs: int = 1, random_state: int = 42):
+    """Fit a compact student on the teacher's probabilities"""
+    if kind not in STUDENT_MODELS:
+        raise ValueError(f"Unknown student model '{kind}' (expected one of {list(STUDENT_MODELS)})")
+    candidate, params = STUDENT_MODELS[kind]
+    student = build_candidate(candidate, n_jobs=n_jobs, random_state=random_state, **params)
+    X_soft, y_soft, weights = soft_label_dataset(X, soft_labels)
+    keep = weights > 0
+    student.fit(X_soft[keep], y_soft[keep], sample_weight=weights[keep])
+    if isinstance(student, RandomForestClassifier):
+        student.set_params(n_jobs=1)  # single-row serving is faster without a thread pool
+    return student
+
+
+def fidelity_report(teacher: np.ndarray, student: np.ndarray, y: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """How closely the student reproduces the teacher (and both AUCs when labels are given)"""
+    diff = np.abs(student - teacher)
+    report = {
+        'mean_abs_diff': float(diff.mean()),
+        'p99_abs_diff': float(np.quantile(diff, 0.99)),
+        'max_abs_diff': float(diff.max()),
+        'rank_correlation': float(spearmanr(teacher, student)[0]),
+        'risk_level_agreement': float((get_risk_levels(teacher) == get_risk_levels(student)).mean()),
+        'teacher_auc': None,
+        'student_auc': None,
+    }
+    if y is not None and len(np.unique(y)) == 2:
+        report['teacher_auc'] = float(roc_auc_score(y, teacher))
+        report['student_auc'] = float(roc_auc_score(y, student))
+    return report
+
+
+def measure_latency(scorer, X: np.ndarray) -> Dict[str, float]:
+    """Batch throughput and median single-row latency of ``scorer.predict_proba``"""
+    start = time.perf_counter()
+    scorer.predict_proba(X)
+    batch_time = time.perf_counter() - start
+    latencies = []
+    for row in X[:LATENCY_PROBES]:
+        row_start = time.perf_counter()
+        scorer.predict_proba(row.reshape(1, -1))
+        latencies.append(time.perf_counter() - row_start)
+    return {
+        'rows_per_s': len(X) / batch_time if batch_time > 0 else float('inf'),
+        'single_row_ms': float(np.median(latencies)) * 1000,
+    }
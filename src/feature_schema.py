@@ -0,0 +1,161 @@
+# src/feature_schema.py
+import hashlib
+import numpy as np
+from typing import Dict, Any, List, Optional, Union
+
+from .preprocessing import CreditPreprocessor
+
+# Canonical feature order of the Give Me Some Credit dataset (minus target/id)
+CREDIT_FEATURES = [
+    'RevolvingUtilizationOfUnsecuredLines', 'age', 'NumberOfTime30-59DaysPastDueNotWorse',
+    'DebtRatio', 'MonthlyIncome', 'NumberOfOpenCreditLinesAndLoans',
+    'NumberOfTimes90DaysLate', 'NumberRealEstateLoansOrLines',
+    'NumberOfTime60-89DaysPastDueNotWorse', 'NumberOfDependents'
+]
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, str) and value == "") or (
+        isinstance(value, (float, np.floating)) and bool(np.isnan(value)))
+
+
+class FeatureSchema:
+    """Ordered feature list plus defaults, compiled into a dict -> float32 matrix converter.
+
+    The schema is saved with the model artifact so serving uses exactly the column
+    order the model was trained on. Missing or null fields take their default value;
+    numeric strings and booleans are coerced to float. With a fitted ``preprocessor``
+    the defaults are its training fill values and its kernel does the NaN filling.
+    """
+
+    def __init__(self, features: List[str], defaults: Optional[Dict[str, float]] = None,
+                 preprocessor: Optional[CreditPreprocessor] = None):
+        if len(set(features)) != len(features):
+            raise ValueError("Feature names in a schema must be unique")
+        self.features = list(features)
+        if preprocessor is not None:
+            if preprocessor.features != self.features:
+                raise ValueError("Preprocessor features do not match the schema")
+            defaults = preprocessor.fill_value_map
+        else:
+            preprocessor = CreditPreprocessor(self.features, defaults)
+        self.preprocessor = preprocessor
+        defaults = defaults or {}
+        self.defaults = np.array([float(defaults.get(f, 0.0)) for f in self.features], dtype=np.float32)
+        self._default_pairs = list(zip(self.features, self.defaults.tolist()))
+        self.index = {feature: i for i, feature in enumerate(self.features)}
+
+    @classmethod
+    def default(cls) -> "FeatureSchema":
+        return cls(CREDIT_FEATURES)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.features)
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash of the feature order and defaults"""
+        digest = hashlib.sha1("|".join(self.features).encode() + self.defaults.tobytes())
+        return digest.hexdigest()[:12]
+
+    def transform(self, records: Union[Dict[str, Any], List[Dict[str, Any]]],
+                  out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Convert one record or a list of records into a contiguous (n, n_features) float32 matrix"""
+        if isinstance(records, dict):
+            records = [records]
+        n = len(records)
+        if out is None:
+            out = np.empty((n, self.n_features), dtype=np.float32)
+        elif out.shape != (n, self.n_features) or out.dtype != np.float32:
+            raise ValueError(f"Output buffer must be float32 with shape {(n, self.n_features)}")
+
+        pairs = self._default_pairs
+        for i, record in enumerate(records):
+            try:
+                out[i] = [record.get(feature, default) for feature, default in pairs]
+            except (TypeError, ValueError):
+                out[i] = self._coerce_row(record)
+
+        # Explicit nulls (None -> NaN on assignment) also take the default
+        return self.preprocessor.transform(out)
+
+    def transform_frame(self, df, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Convert a DataFrame chunk into a (n, n_features) float32 matrix in schema order.
+
+        Missing columns and NaN cells are filled by the preprocessor (the frozen
+        training imputation values for trained artifacts); extra columns are ignored.
+        """
+        n = len(df)
+        if out is None:
+            out = np.empty((n, self.n_features), dtype=np.float32)
+        elif out.shape != (n, self.n_features) or out.dtype != np.float32:
+            raise ValueError(f"Output buffer must be float32 with shape {(n, self.n_features)}")
+
+        for j, feature in enumerate(self.features):
+            if feature in df.columns:
+                out[:, j] = df[feature].to_numpy(dtype=np.float32, na_value=np.nan)
+            else:
+                out[:, j] = np.nan
+
+        return self.preprocessor.transform(out)
+
+    def missing_mask(self, records: Union[Dict[str, Any], List[Dict[str, Any]]]) -> np.ndarray:
+        """Boolean (n, n_features) matrix of fields that are absent, null, empty or NaN in ``records``"""
+        if isinstance(records, dict):
+            records = [records]
+        mask = np.empty((len(records), self.n_features), dtype=bool)
+        for i, record in enumerate(records):
+            mask[i] = [_is_missing(record.get(feature)) for feature in self.features]
+        return mask
+
+    def _coerce_row(self, record: Dict[str, Any]) -> List[float]:
+        """Slow path for rows with empty strings or other non-numeric values"""
+        row = []
+        for feature, default in self._default_pairs:
+            value = record.get(feature)
+            if value is None or value == "":
+                row.append(default)
+                continue
+            try:
+                row.append(float(value))
+            except (TypeError, ValueError):
+                raise ValueError(f"Feature '{feature}' must be numeric, got {value!r}")
+        return row
+
+    def validate_model(self, model):
+        """Raise if ``model`` was trained on a different feature layout than this schema"""
+        model_features = getattr(model, 'feature_names', None)
+        if model_features is None and hasattr(model, 'feature_names_in_'):
+            model_features = list(model.feature_names_in_)
+        if model_features is not None and list(model_features) != self.features:
+            raise ValueError(f"Serving schema {self.features} does not match model features {list(model_features)}")
+
+        n_model_features = getattr(model, 'n_features_in_', getattr(model, 'n_features', None))
+        if n_model_features is not None and n_model_features != self.n_features:
+            raise ValueError(f"Serving schema has {self.n_features} features but the model expects {n_model_features}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'features': self.features,
+            'defaults': dict(zip(self.features, self.defaults.tolist())),
+            'preprocessor': self.preprocessor.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FeatureSchema":
+        preprocessor = CreditPreprocessor.from_dict(data['preprocessor']) if 'preprocessor' in data else None
+        return cls(data['features'], data.get('defaults'), preprocessor)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'schema_features': np.array(self.features),
+            'schema_defaults': self.defaults,
+            **self.preprocessor.to_arrays()
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "FeatureSchema":
+        features = [str(f) for f in arrays['schema_features']]
+        preprocessor = CreditPreprocessor.from_arrays(arrays) if 'preprocessor_features' in arrays else None
+        return cls(features, dict(zip(features, np.asarray(arrays['schema_defaults']).tolist())), preprocessor)
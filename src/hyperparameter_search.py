@@ -0,0 +1,134 @@
+# src/hyperparameter_search.py
+import math
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from .model_training import fit_candidates
+
+# Values sampled for each candidate's hyperparameters (boosted round counts come from early stopping)
+SEARCH_SPACES = {
+    'logistic': {
+        'C': [0.01, 0.1, 1.0, 10.0],
+    },
+    'random_forest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [6, 10, 15, None],
+        'min_samples_leaf': [1, 5, 20],
+        'max_features': ['sqrt', 0.5],
+    },
+    'lightgbm': {
+        'num_leaves': [7, 15, 31, 63],
+        'learning_rate': [0.03, 0.05, 0.1],
+        'min_child_samples': [20, 50, 100],
+        'colsample_bytree': [0.7, 1.0],
+    },
+    'xgboost': {
+        'max_depth': [3, 4, 6, 8],
+        'learning_rate': [0.03, 0.05, 0.1],
+        'min_child_weight': [1, 5, 10],
+        'subsample': [0.8, 1.0],
+    },
+}
+
+
+def sample_configurations(candidates: List[str], n_configs: int,
+                          random_state: int = 42) -> List[Tuple[str, Dict[str, Any]]]:
+    """Up to ``n_configs`` distinct (candidate, params) pairs, spread round-robin over candidates"""
+    rng = np.random.default_rng(random_state)
+    configs, seen = [], set()
+    for attempt in range(n_configs * 20):
+        if len(configs) >= n_configs:
+            break
+        name = candidates[attempt % len(candidates)]
+        space = SEARCH_SPACES.get(name, {})
+        params = {key: values[rng.integers(len(values))] for key, values in space.items()}
+        key = (name, tuple(sorted((k, repr(v)) for k, v in params.items())))
+        if key not in seen:
+            seen.add(key)
+            configs.append((name, params))
+    return configs
+
+
+def stratified_sample(X: np.ndarray, y: np.ndarray, n: int, random_state: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    """``n`` rows of ``(X, y)`` with the class balance preserved"""
+    if n >= len(X):
+        return X, y
+    X_sample, _, y_sample, _ = train_test_split(X, y, train_size=n, random_state=random_state, stratify=y)
+    return X_sample, y_sample
+
+
+def pareto_front(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Results not dominated on (higher AUC, lower single-row latency), fastest first"""
+    fitted = sorted((r for r in results if r.get('auc_score') is not None),
+                    key=lambda r: (r['single_row_latency_ms'], -r['auc_score']))
+    front, best_auc = [], -np.inf
+    for r in fitted:
+        if r['auc_score'] > best_auc:
+            front.append(r)
+            best_auc = r['auc_score']
+    return front
+
+
+def successive_halving(candidates: List[str], X_tr: np.ndarray, y_tr: np.ndarray, X_val: np.ndarray,
+                       y_val: np.ndarray, n_configs: int = 27, min_samples: int = 2000, eta: int = 3,
+                       max_workers: Optional[int] = None, cpu_budget: Optional[int] = None,
+                       random_state: int = 42) -> Dict[str, Any]:
+    """Successive-halving search over sampled configurations.
+
+    Every configuration is fitted on a stratified sample of ``min_samples`` rows; the
+    best ``1/eta`` by validation AUC are promoted to a sample ``eta`` times larger,
+    until one configuration remains or the full training set is reached. Each rung
+    is fitted in parallel. Returns all evaluations, the final rung and the Pareto
+    front of AUC vs single-row latency over each configuration's largest rung.
+    """
+    if eta < 2:
+        raise ValueError("eta must be >= 2")
+    configs = sample_configurations(candidates, n_configs, random_state)
+    n_rungs = 1 + max(0, math.ceil(math.log(max(len(X_tr) / min_samples, 1), eta)))
+
+    evaluations = []
+    latest: Dict[int, Dict[str, Any]] = {}  # config id -> evaluation on its largest sample
+    survivors = list(range(len(configs)))
+    for rung in range(n_rungs):
+        n_samples = min(len(X_tr), min_samples * eta ** rung)
+        X_rung, y_rung = stratified_sample(X_tr, y_tr, n_samples, random_state + rung)
+        print(f"  Rung {rung}: {len(survivors)} configuration(s) on {n_samples:,} rows")
+
+        results = fit_candidates([configs[i] for i in survivors], X_rung, y_rung, X_val, y_val,
+                                 max_workers=max_workers, cpu_budget=cpu_budget,
+                                 random_state=random_state, verbose=False)
+        for config_id, result in zip(survivors, results):
+            result.update({'config_id': config_id, 'rung': rung})
+            evaluations.append(result)
+            latest[config_id] = result
+
+        ranked = sorted((r for r in results if r.get('model') is not None),
+                        key=lambda r: r['auc_score'], reverse=True)
+        if len(ranked) <= 1 or n_samples >= len(X_tr):
+            survivors = [r['config_id'] for r in ranked]
+            break
+        survivors = [r['config_id'] for r in ranked[:max(1, len(ranked) // eta)]]
+
+    # Keep fitted models only for the final rung; eliminated configurations keep their metrics
+    final = [latest[i] for i in survivors]
+    for r in evaluations:
+        if not any(r is f for f in final):
+            r['model'] = None
+
+    return {
+        'evaluations': evaluations,
+        'final': final,
+        'pareto_front': pareto_front(list(latest.values())),
+    }
+
+
+def format_search_report(search: Dict[str, Any]) -> str:
+    """Plain-text Pareto front of AUC vs single-row latency"""
+    lines = [f"  {'model':<14} {'AUC':>7} {'1-row ms':>9} {'rows':>8}  params"]
+    for r in search['pareto_front']:
+        params = ", ".join(f"{k}={v}" for k, v in r['params'].items())
+        lines.append(f"  {r['name']:<14} {r['auc_score']:>7.4f} {r['single_row_latency_ms']:>9.3f} "
+                     f"{r['n_train']:>8,}  {params}")
+    return "\n".join(lines)
@@ -0,0 +1,119 @@
+# src/inference_executor.py
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+
+class InferenceQueueFullError(RuntimeError):
+    """Raised when the inference executor already has its maximum number of pending tasks"""
+
+    def __init__(self, max_pending: int, retry_after: int = 1):
+        super().__init__(f"Inference queue is full ({max_pending} pending tasks)")
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """Run CPU-bound scoring off the event loop on a bounded thread or process pool.
+
+    At most ``workers + queue_size`` tasks may be running or waiting at once; further
+    submissions fail fast with ``InferenceQueueFullError`` instead of piling up.
+    In ``process`` mode each worker loads the model artifact once via ``initializer``
+    and tasks must be picklable module-level functions (see ``worker_predict_proba``).
+    """
+
+    def __init__(self, mode: str = "thread", workers: int = 4, queue_size: int = 64,
+                 retry_after: int = 1, initializer: Optional[Callable] = None, initargs: tuple = ()):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown executor mode '{mode}' (expected 'thread' or 'process')")
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.mode = mode
+        self.workers = workers
+        self.max_pending = workers + max(0, queue_size)
+        self.retry_after = retry_after
+
+        if mode == "process":
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference",
+                                            initializer=initializer, initargs=initargs)
+
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on the pool, rejecting when the queue is full"""
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise InferenceQueueFullError(self.max_pending, self.retry_after)
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+        self._completed += 1
+        return result
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+        }
+
+
+# Per-process state for process-pool workers
+_worker_state: Dict[str, Any] = {}
+
+def init_worker(model_file: str, prefer_compiled: bool = True, verify_checksum: bool = True, cascade: bool = False):
+    """Process-pool initializer: load the model artifact once per worker.
+
+    Memory-mapped artifacts are shared between workers through the page cache.
+    """
+    from src.serving_model import ServingModel
+
+    serving = ServingModel.load(model_file, prefer_compiled=prefer_compiled, verify_checksum=verify_checksum,
+                                cascade=cascade)
+    _worker_state['model'] = serving.scorer
+    _worker_state['agent'] = serving.agent
+
+def worker_predict_proba(X: np.ndarray) -> np.ndarray:
+    """Positive-class probabilities from the worker's model"""
+    return _worker_state['model'].predict_proba(X)[:, 1]
+
+def worker_cascade_predict(X: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Cascade probabilities plus the number of rows the full model scored (counted by the parent)"""
+    return _worker_state['model'].score(X)
+
+def worker_warm_up(X: np.ndarray) -> int:
+    """Score a self-test batch in the worker; returns the worker's pid"""
+    _worker_state['model'].predict_proba(X)
+    return os.getpid()
+
+def worker_process_query(features: Dict[str, Any], query: str, probability: float = None) -> Dict[str, Any]:
+    """Run the credit agent inside the worker"""
+    return _worker_state['agent'].process_query(features, query, probability=probability)
+
+def worker_process_batch(requests: List[Tuple[Dict[str, Any], str]],
+                         probabilities: np.ndarray = None) -> List[Dict[str, Any]]:
+    """Run the credit agent's batch path inside the worker"""
+    return _worker_state['agent'].process_batch(requests, probabilities)
@@ -0,0 +1,80 @@
+# src/linear_scorer.py
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+
+class LinearScorer:
+    """Pure-NumPy scorer for a fitted binary ``LogisticRegression``.
+
+    Scoring is ``sigmoid(X @ coef + intercept)`` on a float32 matrix, for single rows
+    or whole batches. Coefficients keep the dtype sklearn fitted them in (float32 for
+    float32 training data), so arithmetic follows sklearn's ``decision_function``.
+    """
+
+    def __init__(self, coef: np.ndarray, intercept, feature_names: Optional[List[str]] = None):
+        self.coef = np.asarray(coef).ravel()
+        self.intercept = np.asarray(intercept, dtype=self.coef.dtype).reshape(())
+        self.n_features = len(self.coef)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.classes_ = np.array([0, 1])
+
+    @staticmethod
+    def supports(model) -> bool:
+        """Whether ``model`` is a fitted binary sklearn logistic regression"""
+        from sklearn.linear_model import LogisticRegression
+        return (isinstance(model, LogisticRegression)
+                and hasattr(model, 'coef_')
+                and model.coef_.shape[0] == 1)
+
+    @classmethod
+    def from_sklearn(cls, model, feature_names: Optional[List[str]] = None) -> "LinearScorer":
+        if not cls.supports(model):
+            raise ValueError(f"Cannot export {type(model).__name__}: expected a fitted binary LogisticRegression")
+        if feature_names is None and hasattr(model, 'feature_names_in_'):
+            feature_names = list(model.feature_names_in_)
+        return cls(model.coef_[0], model.intercept_[0], feature_names)
+
+    def decision_function(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the linear scorer expects {self.n_features}")
+        return X @ self.coef + self.intercept
+
+    def predict_positive(self, X) -> np.ndarray:
+        """Probability of the positive class, shape (n_rows,)"""
+        z = self.decision_function(X)
+        one = z.dtype.type(1)
+        return one / (one + np.exp(-z))
+
+    def contributions(self, X):
+        """Exact log-odds contributions ``coef * x`` per feature; ``(intercept, contributions)``"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        contributions = X.astype(np.float64) * self.coef.astype(np.float64)
+        return np.full(X.shape[0], float(self.intercept)), contributions
+
+    def predict_proba(self, X) -> np.ndarray:
+        """sklearn-compatible (n_rows, 2) class probabilities"""
+        positive = self.predict_positive(X)
+        return np.column_stack([1.0 - positive, positive])
+
+    def to_arrays(self) -> Dict[str, Any]:
+        arrays = {
+            'kind': np.array('linear'),
+            'coef': self.coef,
+            'intercept': self.intercept.reshape(1)
+        }
+        if self.feature_names is not None:
+            arrays['feature_names'] = np.array(self.feature_names)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "LinearScorer":
+        return cls(
+            coef=np.asarray(arrays['coef']),
+            intercept=np.asarray(arrays['intercept'])[0],
+            feature_names=[str(f) for f in arrays['feature_names']] if 'feature_names' in arrays else None
+        )
@@ -0,0 +1,170 @@
+# src/micro_batcher.py
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Dict, Any, Optional
+
+import numpy as np
+
+from .inference_executor import InferenceQueueFullError
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row scoring requests into one matrix call.
+
+    Each request is queued with its own future; the background worker waits up to
+    ``max_wait_ms`` (or until ``max_batch_size`` rows are queued), stacks the rows
+    into a contiguous float32 matrix, calls ``predict_fn`` once and resolves every
+    future with its own row's probability. When an ``executor`` (anything with an async
+    ``run(fn, X)``, e.g. ``InferenceExecutor``) is given, each batch runs on it so the event loop is never blocked by the model.
+    At most ``max_queue_size`` rows wait in the queue (0 = unbounded); further requests
+    fail fast with ``InferenceQueueFullError`` like the executor itself.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch_size: int = 64, max_wait_ms: float = 2.0, executor=None,
+                 max_queue_size: int = 0, retry_after: int = 1):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.predict_fn = predict_fn
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue_size = max(0, max_queue_size)
+        self.retry_after = retry_after
+
+        self._pending = deque()
+        self._has_items: Optional[asyncio.Event] = None
+        self._is_full: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight = set()
+
+        # Tuning statistics
+        self._requests = 0
+        self._rejected = 0
+        self._batches = 0
+        self._max_batch_seen = 0
+        self._total_wait = 0.0
+        self._batch_size_histogram: Dict[str, int] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self):
+        """Start the background batching worker (must be called from a running loop)"""
+        if self.running:
+            return
+        self._has_items = asyncio.Event()
+        self._is_full = asyncio.Event()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker and fail any request still waiting in the queue"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        while self._pending:
+            _, future, _ = self._pending.popleft()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, row: np.ndarray) -> float:
+        """Queue one feature row and wait for its probability"""
+        if not self.running:
+            raise RuntimeError("Micro-batcher is not running")
+        if self.max_queue_size and len(self._pending) >= self.max_queue_size:
+            self._rejected += 1
+            raise InferenceQueueFullError(self.max_queue_size, self.retry_after)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future, time.perf_counter()))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._is_full.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            await self._has_items.wait()
+
+            # Give concurrent requests a short window to join this batch
+            if len(self._pending) < self.max_batch_size and self.max_wait > 0:
+                try:
+                    await asyncio.wait_for(self._is_full.wait(), timeout=self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = []
+            while self._pending and len(batch) < self.max_batch_size:
+                batch.append(self._pending.popleft())
+            if len(self._pending) < self.max_batch_size:
+                self._is_full.clear()
+            if not self._pending:
+                self._has_items.clear()
+
+            if batch:
+                if self.executor is None:
+                    await self._dispatch(batch)
+                else:
+                    # Several batches may be in flight; the executor bounds how many
+                    task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._in_flight.discard)
+            # Let resolved requests and newly arriving ones run before the next batch
+            await asyncio.sleep(0)
+
+    async def _dispatch(self, batch):
+        rows = [row for row, _, _ in batch]
+        now = time.perf_counter()
+        try:
+            X = np.ascontiguousarray(np.vstack(rows), dtype=np.float32)
+            if self.executor is None:
+                probabilities = self.predict_fn(X)
+            else:
+                probabilities = await self.executor.run(self.predict_fn, X)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), probability in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(float(probability))
+        self._record(batch, now)
+
+    def _record(self, batch, dispatched_at: float):
+        size = len(batch)
+        self._requests += size
+        self._batches += 1
+        self._max_batch_seen = max(self._max_batch_seen, size)
+        self._total_wait += sum(dispatched_at - queued_at for _, _, queued_at in batch)
+
+        # Power-of-two buckets: "1", "2-3", "4-7", ...
+        low = 1 << (size.bit_length() - 1)
+        bucket = str(low) if low == 1 else f"{low}-{2 * low - 1}"
+        self._batch_size_histogram[bucket] = self._batch_size_histogram.get(bucket, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and realized batch-size statistics"""
+        return {
+            "running": self.running,
+            "queue_depth": len(self._pending),
+            "max_queue_size": self.max_queue_size,
+            "rejected": self._rejected,
+            "batches_in_flight": len(self._in_flight),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "requests": self._requests,
+            "batches": self._batches,
+            "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+            "max_batch_seen": self._max_batch_seen,
+            "mean_queue_wait_ms": 1000.0 * self._total_wait / self._requests if self._requests else 0.0,
+            "batch_size_histogram": dict(sorted(self._batch_size_histogram.items(),
+                                                key=lambda item: int(item[0].split('-')[0]))),
+        }
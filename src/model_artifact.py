@@ -0,0 +1,111 @@
+# src/model_artifact.py
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+ARTIFACT_SUFFIX = ".artifact"
+MANIFEST_FILE = "manifest.json"
+ARTIFACT_FORMAT_VERSION = 1
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def artifact_path(model_path: str) -> str:
+    """Directory of the memory-mappable artifact that accompanies a pickled model"""
+    root, _ = os.path.splitext(str(model_path))
+    return root + ARTIFACT_SUFFIX
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {manifest.get('format_version')} in {path}")
+    return manifest
+
+
+def save_artifact(path: str, arrays: Dict[str, np.ndarray], metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Write each array as an uncompressed ``.npy`` file plus a manifest into the new directory ``path``.
+
+    The manifest records every array's dtype, shape and SHA-256, an overall checksum
+    and a ``version`` derived from it, so identical models get identical versions.
+    Artifacts are immutable: an existing ``path`` is never replaced (``FileExistsError``).
+    """
+    path = str(path)
+    if os.path.exists(path):
+        raise FileExistsError(f"Artifact {path} already exists; artifacts are never overwritten")
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    entries = {}
+    for name in sorted(arrays):
+        array = np.asarray(arrays[name])
+        if array.ndim:  # ascontiguousarray would turn 0-d scalars such as ``kind`` into shape (1,)
+            array = np.ascontiguousarray(array)
+        if array.dtype == object:
+            raise ValueError(f"Array '{name}' has dtype object and cannot be memory-mapped")
+        file_name = f"{name}.npy"
+        np.save(os.path.join(tmp_path, file_name), array, allow_pickle=False)
+        entries[name] = {
+            "file": file_name,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "sha256": _file_sha256(os.path.join(tmp_path, file_name)),
+        }
+
+    checksum = hashlib.sha256("".join(f"{n}:{e['sha256']}" for n, e in entries.items()).encode()).hexdigest()
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "version": checksum[:12],
+        "checksum": checksum,
+        "created_at": datetime.now().isoformat(),
+        "arrays": entries,
+        **(metadata or {}),
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Publish the complete directory with one rename: readers see no artifact or all of it
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return manifest
+
+
+def artifact_kind(arrays: Dict[str, np.ndarray]) -> str:
+    """Scorer kind stored in an artifact ("forest" or "linear")"""
+    return str(np.asarray(arrays["kind"])[()])
+
+
+def load_artifact(path: str, mmap: bool = True, verify_checksum: bool = True) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """(arrays, manifest) for an artifact directory; arrays are read-only memory maps when ``mmap``.
+
+    Memory-mapped arrays are backed by the page cache, so several server processes
+    loading the same artifact share one physical copy.
+    """
+    manifest = read_manifest(path)
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        file_path = os.path.join(path, entry["file"])
+        if verify_checksum and _file_sha256(file_path) != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch for '{name}' in artifact {path}")
+        array = np.load(file_path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        if array.dtype.str != entry["dtype"] or list(array.shape) != entry["shape"]:
+            raise ValueError(f"Array '{name}' in artifact {path} does not match its manifest")
+        arrays[name] = array
+    return arrays, manifest
@@ -0,0 +1,283 @@
+# src/model_training.py
+import inspect
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+
+from .compiled_forest import CompiledForest
+from .linear_scorer import LinearScorer
+
+# Candidate models in order of complexity. Boosted candidates are skipped when their library is missing.
+CANDIDATE_MODELS = ['logistic', 'random_forest', 'lightgbm', 'xgboost']
+BOOSTED_MODELS = {'lightgbm', 'xgboost'}
+EARLY_STOPPING_ROUNDS = 50
+MAX_BOOSTING_ROUNDS = 1000
+LATENCY_PROBES = 50
+
+# Default hyperparameters per candidate (boosted round counts are upper bounds for early stopping)
+DEFAULT_PARAMS = {
+    'logistic': {'max_iter': 1000},
+    'random_forest': {'n_estimators': 100, 'max_depth': 15},
+    'lightgbm': {'n_estimators': MAX_BOOSTING_ROUNDS, 'learning_rate': 0.05, 'num_leaves': 31, 'verbose': -1},
+    'xgboost': {'n_estimators': MAX_BOOSTING_ROUNDS, 'learning_rate': 0.05, 'max_depth': 6,
+                'tree_method': 'hist', 'eval_metric': 'auc'},
+}
+
+# Cheap first-stage scorers for cascade serving: name -> (candidate, params)
+FIRST_STAGE_MODELS = {
+    'logistic': ('logistic', {}),
+    'shallow_forest': ('random_forest', {'n_estimators': 20, 'max_depth': 4}),
+}
+
+
+def available_candidates(names: Optional[List[str]] = None) -> List[str]:
+    """Candidate names whose libraries can be imported"""
+    available = []
+    for name in (names or CANDIDATE_MODELS):
+        if name not in CANDIDATE_MODELS:
+            raise ValueError(f"Unknown candidate model '{name}' (expected one of {CANDIDATE_MODELS})")
+        if name in BOOSTED_MODELS:
+            try:
+                __import__(name)
+            except ImportError:
+                print(f"    {name} not installed; skipping")
+                continue
+        available.append(name)
+    return available
+
+
+def build_candidate(name: str, n_jobs: int = 1, random_state: int = 42, **params):
+    """Unfitted estimator for a candidate name using ``n_jobs`` threads; ``params`` override the defaults"""
+    if name not in DEFAULT_PARAMS:
+        raise ValueError(f"Unknown candidate model '{name}'")
+    params = {**DEFAULT_PARAMS[name], **params, 'random_state': random_state}
+    if name == 'logistic':
+        return LogisticRegression(**params)
+    if name == 'random_forest':
+        return RandomForestClassifier(n_jobs=n_jobs, **params)
+    if name == 'lightgbm':
+        from lightgbm import LGBMClassifier
+        return LGBMClassifier(n_jobs=n_jobs, **params)
+    from xgboost import XGBClassifier
+    return XGBClassifier(n_jobs=n_jobs, **params)
+
+
+def build_first_stage(name: str, n_jobs: int = 1, random_state: int = 42):
+    """Unfitted cheap first-stage model for cascade serving"""
+    if name not in FIRST_STAGE_MODELS:
+        raise ValueError(f"Unknown first-stage model '{name}' (expected one of {list(FIRST_STAGE_MODELS)})")
+    candidate, params = FIRST_STAGE_MODELS[name]
+    return build_candidate(candidate, n_jobs=n_jobs, random_state=random_state, **params)
+
+
+def _fit_with_early_stopping(name: str, model, X_tr, y_tr, X_val, y_val) -> Optional[int]:
+    """Fit ``model``; boosted models stop on validation AUC. Returns the best iteration (boosted only)"""
+    if name == 'lightgbm':
+        import lightgbm
+        # lightgbm >= 4.6 takes eval_X/eval_y and deprecates eval_set
+        if 'eval_X' in inspect.signature(model.fit).parameters:
+            eval_kwargs = {'eval_X': (X_val,), 'eval_y': (y_val,)}
+        else:
+            eval_kwargs = {'eval_set': [(X_val, y_val)]}
+        model.fit(X_tr, y_tr, eval_metric='auc', **eval_kwargs,
+                  callbacks=[lightgbm.early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)])
+        return int(model.best_iteration_ or model.n_estimators)
+    if name == 'xgboost':
+        model.set_params(early_stopping_rounds=EARLY_STOPPING_ROUNDS)
+        model.fit(X_tr, y_tr, eval_set=[(X_val, y_val)], verbose=False)
+        return int(model.best_iteration) + 1
+    model.fit(X_tr, y_tr)
+    return None
+
+
+def serving_scorer(model):
+    """What serving scores with: the compiled NumPy scorer when the model exports to one, else the model"""
+    if CompiledForest.supports(model):
+        return CompiledForest.from_sklearn(model)
+    if LinearScorer.supports(model):
+        return LinearScorer.from_sklearn(model)
+    return model
+
+
+def single_row_latency(model, X: np.ndarray) -> Tuple[Optional[float], bool]:
+    """(median single-row latency in ms on the serving path, whether that path is a compiled fast path)"""
+    scorer = serving_scorer(model)
+    latencies = []
+    for row in X[:LATENCY_PROBES]:
+        row_start = time.perf_counter()
+        scorer.predict_proba(row.reshape(1, -1))
+        latencies.append(time.perf_counter() - row_start)
+    return (float(np.median(latencies)) * 1000 if latencies else None), scorer is not model
+
+
+def fit_candidate(name: str, X_tr: np.ndarray, y_tr: np.ndarray, X_val: np.ndarray, y_val: np.ndarray,
+                  n_jobs: int = 1, random_state: int = 42, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Fit one candidate and measure AUC, fit time and serving cost (picklable for process pools)"""
+    params = dict(params or {})
+    model = build_candidate(name, n_jobs=n_jobs, random_state=random_state, **params)
+    start = time.perf_counter()
+    best_iteration = _fit_with_early_stopping(name, model, X_tr, y_tr, X_val, y_val)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred_proba = model.predict_proba(X_val)[:, 1]
+    predict_time = time.perf_counter() - start
+
+    # Single-row latency is what online serving pays per request (compiled scorer when there is one)
+    latency_ms, fast_path = single_row_latency(model, X_val)
+
+    return {
+        'name': name,
+        'params': params,
+        'model': model,
+        'auc_score': float(roc_auc_score(y_val, y_pred_proba)),
+        'fit_time_s': fit_time,
+        'best_iteration': best_iteration,
+        'predict_rows_per_s': len(X_val) / predict_time if predict_time > 0 else float('inf'),
+        'single_row_latency_ms': latency_ms,
+        'fast_path': fast_path,
+        'n_train': len(X_tr),
+        'n_jobs': n_jobs,
+    }
+
+
+def _failed_candidate(name: str, error: Exception, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {'name': name, 'params': dict(params or {}), 'model': None, 'auc_score': None,
+            'error': f"{type(error).__name__}: {error}"}
+
+
+def cpu_split(n_tasks: int, max_workers: Optional[int] = None, cpu_budget: Optional[int] = None) -> Tuple[int, int]:
+    """(processes, threads per process) for ``n_tasks`` concurrent fits within ``cpu_budget`` cores"""
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    workers = max(1, min(max_workers or cpu_budget, n_tasks, cpu_budget))
+    return workers, max(1, cpu_budget // workers)
+
+
+def fit_candidates(specs: List[Tuple[str, Dict[str, Any]]], X_tr: np.ndarray, y_tr: np.ndarray,
+                   X_val: np.ndarray, y_val: np.ndarray, max_workers: Optional[int] = None,
+                   cpu_budget: Optional[int] = None, random_state: int = 42,
+                   verbose: bool = True) -> List[Dict[str, Any]]:
+    """Fit ``(name, params)`` specs concurrently on a process pool, splitting ``cpu_budget`` cores.
+
+    With one worker (or one spec) everything runs in this process. Failed fits are
+    reported with an ``error`` instead of aborting the run. Results keep spec order.
+    """
+    max_workers, n_jobs = cpu_split(len(specs), max_workers, cpu_budget)
+
+    if max_workers == 1:
+        results = []
+        for name, params in specs:
+            if verbose:
+                print(f"  Training {name} ({n_jobs} thread(s))...")
+            try:
+                results.append(fit_candidate(name, X_tr, y_tr, X_val, y_val, n_jobs, random_state, params))
+            except Exception as e:
+                results.append(_failed_candidate(name, e, params))
+        return results
+
+    if verbose:
+        print(f"  Training {len(specs)} candidates on {max_workers} processes x {n_jobs} thread(s)...")
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [(name, params, pool.submit(fit_candidate, name, X_tr, y_tr, X_val, y_val,
+                                              n_jobs, random_state, params))
+                   for name, params in specs]
+        results = []
+        for name, params, future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(_failed_candidate(name, e, params))
+    return results
+
+
+def train_candidates(names: List[str], X_tr: np.ndarray, y_tr: np.ndarray, X_val: np.ndarray,
+                     y_val: np.ndarray, max_workers: Optional[int] = None, cpu_budget: Optional[int] = None,
+                     random_state: int = 42) -> List[Dict[str, Any]]:
+    """Fit each named candidate with its default hyperparameters (see ``fit_candidates``)"""
+    return fit_candidates([(name, {}) for name in names], X_tr, y_tr, X_val, y_val,
+                          max_workers=max_workers, cpu_budget=cpu_budget, random_state=random_state)
+
+
+def final_model(result: Dict[str, Any], n_jobs: int = 1, random_state: int = 42):
+    """Unfitted estimator for refitting a candidate on all data (boosted: early-stopped round count)"""
+    params = dict(result.get('params') or {})
+    if result.get('best_iteration') is not None:
+        params['n_estimators'] = result['best_iteration']
+    return build_candidate(result['name'], n_jobs=n_jobs, random_state=random_state, **params)
+
+
+def select_candidate(results: List[Dict[str, Any]], auc_tolerance: float = 0.0) -> Optional[Dict[str, Any]]:
+    """Best-AUC candidate, or a faster compiled scorer within ``auc_tolerance`` of it.
+
+    AUC is only traded for latency in favour of candidates with a compiled fast path
+    (latency measured on their NumPy scorer); library-served models never win on speed.
+    """
+    fitted = [r for r in results if r.get('auc_score') is not None]
+    if not fitted:
+        return None
+    best = max(fitted, key=lambda r: r['auc_score'])
+    if auc_tolerance <= 0:
+        return best
+    eligible = [best] + [r for r in fitted if r is not best and r.get('fast_path')
+                         and r['auc_score'] >= best['auc_score'] - auc_tolerance]
+    return min(eligible, key=lambda r: (r['single_row_latency_ms'], -r['auc_score']))
+
+
+def format_timing_report(results: List[Dict[str, Any]]) -> str:
+    """Plain-text table of AUC, fit time and serving cost per candidate"""
+    lines = [f"  {'model':<14} {'AUC':>7} {'fit s':>8} {'iters':>6} {'rows/s':>11} {'1-row ms':>9} {'serving':>9}"]
+    for r in results:
+        if r.get('model') is None:
+            lines.append(f"  {r['name']:<14} failed: {r.get('error')}")
+            continue
+        iters = r['best_iteration'] if r['best_iteration'] is not None else '-'
+        lines.append(f"  {r['name']:<14} {r['auc_score']:>7.4f} {r['fit_time_s']:>8.2f} {iters:>6} "
+                     f"{r['predict_rows_per_s']:>11,.0f} {r['single_row_latency_ms']:>9.3f} "
+                     f"{'compiled' if r.get('fast_path') else 'library':>9}")
+    return "\n".join(lines)
+
+
+def extend_model(model, X: np.ndarray, y: np.ndarray, extra_rounds: int = 100, extra_trees: int = 20,
+                 linear_max_iter: int = 20) -> Tuple[Any, str]:
+    """Update a fitted model with new labeled rows only, returning ``(model, method)``.
+
+    Boosted models continue from their current booster with ``extra_rounds`` rounds,
+    random forests grow ``extra_trees`` trees on the new rows (warm start), and
+    logistic regression takes ``linear_max_iter`` warm-started solver iterations.
+    """
+    model_type = type(model).__name__
+    if model_type == 'LGBMClassifier':
+        from lightgbm import LGBMClassifier
+        params = {**model.get_params(), 'n_estimators': extra_rounds}
+        updated = LGBMClassifier(**params)
+        updated.fit(X, y, init_model=model.booster_)
+        return updated, f"lightgbm +{extra_rounds} boosting rounds"
+    if model_type == 'XGBClassifier':
+        from xgboost import XGBClassifier
+        params = {**model.get_params(), 'n_estimators': extra_rounds, 'early_stopping_rounds': None}
+        updated = XGBClassifier(**params)
+        updated.fit(X, y, xgb_model=model.get_booster(), verbose=False)
+        return updated, f"xgboost +{extra_rounds} boosting rounds"
+    if isinstance(model, RandomForestClassifier):
+        n_estimators = model.n_estimators
+        model.set_params(warm_start=True, n_estimators=n_estimators + extra_trees)
+        try:
+            model.fit(X, y)
+        finally:
+            model.set_params(warm_start=False)
+        return model, f"random forest +{extra_trees} trees"
+    if isinstance(model, LogisticRegression):
+        max_iter = model.max_iter
+        model.set_params(warm_start=True, max_iter=linear_max_iter)
+        try:
+            model.fit(X, y)
+        finally:
+            model.set_params(warm_start=False, max_iter=max_iter)
+        return model, f"logistic warm start ({linear_max_iter} iterations)"
+    raise ValueError(f"Incremental updates are not supported for {model_type}")
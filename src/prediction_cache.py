@@ -0,0 +1,133 @@
+# src/prediction_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from .feature_schema import FeatureSchema
+
+
+class PredictionCache:
+    """Bounded LRU + TTL cache of model probabilities keyed on schema-ordered feature rows.
+
+    Keys are the raw bytes of the float32 feature row, so two requests hit the same
+    entry only if every feature matches. ``quantization`` maps continuous features to
+    a rounding step (e.g. ``{"MonthlyIncome": 50}``); rows are rounded *before* scoring,
+    so a cached value is always the model's output for the quantized row. Changing the
+    model version drops every entry.
+    """
+
+    def __init__(self, max_entries: int = 100_000, ttl_seconds: float = 300.0,
+                 quantization: Optional[Dict[str, float]] = None,
+                 feature_schema: Optional[FeatureSchema] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.feature_schema = feature_schema or FeatureSchema.default()
+        self.quantization = dict(quantization or {})
+
+        unknown = [f for f in self.quantization if f not in self.feature_schema.index]
+        if unknown:
+            raise ValueError(f"Cannot quantize unknown features: {unknown}")
+        self._steps = np.zeros(self.feature_schema.n_features, dtype=np.float32)
+        for feature, step in self.quantization.items():
+            self._steps[self.feature_schema.index[feature]] = step
+        self._quantized_columns = np.flatnonzero(self._steps > 0)
+
+        self._entries: "OrderedDict[bytes, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.model_version: Optional[str] = None
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def set_model_version(self, version: str):
+        """Record the serving model version, clearing the cache if it changed"""
+        with self._lock:
+            if version != self.model_version:
+                if self._entries:
+                    self._invalidations += 1
+                self._entries.clear()
+                self.model_version = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def quantize(self, X: np.ndarray) -> np.ndarray:
+        """Round quantized columns to their step and normalize -0.0 so equal rows share a key"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        X = X + np.float32(0.0)  # copy; also turns -0.0 into 0.0
+        if len(self._quantized_columns):
+            cols = self._quantized_columns
+            steps = self._steps[cols]
+            X[:, cols] = np.round(X[:, cols] / steps) * steps
+        return np.ascontiguousarray(X)
+
+    def get_many(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(probabilities with NaN for misses, miss mask) for quantized rows ``X``"""
+        probabilities = np.full(len(X), np.nan)
+        now = time.monotonic()
+        with self._lock:
+            for i, row in enumerate(X):
+                key = row.tobytes()
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                probability, expires_at = entry
+                if expires_at < now:
+                    del self._entries[key]
+                    self._expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                probabilities[i] = probability
+            misses = np.isnan(probabilities)
+            n_misses = int(misses.sum())
+            self._misses += n_misses
+            self._hits += len(X) - n_misses
+        return probabilities, misses
+
+    def put_many(self, X: np.ndarray, probabilities: np.ndarray, model_version: Optional[str] = None):
+        """Store probabilities for quantized rows; ignored if the model changed since scoring"""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if model_version is not None and model_version != self.model_version:
+                return
+            for row, probability in zip(X, probabilities):
+                key = row.tobytes()
+                self._entries[key] = (float(probability), expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get(self, row: np.ndarray) -> Optional[float]:
+        probabilities, misses = self.get_many(np.asarray(row).reshape(1, -1))
+        return None if misses[0] else float(probabilities[0])
+
+    def put(self, row: np.ndarray, probability: float, model_version: Optional[str] = None):
+        self.put_many(np.asarray(row).reshape(1, -1), [probability], model_version)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "model_version": self.model_version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "quantization": self.quantization,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "invalidations": self._invalidations,
+        }
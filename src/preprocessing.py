@@ -0,0 +1,98 @@
+# src/preprocessing.py
+import hashlib
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+# How each feature's missing values are filled; features not listed are filled with 0
+IMPUTATION_STRATEGIES = {
+    'MonthlyIncome': 'median',
+    'NumberOfDependents': 'mode',
+}
+
+
+class CreditPreprocessor:
+    """Missing-value imputation fitted once on training data and reused everywhere.
+
+    The fitted fill values are stored in the model artifact and applied by the
+    same NumPy kernel in training, batch scoring and online serving: NaNs in a
+    schema-ordered float32 matrix are overwritten in place, with no DataFrame copy.
+    """
+
+    def __init__(self, features: List[str], fill_values: Optional[Dict[str, float]] = None,
+                 strategies: Optional[Dict[str, str]] = None):
+        self.features = list(features)
+        fill_values = fill_values or {}
+        self.fill_values = np.array([float(fill_values.get(f, 0.0)) for f in self.features], dtype=np.float32)
+        self.strategies = {f: s for f, s in (strategies or {}).items() if f in self.features}
+
+    @classmethod
+    def fit(cls, df, features: List[str], strategies: Optional[Dict[str, str]] = None) -> "CreditPreprocessor":
+        """Learn fill values from the training frame (medians/modes ignore missing values)"""
+        strategies = IMPUTATION_STRATEGIES if strategies is None else strategies
+        fill_values = {}
+        for feature, strategy in strategies.items():
+            if feature not in features or feature not in df.columns:
+                continue
+            values = df[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                continue
+            if strategy == 'median':
+                fill_values[feature] = float(np.median(values))
+            elif strategy == 'mean':
+                fill_values[feature] = float(np.mean(values))
+            elif strategy == 'mode':
+                uniques, counts = np.unique(values, return_counts=True)
+                fill_values[feature] = float(uniques[np.argmax(counts)])  # smallest value on ties
+            else:
+                raise ValueError(f"Unknown imputation strategy '{strategy}' for {feature}")
+        return cls(features, fill_values, strategies)
+
+    @property
+    def fill_value_map(self) -> Dict[str, float]:
+        return dict(zip(self.features, self.fill_values.tolist()))
+
+    @property
+    def fingerprint(self) -> str:
+        digest = hashlib.sha1("|".join(self.features).encode() + self.fill_values.tobytes())
+        return digest.hexdigest()[:12]
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Fill NaNs of a schema-ordered float32 matrix in place and return it"""
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError(f"Expected a matrix with {len(self.features)} columns, got shape {X.shape}")
+        missing = np.isnan(X)
+        if missing.any():
+            np.copyto(X, np.broadcast_to(self.fill_values, X.shape), where=missing)
+        return X
+
+    def missing_counts(self, X: np.ndarray) -> Dict[str, int]:
+        """Number of NaNs per feature (before ``transform``)"""
+        counts = np.isnan(X).sum(axis=0)
+        return {f: int(c) for f, c in zip(self.features, counts) if c}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'features': self.features,
+            'fill_values': self.fill_value_map,
+            'strategies': self.strategies
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CreditPreprocessor":
+        return cls(data['features'], data.get('fill_values'), data.get('strategies'))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        strategies = [self.strategies.get(f, 'constant') for f in self.features]
+        return {
+            'preprocessor_features': np.array(self.features),
+            'preprocessor_fill_values': self.fill_values,
+            'preprocessor_strategies': np.array(strategies)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "CreditPreprocessor":
+        features = [str(f) for f in arrays['preprocessor_features']]
+        fill_values = dict(zip(features, np.asarray(arrays['preprocessor_fill_values']).tolist()))
+        strategies = {f: str(s) for f, s in zip(features, arrays['preprocessor_strategies']) if str(s) != 'constant'}
+        return cls(features, fill_values, strategies)
@@ -0,0 +1,140 @@
+# src/risk_rules.py
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .feature_schema import FeatureSchema
+
+# Declarative risk rules: (feature, comparator, threshold, code, message, exclusive group).
+# Within an exclusive group only the first matching rule fires (e.g. "very high" wins over "high").
+# ``{value}`` in the message is the applicant's feature value. The 'missing' comparator fires when
+# the applicant did not report the feature (it is imputed before scoring, so its value can't tell).
+RISK_RULES = [
+    ('RevolvingUtilizationOfUnsecuredLines', '>', 0.8, 'UTILIZATION_VERY_HIGH', "Very high credit utilization ({value:.1%})", 'utilization'),
+    ('RevolvingUtilizationOfUnsecuredLines', '>', 0.5, 'UTILIZATION_HIGH', "High credit utilization ({value:.1%})", 'utilization'),
+    ('NumberOfTimes90DaysLate', '>', 0, 'LATE_90_DAYS', "Has {value:g} serious late payment(s) (90+ days)", None),
+    ('NumberOfTime60-89DaysPastDueNotWorse', '>', 0, 'LATE_60_89_DAYS', "Has {value:g} late payment(s) (60-89 days)", None),
+    ('NumberOfTime30-59DaysPastDueNotWorse', '>', 0, 'LATE_30_59_DAYS', "Has {value:g} late payment(s) (30-59 days)", None),
+    ('DebtRatio', '>', 0.5, 'DEBT_RATIO_HIGH', "High debt ratio ({value:.1%})", None),
+    ('age', '<', 25, 'AGE_YOUNG', "Young applicant with limited credit history", 'age'),
+    ('age', '>', 70, 'AGE_NEAR_RETIREMENT', "Older applicant near retirement", 'age'),
+    ('MonthlyIncome', 'missing', None, 'INCOME_MISSING', "Monthly income not reported", 'income'),
+    ('MonthlyIncome', '<', 2000, 'INCOME_LOW', "Low monthly income", 'income'),
+]
+
+# Recommendations keyed off risk codes: (trigger codes, recommendations), in output order
+RECOMMENDATION_RULES = [
+    (('UTILIZATION_VERY_HIGH', 'UTILIZATION_HIGH'),
+     ["Recommend paying down credit card balances", "Suggest credit utilization below 30%"]),
+    (('LATE_90_DAYS', 'LATE_60_89_DAYS', 'LATE_30_59_DAYS'),
+     ["Focus on improving payment history", "Consider automatic payment setup"]),
+    (('DEBT_RATIO_HIGH',),
+     ["Recommend debt consolidation", "Suggest increasing income or reducing expenses"]),
+]
+
+HIGH_PROBABILITY_RECOMMENDATIONS = ["Consider requiring a co-signer", "Suggest smaller loan amount"]
+DEFAULT_RECOMMENDATION = "Application meets standard criteria"
+
+COMPARATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+
+class RiskRuleEngine:
+    """Evaluate the risk rule table as boolean masks over a batch of applicants"""
+
+    def __init__(self, feature_schema: Optional[FeatureSchema] = None, rules: List[tuple] = None,
+                 recommendation_rules: List[tuple] = None, high_probability: float = 0.7):
+        self.feature_schema = feature_schema or FeatureSchema.default()
+        self.rules = list(rules if rules is not None else RISK_RULES)
+        self.recommendation_rules = list(recommendation_rules if recommendation_rules is not None
+                                         else RECOMMENDATION_RULES)
+        self.high_probability = high_probability
+
+        unknown = [rule[0] for rule in self.rules if rule[0] not in self.feature_schema.index]
+        if unknown:
+            raise ValueError(f"Risk rules reference features missing from the schema: {unknown}")
+
+        self.codes = [rule[3] for rule in self.rules]
+        self.messages = [rule[4] for rule in self.rules]
+        self.code_index = {code: i for i, code in enumerate(self.codes)}
+        self._columns = np.array([self.feature_schema.index[rule[0]] for rule in self.rules], dtype=np.intp)
+        self._thresholds = np.array([rule[2] for rule in self.rules], dtype=np.float64)
+        self._comparator_rules = {}
+        for i, rule in enumerate(self.rules):
+            self._comparator_rules.setdefault(rule[1], []).append(i)
+
+        # For each exclusive group, the rule indices in priority order
+        self._groups: Dict[str, List[int]] = {}
+        for i, rule in enumerate(self.rules):
+            if rule[5] is not None:
+                self._groups.setdefault(rule[5], []).append(i)
+
+        self._recommendation_columns = [
+            (np.array([self.code_index[c] for c in codes if c in self.code_index], dtype=np.intp), recs)
+            for codes, recs in self.recommendation_rules
+        ]
+
+    def evaluate(self, X: np.ndarray, missing: Optional[np.ndarray] = None) -> np.ndarray:
+        """Boolean (n_applicants, n_rules) matrix of fired rules.
+
+        ``missing`` (``FeatureSchema.missing_mask``) marks features the applicants did not
+        report; without it, NaN cells in ``X`` count as missing.
+        """
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        values = X[:, self._columns]
+        masks = np.zeros(values.shape, dtype=bool)
+        for comparator, rule_ids in self._comparator_rules.items():
+            if comparator == 'missing':
+                if missing is None:
+                    masks[:, rule_ids] = np.isnan(values[:, rule_ids])
+                else:
+                    masks[:, rule_ids] = np.asarray(missing).reshape(len(X), -1)[:, self._columns[rule_ids]]
+                continue
+            masks[:, rule_ids] = COMPARATORS[comparator](values[:, rule_ids], self._thresholds[rule_ids])
+
+        for rule_ids in self._groups.values():
+            # Suppress any rule preceded by a fired rule of the same group
+            group = masks[:, rule_ids]
+            earlier_fired = np.logical_or.accumulate(group, axis=1)
+            group[:, 1:] &= ~earlier_fired[:, :-1]
+            masks[:, rule_ids] = group
+        return masks
+
+    def risk_codes(self, masks: np.ndarray) -> List[List[str]]:
+        return [[self.codes[j] for j in np.flatnonzero(row)] for row in masks]
+
+    def risk_factors(self, X: np.ndarray, masks: np.ndarray) -> List[List[str]]:
+        """Human-readable messages for the fired rules of each applicant"""
+        X = np.asarray(X).reshape(len(masks), -1)
+        factors = [[] for _ in range(len(masks))]
+        rows, rules = np.nonzero(masks)
+        for i, j in zip(rows.tolist(), rules.tolist()):
+            factors[i].append(self.messages[j].format(value=float(X[i, self._columns[j]])))
+        return factors
+
+    def assess(self, X: np.ndarray, missing: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[List[str]], List[List[str]]]:
+        """(masks, risk codes, risk factor messages) for a batch of applicants"""
+        masks = self.evaluate(X, missing)
+        return masks, self.risk_codes(masks), self.risk_factors(X, masks)
+
+    def recommendations(self, masks: np.ndarray, probabilities: np.ndarray) -> List[List[str]]:
+        """Recommendations for each applicant, keyed off fired risk codes"""
+        masks = np.asarray(masks).reshape(-1, len(self.rules))
+        probabilities = np.asarray(probabilities, dtype=np.float64).reshape(-1)
+        triggers = [probabilities > self.high_probability]
+        triggers += [masks[:, columns].any(axis=1) for columns, _ in self._recommendation_columns]
+        triggers = np.column_stack(triggers)
+        blocks = [HIGH_PROBABILITY_RECOMMENDATIONS] + [recs for _, recs in self._recommendation_columns]
+
+        results = []
+        for row in triggers:
+            recs = [rec for fired, block in zip(row, blocks) if fired for rec in block]
+            results.append(recs or [DEFAULT_RECOMMENDATION])
+        return results
@@ -0,0 +1,122 @@
+# src/serving_model.py
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .cascade import load_cascade
+from .credit_agent import CreditAgent
+from .credit_scoring_model import load_serving_model, model_artifact_version
+
+# Applicant scored by the warm-up self-test (same as the API docs example)
+SELF_TEST_APPLICANT = {
+    "RevolvingUtilizationOfUnsecuredLines": 0.5,
+    "age": 35,
+    "NumberOfTime30-59DaysPastDueNotWorse": 0,
+    "DebtRatio": 0.3,
+    "MonthlyIncome": 5000,
+    "NumberOfOpenCreditLinesAndLoans": 5,
+    "NumberOfTimes90DaysLate": 0,
+    "NumberRealEstateLoansOrLines": 1,
+    "NumberOfTime60-89DaysPastDueNotWorse": 0,
+    "NumberOfDependents": 1
+}
+
+
+class ServingModel:
+    """One loaded model version with its agent and schema.
+
+    The API holds a single reference to the active ``ServingModel`` and replaces it in
+    one assignment, so a request that started on a model finishes on that model.
+    ``version`` is the artifact version (also used by the prediction cache);
+    ``registry_name``/``registry_version`` are set when the model came from the registry.
+    With a ``cascade`` the first stage answers confident rows (the version gets its cutoff tag).
+    """
+
+    def __init__(self, model, feature_importance, feature_schema, version: str, model_path: str,
+                 registry_name: Optional[str] = None, registry_version: Optional[str] = None, cascade=None):
+        self.model = model
+        self.feature_importance = feature_importance
+        self.feature_schema = feature_schema
+        self.agent = CreditAgent(model, feature_importance, feature_schema)
+        self.cascade = cascade
+        self.scorer = cascade if cascade is not None else model
+        self.version = f"{version}+{cascade.tag}" if cascade is not None else version
+        self.model_path = str(model_path)
+        self.registry_name = registry_name
+        self.registry_version = registry_version
+        self.loaded_at = datetime.now().isoformat()
+        self.self_test: Dict[str, Any] = {}
+
+    @classmethod
+    def load(cls, model_path: str, prefer_compiled: bool = True, verify_checksum: bool = True,
+             registry_name: Optional[str] = None, registry_version: Optional[str] = None,
+             cascade: bool = False) -> "ServingModel":
+        """Load a model file (or its artifact) and check it against its feature schema"""
+        model, feature_importance, feature_schema = load_serving_model(
+            model_path, prefer_compiled=prefer_compiled, verify_checksum=verify_checksum
+        )
+        # Refuse to serve if the request schema and the model disagree
+        feature_schema.validate_model(model)
+        version = model_artifact_version(model_path, prefer_compiled=prefer_compiled)
+        cascade_scorer = None
+        if cascade:
+            cascade_scorer = load_cascade(model_path, model, model_artifact_version(model_path),
+                                          prefer_compiled=prefer_compiled, verify_checksum=verify_checksum)
+        return cls(model, feature_importance, feature_schema, version, model_path, registry_name, registry_version,
+                   cascade=cascade_scorer)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Positive-class probabilities (through the cascade when one is configured)"""
+        return self.scorer.predict_proba(X)[:, 1]
+
+    def process_query(self, features: Dict[str, Any], query: str, probability: float = None) -> Dict[str, Any]:
+        return self.agent.process_query(features, query, probability=probability)
+
+    def process_batch(self, requests: List[Tuple[Dict[str, Any], str]],
+                      probabilities: np.ndarray = None) -> List[Dict[str, Any]]:
+        return self.agent.process_batch(requests, probabilities)
+
+    def self_test_batch(self, n_rows: int = 64) -> np.ndarray:
+        """Example applicant plus all-missing rows (exercises imputation), tiled to ``n_rows``"""
+        records = [SELF_TEST_APPLICANT, {}]
+        return self.feature_schema.transform([records[i % len(records)] for i in range(n_rows)])
+
+    def warm_up(self, n_rows: int = 64) -> Dict[str, Any]:
+        """Score a self-test batch, single rows and one agent query; raise if the outputs are invalid"""
+        X = self.self_test_batch(n_rows)
+
+        start = time.perf_counter()
+        probabilities = self.predict_proba(X)
+        batch_ms = (time.perf_counter() - start) * 1000
+        if len(probabilities) != n_rows or not np.all(np.isfinite(probabilities)) \
+                or probabilities.min() < 0 or probabilities.max() > 1:
+            raise ValueError(f"Model {self.version} failed the self-test: invalid probabilities")
+
+        start = time.perf_counter()
+        single = [float(self.predict_proba(X[i:i + 1])[0]) for i in range(2)]
+        single_row_ms = (time.perf_counter() - start) * 1000 / 2
+        if not np.allclose(single, probabilities[:2], atol=1e-6):
+            raise ValueError(f"Model {self.version} failed the self-test: single-row and batch scores differ")
+
+        self.process_batch([(SELF_TEST_APPLICANT, "explain")], probabilities[:1])
+        self.self_test = {
+            "rows": n_rows,
+            "batch_ms": round(batch_ms, 3),
+            "single_row_ms": round(single_row_ms, 3),
+            "test_probability": round(float(probabilities[0]), 6)
+        }
+        return self.self_test
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "model_version": self.version,
+            "model_type": type(self.model).__name__,
+            "model_path": self.model_path,
+            "registry_name": self.registry_name,
+            "registry_version": self.registry_version,
+            "cascade": self.cascade.stats() if self.cascade is not None else None,
+            "loaded_at": self.loaded_at,
+            "self_test": self.self_test
+        }
@@ -0,0 +1,213 @@
+# src/shadow_scoring.py
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from scipy.stats import spearmanr
+from sklearn.metrics import roc_auc_score
+
+from .credit_agent import RISK_LEVEL_CUTOFFS, get_risk_levels
+
+# Champion probability above which an applicant counts as a positive for the AUC proxy (High Risk and up)
+PSEUDO_LABEL_CUTOFF = float(RISK_LEVEL_CUTOFFS[1])
+# Most rows scored per challenger call
+MAX_SHADOW_BATCH = 256
+
+
+class ChallengerStats:
+    """Running agreement statistics of one challenger against the champion"""
+
+    def __init__(self, window: int = 10000):
+        self.n = 0
+        self.sum_delta = 0.0
+        self.sum_abs_delta = 0.0
+        self.max_abs_delta = 0.0
+        self.risk_agreements = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        # Recent (champion, challenger) pairs for rank-based stats
+        self._champion = deque(maxlen=window)
+        self._challenger = deque(maxlen=window)
+
+    def update(self, champion: np.ndarray, challenger: np.ndarray):
+        delta = challenger - champion
+        agreements = int((get_risk_levels(champion) == get_risk_levels(challenger)).sum())
+        with self._lock:
+            self.n += len(delta)
+            self.sum_delta += float(delta.sum())
+            self.sum_abs_delta += float(np.abs(delta).sum())
+            self.max_abs_delta = max(self.max_abs_delta, float(np.abs(delta).max()))
+            self.risk_agreements += agreements
+            self._champion.extend(champion.tolist())
+            self._challenger.extend(challenger.tolist())
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            champion, challenger = np.asarray(self._champion), np.asarray(self._challenger)
+        labels = champion >= PSEUDO_LABEL_CUTOFF
+        auc_proxy = None
+        if 0 < labels.sum() < len(labels):
+            auc_proxy = float(roc_auc_score(labels, challenger))
+        rank_correlation = None
+        if len(champion) > 2 and champion.std() > 0 and challenger.std() > 0:
+            rank_correlation = float(spearmanr(champion, challenger)[0])
+        return {
+            "scored": self.n,
+            "mean_delta": self.sum_delta / self.n if self.n else None,
+            "mean_abs_delta": self.sum_abs_delta / self.n if self.n else None,
+            "max_abs_delta": self.max_abs_delta if self.n else None,
+            "risk_level_agreement": self.risk_agreements / self.n if self.n else None,
+            "auc_vs_champion": auc_proxy,
+            "rank_correlation": rank_correlation,
+            "window": len(champion),
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+class ShadowScorer:
+    """Score a sample of live traffic with challenger models on a background thread.
+
+    ``submit`` only samples and enqueues (it never scores), so the champion's latency is
+    unaffected; when the bounded queue is full the row is dropped. The worker thread
+    scores queued rows in batches and sleeps after each batch so its CPU time stays
+    within ``cpu_budget`` of one core (0.1 = 10%). Every shadow-scored row is appended
+    to ``log_path`` as one JSON line with the champion score and each challenger's delta.
+    """
+
+    def __init__(self, challengers: List[Any], sample_rate: float = 0.1, cpu_budget: float = 0.1,
+                 queue_size: int = 1000, log_path: Optional[str] = None, stats_window: int = 10000):
+        if not 0 < cpu_budget <= 1:
+            raise ValueError("cpu_budget must be in (0, 1]")
+        self.challengers = list(challengers)
+        self.sample_rate = sample_rate
+        self.cpu_budget = cpu_budget
+        self.log_path = str(log_path) if log_path else None
+        self.stats = {c.version: ChallengerStats(stats_window) for c in self.challengers}
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._log_file = None
+
+        self._submitted = 0
+        self._sampled_out = 0
+        self._dropped = 0
+        self._batches = 0
+        self._cpu_time = 0.0
+        self._throttle_time = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self.log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            self._log_file = open(self.log_path, "a", buffering=1 << 16)
+        self._thread = threading.Thread(target=self._run, name="shadow-scoring", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    def submit(self, features: Dict[str, Any], champion_probability: float,
+               champion_version: Optional[str] = None, endpoint: str = "/predict"):
+        """Maybe queue one scored request for shadow scoring (never blocks)"""
+        self._submitted += 1
+        if random.random() >= self.sample_rate:
+            self._sampled_out += 1
+            return
+        try:
+            self._queue.put_nowait((features, float(champion_probability), champion_version, endpoint, time.time()))
+        except queue.Full:
+            self._dropped += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.2)]
+            except queue.Empty:
+                continue
+            while len(batch) < MAX_SHADOW_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            cpu_start = time.thread_time()
+            self._score(batch)
+            cpu_used = time.thread_time() - cpu_start
+            self._cpu_time += cpu_used
+            self._batches += 1
+
+            # Duty cycle: idle long enough that busy / (busy + idle) <= cpu_budget
+            pause = cpu_used * (1 - self.cpu_budget) / self.cpu_budget
+            if pause > 0:
+                self._throttle_time += pause
+                self._stop.wait(pause)
+
+    def _score(self, batch):
+        champion = np.array([item[1] for item in batch])
+        records = [item[0] for item in batch]
+        scores = {}
+        for challenger in self.challengers:
+            stats = self.stats[challenger.version]
+            try:
+                probabilities = challenger.predict_proba(challenger.feature_schema.transform(records))
+                probabilities = np.asarray(probabilities, dtype=np.float64)
+            except Exception as e:
+                stats.errors += len(batch)
+                stats.last_error = f"{type(e).__name__}: {e}"
+                continue
+            stats.update(champion, probabilities)
+            scores[challenger.version] = probabilities
+
+        if self._log_file is not None:
+            lines = []
+            for i, (_, p, champion_version, endpoint, submitted_at) in enumerate(batch):
+                lines.append(json.dumps({
+                    "timestamp": datetime.fromtimestamp(submitted_at).isoformat(),
+                    "endpoint": endpoint,
+                    "champion_version": champion_version,
+                    "champion": round(p, 6),
+                    "challengers": {
+                        version: {"probability": round(float(s[i]), 6), "delta": round(float(s[i]) - p, 6)}
+                        for version, s in scores.items()
+                    }
+                }))
+            self._log_file.write("\n".join(lines) + "\n")
+            self._log_file.flush()
+
+    def summary(self) -> Dict[str, Any]:
+        """Queue/throttling counters plus per-challenger agreement stats"""
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "sample_rate": self.sample_rate,
+            "cpu_budget": self.cpu_budget,
+            "submitted": self._submitted,
+            "sampled_out": self._sampled_out,
+            "dropped": self._dropped,
+            "queue_depth": self._queue.qsize(),
+            "batches": self._batches,
+            "cpu_time_s": round(self._cpu_time, 3),
+            "throttle_time_s": round(self._throttle_time, 3),
+            "log_path": self.log_path,
+            "challengers": {
+                c.version: {"registry_name": c.registry_name, "registry_version": c.registry_version,
+                            "model_type": type(c.model).__name__, **self.stats[c.version].summary()}
+                for c in self.challengers
+            },
+        }
@@ -0,0 +1,175 @@
+# src/what_if.py
+import re
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+
+from .feature_schema import FeatureSchema
+
+# Phrases that refer to a feature, longest first so "debt ratio" wins over "debt"
+FEATURE_ALIASES = [
+    ('credit utilization', 'RevolvingUtilizationOfUnsecuredLines'),
+    ('open credit lines', 'NumberOfOpenCreditLinesAndLoans'),
+    ('real estate loans', 'NumberRealEstateLoansOrLines'),
+    ('utilization', 'RevolvingUtilizationOfUnsecuredLines'),
+    ('debt ratio', 'DebtRatio'),
+    ('credit lines', 'NumberOfOpenCreditLinesAndLoans'),
+    ('dependents', 'NumberOfDependents'),
+    ('mortgages', 'NumberRealEstateLoansOrLines'),
+    ('salary', 'MonthlyIncome'),
+    ('income', 'MonthlyIncome'),
+    ('debt', 'DebtRatio'),
+    ('age', 'age'),
+]
+
+FEATURE_LABELS = {
+    'RevolvingUtilizationOfUnsecuredLines': 'credit utilization',
+    'DebtRatio': 'debt ratio',
+    'MonthlyIncome': 'income',
+    'NumberOfOpenCreditLinesAndLoans': 'open credit lines',
+    'NumberRealEstateLoansOrLines': 'real estate loans',
+    'NumberOfDependents': 'dependents',
+    'age': 'age',
+}
+
+# Relative change applied when a feature is mentioned without an amount
+DEFAULT_CHANGES = {
+    'DebtRatio': -0.3,
+    'RevolvingUtilizationOfUnsecuredLines': -0.5,
+}
+
+# Features expressed as ratios, so "utilization to 30%" means an absolute value of 0.3
+RATIO_FEATURES = {'RevolvingUtilizationOfUnsecuredLines', 'DebtRatio'}
+
+DECREASE_WORDS = ('reduce', 'decrease', 'lower', 'drop', 'cut', 'pay down', 'fall', 'less', 'down')
+
+_NUMBER = r'[+-]?\d+(?:\.\d+)?'
+_SWEEP = re.compile(
+    rf'(?P<feature>[a-z ]+?)\s+from\s+(?P<start>{_NUMBER})\s*%\s+to\s+(?P<stop>{_NUMBER})\s*%'
+    rf'\s+(?:in|by|with|using)\s+(?P<step>\d+(?:\.\d+)?)\s*%\s+steps?'
+)
+_PERCENT = re.compile(rf'(?P<amount>{_NUMBER})\s*%')
+_ABSOLUTE = re.compile(rf'\bto\s+(?P<value>{_NUMBER})(?!\s*%)')
+_ABSOLUTE_PERCENT = re.compile(rf'\bto\s+(?P<value>{_NUMBER})\s*%')
+_CLAUSES = re.compile(r'[,;]|\band\b|\bthen\b')
+
+# A perturbation is (feature, mode, amount); mode is 'relative' (x * (1 + amount)) or 'absolute'
+Perturbation = Tuple[str, str, float]
+
+
+class WhatIfEngine:
+    """Parse what-if questions into feature perturbations and re-score all variants in one call"""
+
+    def __init__(self, model=None, feature_schema: Optional[FeatureSchema] = None, max_variants: int = 200):
+        self.model = model
+        self.feature_schema = feature_schema or FeatureSchema.default()
+        self.max_variants = max_variants
+        self.aliases = [(phrase, feature) for phrase, feature in FEATURE_ALIASES
+                        if feature in self.feature_schema.index]
+
+    def _find_feature(self, text: str, last: bool = False) -> Optional[str]:
+        """Feature named in ``text``: the highest-priority alias, or with ``last`` the final mention"""
+        mentions = []
+        for priority, (phrase, feature) in enumerate(self.aliases):
+            for match in re.finditer(rf'\b{re.escape(phrase)}\b', text):
+                mentions.append((match.end(), -priority, feature))
+        if not mentions:
+            return None
+        if last:
+            return max(mentions)[2]
+        return max(mentions, key=lambda mention: mention[1])[2]
+
+    @staticmethod
+    def _label(feature: str, mode: str, amount: float) -> str:
+        name = FEATURE_LABELS.get(feature, feature)
+        if mode == 'absolute':
+            return f"{name} set to {amount:g}"
+        return f"{name} {amount:+.0%}" if abs(amount * 100 - round(amount * 100)) < 1e-9 else f"{name} {amount:+.1%}"
+
+    def parse(self, text: str) -> List[Tuple[str, List[Perturbation]]]:
+        """Turn a question into labelled scenarios (each a list of perturbations)"""
+        text = text.lower()
+        scenarios = []
+
+        # Sweeps: "income from -30% to +50% in 5% steps"
+        for match in _SWEEP.finditer(text):
+            feature = self._find_feature(match.group('feature'), last=True)
+            step = float(match.group('step'))
+            if feature is None or step <= 0:
+                continue
+            start, stop = float(match.group('start')), float(match.group('stop'))
+            direction = 1 if stop >= start else -1
+            for pct in np.arange(start, stop + direction * step / 2, direction * step):
+                amount = round(float(pct), 10) / 100.0
+                scenarios.append((self._label(feature, 'relative', amount), [(feature, 'relative', amount)]))
+        text = _SWEEP.sub(' ', text)
+
+        # Single changes, one per clause: "increase income by 20%", "reduce debt ratio to 0.2"
+        for clause in _CLAUSES.split(text):
+            feature = self._find_feature(clause)
+            if feature is None:
+                continue
+            decrease = any(word in clause for word in DECREASE_WORDS)
+            percent = _PERCENT.search(clause)
+            absolute = _ABSOLUTE.search(clause)
+            absolute_percent = _ABSOLUTE_PERCENT.search(clause)
+            if absolute_percent is not None and feature in RATIO_FEATURES:
+                perturbation = (feature, 'absolute', float(absolute_percent.group('value')) / 100.0)
+            elif percent is not None:
+                amount = float(percent.group('amount')) / 100.0
+                if decrease and amount > 0:
+                    amount = -amount
+                perturbation = (feature, 'relative', amount)
+            elif absolute is not None:
+                perturbation = (feature, 'absolute', float(absolute.group('value')))
+            elif feature in DEFAULT_CHANGES:
+                perturbation = (feature, 'relative', DEFAULT_CHANGES[feature])
+            else:
+                continue
+            scenarios.append((self._label(*perturbation), [perturbation]))
+
+        return scenarios[:self.max_variants]
+
+    def build_variants(self, base_row: np.ndarray, scenarios: List[Tuple[str, List[Perturbation]]]) -> np.ndarray:
+        """Stack the base row and one perturbed copy per scenario into a single float32 matrix"""
+        X = np.repeat(np.asarray(base_row, dtype=np.float32).reshape(1, -1), len(scenarios) + 1, axis=0)
+        for i, (_, perturbations) in enumerate(scenarios, start=1):
+            for feature, mode, amount in perturbations:
+                j = self.feature_schema.index[feature]
+                value = X[0, j] * (1.0 + amount) if mode == 'relative' else amount
+                X[i, j] = max(0.0, value)
+        return X
+
+    def evaluate(self, features: Dict[str, Any], scenarios: List[Tuple[str, List[Perturbation]]]) -> Dict[str, Any]:
+        """Score the applicant and every scenario with one ``predict_proba`` call"""
+        from .credit_agent import get_risk_levels
+
+        X = self.build_variants(self.feature_schema.transform(features)[0], scenarios)
+        probabilities = None
+        if self.model is not None:
+            probabilities = np.asarray(self.model.predict_proba(X)[:, 1], dtype=np.float64)
+            risk_levels = get_risk_levels(probabilities)
+
+        results = []
+        for i, (label, perturbations) in enumerate(scenarios, start=1):
+            result = {
+                "scenario": label,
+                "changes": {feature: float(X[i, self.feature_schema.index[feature]])
+                            for feature, _, _ in perturbations},
+            }
+            if probabilities is not None:
+                result.update({
+                    "probability": float(probabilities[i]),
+                    "delta": float(probabilities[i] - probabilities[0]),
+                    "risk_level": str(risk_levels[i]),
+                    "risk_level_changed": bool(risk_levels[i] != risk_levels[0]),
+                })
+            results.append(result)
+
+        return {
+            "base_probability": float(probabilities[0]) if probabilities is not None else None,
+            "base_risk_level": str(risk_levels[0]) if probabilities is not None else None,
+            "results": results,
+        }
+
+    def run(self, features: Dict[str, Any], text: str) -> Dict[str, Any]:
+        return self.evaluate(features, self.parse(text))
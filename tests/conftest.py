@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# Import the project packages (src, api, models) the same way the entry points do
+sys.path.insert(0, str(Path(__file__).parent.parent))
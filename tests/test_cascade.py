@@ -0,0 +1,46 @@
+# tests/test_cascade.py
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier
+
+from src.cascade import CascadeScorer, HIGH_EDGE, LOW_EDGE
+
+
+def _cascade():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 4)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * rng.normal(size=2000) > 0).astype(int)
+    first_stage = LogisticRegression().fit(X, y)
+    full_model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    return CascadeScorer(first_stage, full_model, LOW_EDGE, HIGH_EDGE), X
+
+
+def test_score_matches_predict_positive_and_is_not_counted():
+    cascade, X = _cascade()
+    probabilities, n_full = cascade.score(X)
+    assert cascade.stats()['rows'] == 0
+    first = cascade.first_stage.predict_proba(X)[:, 1]
+    assert n_full == int(((first >= LOW_EDGE) & (first < HIGH_EDGE)).sum())
+    np.testing.assert_array_equal(cascade.predict_positive(X), probabilities)
+    stats = cascade.stats()
+    assert (stats['rows'], stats['full_model_rows']) == (len(X), n_full)
+
+
+def test_record_counts_rows_scored_elsewhere():
+    # Process workers return (probabilities, n_full) and the parent records them
+    cascade, X = _cascade()
+    probabilities, n_full = cascade.score(X[:100])
+    cascade.record(len(probabilities), n_full)
+    stats = cascade.stats()
+    assert stats['rows'] == 100
+    assert stats['first_stage_share'] == 1 - n_full / 100
+
+
+def test_concurrent_counting_is_exact():
+    cascade, _ = _cascade()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: [cascade.record(3, 1) for _ in range(1000)], range(8)))
+    stats = cascade.stats()
+    assert (stats['rows'], stats['full_model_rows']) == (24000, 8000)
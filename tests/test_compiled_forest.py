@@ -0,0 +1,84 @@
+# tests/test_compiled_forest.py
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from src.compiled_forest import CompiledForest
+from src.model_artifact import artifact_kind
+
+N_FEATURES = 6
+
+
+def _data(n_rows, seed=0, nan_fraction=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, N_FEATURES)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=n_rows) > 0).astype(int)
+    if nan_fraction:
+        X[rng.random(X.shape) < nan_fraction] = np.nan
+    return X, y
+
+
+def _assert_exact(forest, X):
+    compiled = CompiledForest.from_sklearn(forest)
+    expected = forest.predict_proba(np.atleast_2d(X))
+    assert np.array_equal(compiled.predict_positive(X), expected[:, 1])
+    # Serving uses the positive class; the negative column is 1 - p rather than sklearn's own sum
+    assert np.array_equal(compiled.predict_proba(X)[:, 1], expected[:, 1])
+    np.testing.assert_allclose(compiled.predict_proba(X)[:, 0], expected[:, 0], rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("forest", [
+    RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0),
+    RandomForestClassifier(n_estimators=10, random_state=0),  # fully grown trees
+    ExtraTreesClassifier(n_estimators=15, max_depth=6, random_state=0),
+])
+def test_matches_sklearn_exactly_on_random_inputs(forest):
+    X, y = _data(2000)
+    forest.fit(X, y)
+    X_test, _ = _data(3000, seed=1)
+    _assert_exact(forest, X_test)
+    _assert_exact(forest, X_test[:1])
+    _assert_exact(forest, X_test[7])
+
+
+@pytest.mark.parametrize("n_estimators", [1, 16])
+def test_matches_sklearn_exactly_with_sample_weights(n_estimators):
+    # Soft-label (distillation) fits give leaf fractions that do not sum to exactly 1
+    X, _ = _data(1500)
+    p = np.random.default_rng(2).random(len(X))
+    forest = RandomForestClassifier(n_estimators=n_estimators, max_depth=8, min_samples_leaf=20,
+                                    bootstrap=False, max_features=0.5, random_state=0)
+    forest.fit(np.concatenate([X, X]), np.r_[np.ones(len(X)), np.zeros(len(X))], sample_weight=np.r_[p, 1 - p])
+    _assert_exact(forest, _data(2000, seed=3)[0])
+
+
+def test_matches_sklearn_exactly_with_missing_values():
+    X, y = _data(2000, nan_fraction=0.1)
+    forest = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+    if compiled.missing_go_to_left is None:
+        pytest.skip("this sklearn version does not route missing values in forests")
+    X_test, _ = _data(2000, seed=4, nan_fraction=0.2)
+    X_test[:5] = np.nan
+    _assert_exact(forest, X_test)
+
+
+def test_small_chunks_and_array_round_trip_stay_exact():
+    X, y = _data(1000)
+    forest = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+    compiled.chunk_size = 7
+    X_test, _ = _data(500, seed=5)
+    expected = forest.predict_proba(X_test)[:, 1]
+    assert np.array_equal(compiled.predict_positive(X_test), expected)
+
+    arrays = compiled.to_arrays()
+    assert artifact_kind(arrays) == 'forest'
+    assert np.array_equal(CompiledForest.from_arrays(arrays).predict_positive(X_test), expected)
+
+
+def test_rejects_wrong_feature_count():
+    X, y = _data(200)
+    compiled = CompiledForest.from_sklearn(RandomForestClassifier(n_estimators=3, random_state=0).fit(X, y))
+    with pytest.raises(ValueError):
+        compiled.predict_positive(np.zeros((2, N_FEATURES + 1), dtype=np.float32))
@@ -0,0 +1,92 @@
+# tests/test_linear_scorer.py
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from src.credit_scoring_model import FAST_PATH_TOLERANCE
+from src.feature_schema import CREDIT_FEATURES, FeatureSchema
+from src.linear_scorer import LinearScorer
+from src.preprocessing import CreditPreprocessor
+
+
+def _frame(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'RevolvingUtilizationOfUnsecuredLines': rng.random(n_rows),
+        'age': rng.integers(21, 90, n_rows),
+        'NumberOfTime30-59DaysPastDueNotWorse': rng.poisson(0.3, n_rows),
+        'DebtRatio': rng.random(n_rows) * 2,
+        'MonthlyIncome': rng.lognormal(8.5, 0.6, n_rows),
+        'NumberOfOpenCreditLinesAndLoans': rng.integers(0, 20, n_rows),
+        'NumberOfTimes90DaysLate': rng.poisson(0.2, n_rows),
+        'NumberRealEstateLoansOrLines': rng.integers(0, 4, n_rows),
+        'NumberOfTime60-89DaysPastDueNotWorse': rng.poisson(0.1, n_rows),
+        'NumberOfDependents': rng.integers(0, 5, n_rows).astype(float),
+    })
+    logit = -2 + 2.5 * df['RevolvingUtilizationOfUnsecuredLines'] + 0.8 * df['NumberOfTimes90DaysLate'] - 0.02 * df['age']
+    y = (rng.random(n_rows) < 1 / (1 + np.exp(-logit))).astype(int)
+    return df, y
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    df, y = _frame(3000)
+    df.loc[df.sample(frac=0.15, random_state=0).index, 'MonthlyIncome'] = np.nan
+    df.loc[df.sample(frac=0.05, random_state=1).index, 'NumberOfDependents'] = np.nan
+    schema = FeatureSchema(CREDIT_FEATURES, preprocessor=CreditPreprocessor.fit(df, CREDIT_FEATURES))
+    X = schema.transform_frame(df)
+    model = LogisticRegression(max_iter=1000).fit(X, y)
+    return model, LinearScorer.from_sklearn(model, feature_names=CREDIT_FEATURES), schema
+
+
+def _assert_parity(model, scorer, X):
+    expected = model.predict_proba(X)
+    np.testing.assert_allclose(scorer.predict_proba(X), expected, rtol=0, atol=FAST_PATH_TOLERANCE)
+    np.testing.assert_allclose(scorer.predict_positive(X), expected[:, 1], rtol=0, atol=FAST_PATH_TOLERANCE)
+
+
+def test_batch_matches_sklearn(fitted):
+    model, scorer, schema = fitted
+    _assert_parity(model, scorer, schema.transform_frame(_frame(5000, seed=1)[0]))
+
+
+def test_single_rows_match_sklearn_and_batch(fitted):
+    model, scorer, schema = fitted
+    X = schema.transform_frame(_frame(50, seed=2)[0])
+    batch = scorer.predict_positive(X)
+    for i in range(len(X)):
+        _assert_parity(model, scorer, X[i:i + 1])
+        np.testing.assert_allclose(scorer.predict_positive(X[i]), batch[i:i + 1], rtol=0, atol=FAST_PATH_TOLERANCE)
+
+
+def test_nan_imputed_rows_match_sklearn(fitted):
+    model, scorer, schema = fitted
+    df, _ = _frame(500, seed=3)
+    df.loc[::3, 'MonthlyIncome'] = np.nan
+    df.loc[::5, 'NumberOfDependents'] = np.nan
+    df.loc[::7, 'DebtRatio'] = np.nan
+    X = schema.transform_frame(df)
+    assert not np.isnan(X).any()
+    _assert_parity(model, scorer, X)
+
+    # Request dicts with missing and null fields go through the same imputation
+    records = [{}, {'age': 40, 'MonthlyIncome': None}, {'NumberOfDependents': None, 'DebtRatio': 0.4}]
+    _assert_parity(model, scorer, schema.transform(records))
+
+
+def test_array_round_trip_keeps_parity(fitted):
+    model, scorer, schema = fitted
+    X = schema.transform_frame(_frame(1000, seed=4)[0])
+    restored = LinearScorer.from_arrays(scorer.to_arrays())
+    assert restored.feature_names == CREDIT_FEATURES
+    np.testing.assert_array_equal(restored.predict_positive(X), scorer.predict_positive(X))
+    _assert_parity(model, restored, X)
+
+
+def test_rejects_multiclass_models():
+    X = np.random.default_rng(0).normal(size=(90, 3))
+    model = LogisticRegression(max_iter=200).fit(X, np.arange(90) % 3)
+    assert not LinearScorer.supports(model)
+    with pytest.raises(ValueError):
+        LinearScorer.from_sklearn(model)
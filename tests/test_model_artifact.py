@@ -0,0 +1,36 @@
+# tests/test_model_artifact.py
+import os
+
+import numpy as np
+import pytest
+
+from src.model_artifact import load_artifact, save_artifact
+
+
+def test_round_trip_memory_maps_every_array(tmp_path):
+    path = str(tmp_path / "model.artifact")
+    arrays = {'kind': np.array('linear'), 'coef': np.arange(3, dtype=np.float64)}
+    manifest = save_artifact(path, arrays, metadata={'role': 'test'})
+    loaded, loaded_manifest = load_artifact(path)
+    assert loaded_manifest == manifest and manifest['role'] == 'test'
+    assert str(loaded['kind'][()]) == 'linear'
+    assert isinstance(loaded['coef'], np.memmap) and np.array_equal(loaded['coef'], arrays['coef'])
+    assert os.listdir(tmp_path) == ["model.artifact"]
+
+
+def test_existing_artifacts_are_never_replaced(tmp_path):
+    path = str(tmp_path / "model.artifact")
+    manifest = save_artifact(path, {'coef': np.zeros(3)})
+    with pytest.raises(FileExistsError):
+        save_artifact(path, {'coef': np.ones(3)})
+    loaded, loaded_manifest = load_artifact(path)
+    assert loaded_manifest['version'] == manifest['version'] and not loaded['coef'].any()
+    assert os.listdir(tmp_path) == ["model.artifact"]
+
+
+def test_checksum_mismatch_is_detected(tmp_path):
+    path = str(tmp_path / "model.artifact")
+    save_artifact(path, {'coef': np.zeros(3)})
+    np.save(os.path.join(path, "coef.npy"), np.ones(3))
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        load_artifact(path)
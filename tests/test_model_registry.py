@@ -0,0 +1,74 @@
+# tests/test_model_registry.py
+import pytest
+
+from models.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    for i in range(3):
+        registry.register_model("credit_scoring_model", str(tmp_path / f"model_{i}.pkl"),
+                                {'auc_roc': 0.8 + i / 100}, ['age'], {'run': i})
+    return registry
+
+
+def test_versions_resolve_to_their_own_entries(registry):
+    versions = [info['version'] for info in registry.list_versions("credit_scoring_model")]
+    assert versions == ["v1.0", "v2.0", "v3.0"]
+    assert registry.get_model("credit_scoring_model")['version'] == "v3.0"
+    for i, version in enumerate(versions):
+        assert registry.get_model("credit_scoring_model", version)['metadata'] == {'run': i}
+    assert registry.get_model("credit_scoring_model", "2")['version'] == "v2.0"
+
+
+@pytest.mark.parametrize("version", ["vx", "", "v", "v1.x", "1.0.0", "-1", "v9.0"])
+def test_malformed_or_unknown_versions_return_none(registry, version):
+    assert registry.get_model("credit_scoring_model", version) is None
+
+
+def test_unknown_name_returns_none(registry):
+    assert registry.get_model("missing_model") is None
+
+
+def test_each_version_gets_its_own_file(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    paths = [registry.new_model_path("credit_scoring_model") for _ in range(3)]
+    assert len(set(paths)) == 3
+    for i, path in enumerate(paths):
+        with open(path, "w") as f:
+            f.write(str(i))
+        registry.register_model("credit_scoring_model", path, {}, ['age'])
+    for i, version in enumerate(["v1.0", "v2.0", "v3.0"]):
+        with open(registry.model_file("credit_scoring_model", version)) as f:
+            assert f.read() == str(i)
+
+
+def test_registering_a_file_twice_is_rejected(registry, tmp_path):
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register_model("credit_scoring_model", str(tmp_path / "model_0.pkl"), {}, ['age'])
+    assert registry.get_model("credit_scoring_model")['version'] == "v3.0"
+
+
+def test_lineage_follows_the_exact_parent_version(registry, tmp_path):
+    # An update registered under the parent's own name (as update_model.py does)
+    update = registry.register_model("credit_scoring_model", str(tmp_path / "update.pkl"), {}, ['age'],
+                                     parent="credit_scoring_model", parent_version="v2.0")
+    assert (update['version'], update['parent'], update['parent_version']) == ("v4.0", "credit_scoring_model", "v2.0")
+    assert registry.get_lineage("credit_scoring_model") == [("credit_scoring_model", "v4.0"),
+                                                           ("credit_scoring_model", "v2.0")]
+
+    # A newer parent version does not rewrite existing lineage
+    registry.register_model("credit_scoring_model", str(tmp_path / "retrain.pkl"), {}, ['age'])
+    assert registry.get_lineage("credit_scoring_model", "v4.0") == [("credit_scoring_model", "v4.0"),
+                                                                   ("credit_scoring_model", "v2.0")]
+    assert registry.get_lineage("credit_scoring_model") == [("credit_scoring_model", "v5.0")]
+
+
+def test_parent_defaults_to_its_latest_version(registry, tmp_path):
+    student = registry.register_model("student", str(tmp_path / "student.pkl"), {}, ['age'],
+                                      parent="credit_scoring_model")
+    assert registry.get_lineage("student") == [("student", student['version']), ("credit_scoring_model", "v3.0")]
+    with pytest.raises(ValueError, match="not found"):
+        registry.register_model("student", str(tmp_path / "other.pkl"), {}, ['age'],
+                                parent="credit_scoring_model", parent_version="v9.0")
@@ -0,0 +1,30 @@
+# tests/test_model_training.py
+from src.model_training import select_candidate
+
+
+def _candidate(name, auc, latency_ms, fast_path):
+    return {'name': name, 'auc_score': auc, 'single_row_latency_ms': latency_ms, 'fast_path': fast_path}
+
+
+CANDIDATES = [
+    _candidate('lightgbm', 0.7298, 0.9, False),
+    _candidate('xgboost', 0.7267, 0.4, False),
+    _candidate('random_forest', 0.7250, 0.05, True),
+    _candidate('logistic', 0.7000, 0.01, True),
+]
+
+
+def test_best_auc_wins_without_tolerance():
+    assert select_candidate(CANDIDATES)['name'] == 'lightgbm'
+
+
+def test_library_models_never_win_on_speed():
+    assert select_candidate(CANDIDATES, auc_tolerance=0.004)['name'] == 'lightgbm'
+
+
+def test_compiled_model_within_tolerance_wins():
+    assert select_candidate(CANDIDATES, auc_tolerance=0.005)['name'] == 'random_forest'
+
+
+def test_failed_candidates_are_ignored():
+    assert select_candidate([{'name': 'lightgbm', 'auc_score': None}]) is None
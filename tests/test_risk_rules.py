@@ -0,0 +1,58 @@
+# tests/test_risk_rules.py
+import numpy as np
+import pytest
+
+from src.credit_agent_tools import CreditAgentTools
+from src.feature_schema import CREDIT_FEATURES, FeatureSchema
+from src.risk_rules import RiskRuleEngine
+
+APPLICANT = {
+    'RevolvingUtilizationOfUnsecuredLines': 0.2, 'age': 40, 'NumberOfTime30-59DaysPastDueNotWorse': 0,
+    'DebtRatio': 0.3, 'MonthlyIncome': 5000, 'NumberOfOpenCreditLinesAndLoans': 5,
+    'NumberOfTimes90DaysLate': 0, 'NumberRealEstateLoansOrLines': 1,
+    'NumberOfTime60-89DaysPastDueNotWorse': 0, 'NumberOfDependents': 1,
+}
+
+# Default schema fills a missing income with 0; a trained one with the training median
+SCHEMAS = [FeatureSchema.default(), FeatureSchema(CREDIT_FEATURES, defaults={'MonthlyIncome': 5400.0})]
+
+
+def _without_income(value):
+    applicant = dict(APPLICANT)
+    if value == 'absent':
+        del applicant['MonthlyIncome']
+    else:
+        applicant['MonthlyIncome'] = value
+    return applicant
+
+
+@pytest.mark.parametrize("schema", SCHEMAS)
+@pytest.mark.parametrize("value", ['absent', None, "", float('nan')])
+def test_missing_income_is_flagged(schema, value):
+    tools = CreditAgentTools(feature_schema=schema)
+    codes, factors = tools.assess_risk(_without_income(value))
+    assert codes == ['INCOME_MISSING']
+    assert factors == ["Monthly income not reported"]
+
+
+@pytest.mark.parametrize("schema", SCHEMAS)
+def test_reported_income_uses_thresholds(schema):
+    tools = CreditAgentTools(feature_schema=schema)
+    assert tools.assess_risk(APPLICANT) == ([], [])
+    assert tools.assess_risk({**APPLICANT, 'MonthlyIncome': 1500}) == (['INCOME_LOW'], ["Low monthly income"])
+
+
+def test_batch_matches_single_applicant():
+    schema = SCHEMAS[1]
+    tools = CreditAgentTools(feature_schema=schema)
+    records = [APPLICANT, _without_income(None), {**APPLICANT, 'MonthlyIncome': 1500}, _without_income('absent')]
+    _, codes, factors = tools.assess_risk_batch(schema.transform(records), schema.missing_mask(records))
+    assert [(c, f) for c, f in zip(codes, factors)] == [tools.assess_risk(r) for r in records]
+
+
+def test_nan_counts_as_missing_without_a_mask():
+    engine = RiskRuleEngine()
+    X = FeatureSchema.default().transform(APPLICANT)
+    X[0, engine.feature_schema.index['MonthlyIncome']] = np.nan
+    _, codes, _ = engine.assess(X)
+    assert codes == [['INCOME_MISSING']]
@@ -0,0 +1,98 @@
+# tune_cascade.py
+import argparse
+import os
+import time
+import numpy as np
+from src.cascade import CascadeScorer, expected_saving, load_first_stage, save_cascade_config, tune_cutoffs
+from src.credit_data_processor import CreditDataProcessor
+from src.credit_scoring_model import load_serving_model, model_artifact_version
+from models.model_registry import ModelRegistry
+from config import settings
+
+LATENCY_PROBES = 200
+
+def _cost(scorer, X: np.ndarray):
+    """(seconds per row in one batch call, median single-row latency in seconds)"""
+    start = time.perf_counter()
+    scorer.predict_proba(X)
+    batch_per_row = (time.perf_counter() - start) / len(X)
+    latencies = []
+    for row in X[:LATENCY_PROBES]:
+        row_start = time.perf_counter()
+        scorer.predict_proba(row.reshape(1, -1))
+        latencies.append(time.perf_counter() - row_start)
+    return batch_per_row, float(np.median(latencies))
+
+def main():
+    """Tune cascade cutoffs for a target agreement with the full model and report the compute saving"""
+    parser = argparse.ArgumentParser(description="Tune the first-stage cutoffs of cascade scoring")
+    parser.add_argument("--model", help="Model file (default: the registered SERVING_MODEL_NAME version)")
+    parser.add_argument("--data", default=os.path.join(settings.DATA_PATH, "testing.csv"),
+                        help="Applicants to tune on (labels are not needed)")
+    parser.add_argument("--target-agreement", type=float, default=0.99,
+                        help="Min share of rows whose cascade risk level matches the full model's")
+    parser.add_argument("--sample", type=int, default=50000, help="Rows to tune on (0 = all)")
+    parser.add_argument("--no-compiled", action="store_true", help="Tune on the sklearn models")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing the cutoffs")
+    args = parser.parse_args()
+    args.model = args.model or ModelRegistry(str(settings.MODEL_PATH)).model_file(settings.SERVING_MODEL_NAME or None) \
+        or os.path.join(settings.MODEL_PATH, "credit_scoring_model.pkl")
+
+    prefer_compiled = not args.no_compiled and settings.USE_COMPILED_MODEL
+    full_model, _, feature_schema = load_serving_model(args.model, prefer_compiled=prefer_compiled)
+    first_stage = load_first_stage(args.model, prefer_compiled=prefer_compiled)
+    if first_stage is None:
+        raise SystemExit("Model has no cascade first stage; retrain with TRAINING_CASCADE_FIRST_STAGE set")
+
+    processor = CreditDataProcessor(
+        target_column=settings.TARGET_COLUMN,
+        id_column=settings.ID_COLUMN,
+        cache_dir=settings.DATA_CACHE_PATH if settings.DATA_CACHE_ENABLED else None
+    )
+    df = processor.read_csv(args.data)
+    if args.sample and args.sample < len(df):
+        df = df.sample(args.sample, random_state=settings.RANDOM_STATE)
+    X = np.ascontiguousarray(feature_schema.transform_frame(df))
+    print(f"=== CASCADE TUNING ({type(first_stage).__name__} -> {type(full_model).__name__}) on {len(X):,} rows ===")
+
+    p_first = first_stage.predict_proba(X)[:, 1]
+    p_full = full_model.predict_proba(X)[:, 1]
+    tuned = tune_cutoffs(p_first, p_full, target_agreement=args.target_agreement)
+
+    cascade = CascadeScorer(first_stage, full_model, tuned['low_cutoff'], tuned['high_cutoff'])
+    first_batch, first_single = _cost(first_stage, X)
+    full_batch, full_single = _cost(full_model, X)
+    cascade_batch, cascade_single = _cost(cascade, X)
+    tuned['expected_saving_batch'] = expected_saving(tuned['first_stage_share'], first_batch, full_batch)
+    tuned['expected_saving_single_row'] = expected_saving(tuned['first_stage_share'], first_single, full_single)
+
+    print(f"Cutoffs: first stage answers p < {tuned['low_cutoff']:.4f} "
+          f"({tuned['low_share']:.1%}) or p >= {tuned['high_cutoff']:.4f} ({tuned['high_share']:.1%})")
+    print(f"Risk-level agreement with the full model: {tuned['agreement']:.2%} "
+          f"(target {args.target_agreement:.2%})")
+    print(f"Rows answered by the first stage: {tuned['first_stage_share']:.1%}")
+    if tuned['mean_abs_diff_answered'] is not None:
+        print(f"Mean |probability diff| on those rows: {tuned['mean_abs_diff_answered']:.4f}")
+    if settings.TARGET_COLUMN in df.columns and df[settings.TARGET_COLUMN].nunique() == 2:
+        from sklearn.metrics import roc_auc_score
+        y = df[settings.TARGET_COLUMN].to_numpy()
+        print(f"AUC: full {roc_auc_score(y, p_full):.4f}, cascade {roc_auc_score(y, cascade.predict_positive(X)):.4f}")
+    print(f"\n⏱️ Cost per row   {'batch (us)':>11} {'single (ms)':>12}")
+    for name, batch, single in (("first stage", first_batch, first_single), ("full model", full_batch, full_single),
+                                ("cascade", cascade_batch, cascade_single)):
+        print(f"  {name:<14} {batch * 1e6:>11.2f} {single * 1e3:>12.3f}")
+    print(f"Expected compute saving: {tuned['expected_saving_batch']:.1%} batch, "
+          f"{tuned['expected_saving_single_row']:.1%} single-row")
+
+    if args.dry_run:
+        return
+    path = save_cascade_config(args.model, {
+        **tuned,
+        'model_version': model_artifact_version(args.model),
+        'first_stage': type(first_stage).__name__,
+        'tuned_on': os.path.abspath(args.data),
+    })
+    print(f"\n✅ Cutoffs saved to {path}; serve with CASCADE_ENABLED=true")
+
+if __name__ == "__main__":
+    main()
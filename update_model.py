@@ -0,0 +1,91 @@
+# update_model.py
+import argparse
+import os
+from src.credit_data_processor import CreditDataProcessor
+from src.credit_scoring_model import CreditScoringModel
+from models.model_registry import ModelRegistry
+from config import settings
+
+def main():
+    """Incrementally update a registered model with newly labeled outcomes"""
+    parser = argparse.ArgumentParser(description="Update a registered model with new labeled outcomes only")
+    parser.add_argument("outcomes", help="CSV of labeled outcomes (features + target + id column)")
+    parser.add_argument("--parent", default=settings.SERVING_MODEL_NAME or None,
+                        help="Registered model to update (default: SERVING_MODEL_NAME, else latest)")
+    parser.add_argument("--name", help="Name for the new version (default: the parent's name, so serving picks it up)")
+    parser.add_argument("--registry", default=str(settings.MODEL_PATH), help="Registry directory")
+    parser.add_argument("--extra-rounds", type=int, default=100, help="Boosting rounds to add")
+    parser.add_argument("--extra-trees", type=int, default=20, help="Trees to add to a random forest")
+    parser.add_argument("--linear-max-iter", type=int, default=20, help="Warm-start iterations for logistic models")
+    parser.add_argument("--force", action="store_true",
+                        help="Register the update even if its held-out AUC is below the parent's")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    parent = args.parent or registry.get_latest_model()
+    if parent is None:
+        raise SystemExit("No registered model to update; run main.py first")
+    parent_info = registry.get_model(parent)
+    if parent_info is None:
+        raise SystemExit(f"Model '{parent}' not found in registry")
+    print(f"=== INCREMENTAL UPDATE OF '{parent}' ({parent_info['version']}) ===")
+
+    # The parent's frozen preprocessor is reused so new rows are imputed as before
+    model_dir = os.path.dirname(os.path.abspath(parent_info['model_path']))
+    trainer = CreditScoringModel(model_path=model_dir).load_model(os.path.abspath(parent_info['model_path']))
+
+    processor = CreditDataProcessor(
+        target_column=settings.TARGET_COLUMN,
+        id_column=settings.ID_COLUMN,
+        cache_dir=settings.DATA_CACHE_PATH if settings.DATA_CACHE_ENABLED else None
+    )
+    outcomes = processor.read_csv(args.outcomes)
+    outcomes = outcomes[outcomes[settings.TARGET_COLUMN].notna()]
+
+    # Only outcomes newer than anything the parent lineage has seen
+    last_seen = parent_info['metadata'].get('last_outcome_id')
+    if last_seen is not None and settings.ID_COLUMN in outcomes.columns:
+        outcomes = outcomes[outcomes[settings.ID_COLUMN] > last_seen]
+        print(f"{len(outcomes):,} new outcomes after id {last_seen}")
+    if len(outcomes) == 0:
+        print("No new labeled outcomes; nothing to do")
+        return
+
+    X_new = trainer.feature_schema.transform_frame(outcomes)
+    y_new = outcomes[settings.TARGET_COLUMN].to_numpy()
+    update = trainer.update_model(X_new, y_new, extra_rounds=args.extra_rounds,
+                                  extra_trees=args.extra_trees, linear_max_iter=args.linear_max_iter)
+
+    # Never silently replace the parent with a worse model
+    if update['auc_updated'] is not None and update['auc_updated'] < update['auc_parent']:
+        if not args.force:
+            raise SystemExit(f"❌ Updated model is worse on held-out new outcomes (AUC {update['auc_updated']:.4f} "
+                             f"< parent {update['auc_parent']:.4f}); not registered (use --force to register anyway)")
+        print("⚠️ Registering a model worse than its parent (--force)")
+
+    name = args.name or parent
+    model_file = registry.new_model_path(name)
+    trainer.save_model(filename=model_file)
+
+    metadata = {
+        'model_type': type(trainer.model).__name__,
+        'update_method': update['method'],
+        'new_outcomes': update['n_new'],
+        'fit_time_s': round(update['fit_time_s'], 3),
+        'last_outcome_id': last_seen
+    }
+    if settings.ID_COLUMN in outcomes.columns:
+        metadata['last_outcome_id'] = int(outcomes[settings.ID_COLUMN].max())
+    performance = {}
+    if update['auc_updated'] is not None:
+        performance = {'auc_roc': update['auc_updated'], 'auc_roc_parent': update['auc_parent']}
+    info = registry.register_model(name, model_file, performance,
+                                   trainer.feature_names, metadata, parent=parent,
+                                   parent_version=parent_info['version'])
+
+    print(f"\n✅ Registered '{name}' ({info['version']})")
+    lineage = registry.get_lineage(name, info['version'])
+    print(f"Lineage: {' <- '.join(f'{n} {v}' for n, v in lineage)}")
+
+if __name__ == "__main__":
+    main()